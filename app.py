@@ -3,11 +3,23 @@
 Diagrama do Cerrado - Tema Claro Moderno
 """
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-import json
 from datetime import datetime
 
+from components.app_state import (
+    DEFAULT_PORTFOLIO, classes_key, current_frame, dependents, editor_fragment_key,
+    history_is_current, init_state, mark_changed, record_history, restore_portfolio,
+    session_owner, set_sub_assets, step_history, timed
+)
+from components.charts import CLASS_COLORS, SUNBURST_TOP_N, ChartBuilder
+from components.detail_table import display_detail_table
+from components.header import inject_theme
+from components.rebalance_panel import display_rebalance
+from components.templates import render, render_grid, render_many, show
+from cerrado.engine.export import deferred_export, export_payload
+from cerrado.engine.normalization import NormalizationError, constraint_arrays, normalize_allocation
+from cerrado.engine.snapshot import PYARROW_OK, SNAPSHOT_EXTENSION
+from utils.portfolio_store import get_default_store
+
 # Importações locais
 try:
     from components.asset_editor import AssetEditor
@@ -31,161 +43,8 @@ def setup_light_theme():
         initial_sidebar_state="expanded"
     )
     
-    # CSS - TEMA CLARO E MODERNO
-    st.markdown("""
-    <style>
-    /* Tema claro moderno */
-    .stApp {
-        background-color: #FFFFFF;
-        color: #1A1A1A;
-    }
-    
-    /* Títulos */
-    h1, h2, h3, h4 {
-        color: #2E8B57 !important;
-        font-weight: 700;
-        font-family: 'Segoe UI', 'Arial', sans-serif;
-    }
-    
-    h1 {
-        border-bottom: 3px solid #2E8B57;
-        padding-bottom: 10px;
-        margin-bottom: 30px;
-    }
-    
-    /* Cards e containers */
-    .main-card {
-        background: linear-gradient(135deg, #FFFFFF 0%, #F8F9FA 100%);
-        border-radius: 12px;
-        border: 1px solid #E0E0E0;
-        padding: 20px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.05);
-        margin-bottom: 20px;
-    }
-    
-    .metric-card {
-        background: linear-gradient(135deg, #2E8B57 0%, #3CB371 100%);
-        color: white;
-        padding: 15px;
-        border-radius: 10px;
-        text-align: center;
-        box-shadow: 0 4px 8px rgba(46, 139, 87, 0.2);
-    }
-    
-    /* Botões */
-    .stButton > button {
-        background: linear-gradient(90deg, #2E8B57, #3CB371);
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 10px 20px;
-        font-weight: 600;
-        font-size: 14px;
-        transition: all 0.3s ease;
-        box-shadow: 0 2px 4px rgba(46, 139, 87, 0.2);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(46, 139, 87, 0.3);
-        background: linear-gradient(90deg, #3CB371, #2E8B57);
-    }
-    
-    /* Sliders */
-    .stSlider > div > div > div {
-        background: linear-gradient(90deg, #2E8B57, #3CB371) !important;
-    }
-    
-    .stSlider > div > div {
-        background-color: #E8F5E9 !important;
-    }
-    
-    /* Sidebar */
-    [data-testid="stSidebar"] {
-        background-color: #F8F9FA;
-        border-right: 1px solid #E0E0E0;
-    }
-    
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2px;
-        background-color: #F8F9FA;
-        padding: 8px;
-        border-radius: 10px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 8px;
-        padding: 10px 20px;
-        font-weight: 600;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: #2E8B57 !important;
-        color: white !important;
-    }
-    
-    /* Inputs */
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input {
-        background-color: #FFFFFF;
-        color: #1A1A1A;
-        border: 2px solid #E0E0E0;
-        border-radius: 8px;
-        padding: 8px 12px;
-    }
-    
-    .stTextInput > div > div > input:focus,
-    .stNumberInput > div > div > input:focus {
-        border-color: #2E8B57;
-        box-shadow: 0 0 0 1px #2E8B57;
-    }
-    
-    /* Expanders */
-    .streamlit-expanderHeader {
-        background-color: #F8F9FA;
-        border: 1px solid #E0E0E0;
-        border-radius: 8px;
-        font-weight: 600;
-    }
-    
-    /* Divider */
-    hr {
-        border-color: #E0E0E0;
-        margin: 20px 0;
-    }
-    
-    /* Badges */
-    .badge {
-        display: inline-block;
-        background: #E8F5E9;
-        color: #2E8B57;
-        padding: 4px 12px;
-        border-radius: 20px;
-        font-size: 12px;
-        font-weight: 600;
-        margin: 2px;
-    }
-    
-    /* Tooltips */
-    .tooltip {
-        position: relative;
-        display: inline-block;
-        cursor: help;
-    }
-    
-    /* Responsividade */
-    @media (max-width: 768px) {
-        .main-card {
-            padding: 15px;
-        }
-        
-        h1 {
-            font-size: 24px;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # CSS - TEMA CLARO E MODERNO (assets/theme_light.css)
+    inject_theme('light')
     
     # Custom HTML para header
     st.markdown("""
@@ -196,33 +55,70 @@ def setup_light_theme():
     """, unsafe_allow_html=True)
 
 
-def main():
-    """Função principal"""
-    
-    # Configurar tema
-    setup_light_theme()
+def auto_correct_macro():
+    """Callback do Auto-corrigir: projeta a alocação macro nas travas e limites"""
+    macro = st.session_state.portfolio['macro']
+    try:
+        corrected = normalize_allocation(macro, st.session_state.constraints['macro'])
+    except NormalizationError as e:
+        st.session_state._normalization_error = str(e)
+        return
     
-    # Inicializar session_state - COM VALORES FLOAT!
-    if 'portfolio' not in st.session_state:
-        st.session_state.portfolio = {
-            'macro': {
-                'Renda Fixa': 40.0,
-                'Ações': 30.0,
-                'FIIs': 20.0,
-                'Criptomoedas': 10.0
-            },
-            'sub': {
-                'Renda Fixa': {'Tesouro Selic': 100.0},
-                'Ações': {'PETR4': 50.0, 'VALE3': 30.0, 'ITUB4': 20.0},
-                'FIIs': {'MXRF11': 60.0, 'HGLG11': 40.0},
-                'Criptomoedas': {'Bitcoin': 70.0, 'Ethereum': 30.0}
-            }
-        }
+    # Callback roda antes dos widgets: dá para atualizar os sliders
+    macro.update(corrected)
+    for asset_class, value in corrected.items():
+        st.session_state[f"slider_{asset_class}"] = value
+    mark_changed()
+
+
+def reset_portfolio():
+    """Callback do Resetar: volta à alocação padrão (pode ser desfeito)"""
+    restore_portfolio({'macro': dict(DEFAULT_PORTFOLIO['macro']), 'sub': {}})
+
+
+def open_saved_portfolio():
+    """Callback do Abrir: carrega a versão escolhida do portfólio salvo"""
+    name = st.session_state.saved_portfolio
+    version = st.session_state.get('saved_version')
+    portfolio, total = get_default_store().load(name, version, owner=session_owner())
+    if portfolio is None:
+        st.session_state._store_error = f"Portfólio '{name}' não encontrado"
+        return
+    restore_portfolio(portfolio, total)
+    st.session_state.portfolio_name = name
+
+
+def render_saved_portfolios():
+    """Lista de portfólios salvos (só metadados; o conteúdo é lido ao abrir)"""
+    store = get_default_store()
+    owner = session_owner()
+    saved = {info.name: info for info in store.list_portfolios(owner)}
+    if not saved:
+        st.caption("Nenhum portfólio salvo ainda.")
+        return
     
-    if 'total_patrimony' not in st.session_state:
-        st.session_state.total_patrimony = 100000.0
+    name = st.selectbox(
+        "Portfólio",
+        list(saved),
+        format_func=lambda n: f"{n} (v{saved[n].version})",
+        key="saved_portfolio"
+    )
+    saved_at = {v.version: v.saved_at for v in store.versions(name, owner)}
+    st.selectbox(
+        "Versão",
+        list(saved_at),
+        format_func=lambda v: f"v{v} - {datetime.fromtimestamp(saved_at[v]):%d/%m/%Y %H:%M:%S}",
+        key="saved_version"
+    )
+    st.button("📂 Abrir", use_container_width=True, on_click=open_saved_portfolio)
     
-    # Sidebar - Moderna
+    error = st.session_state.pop('_store_error', None)
+    if error:
+        st.error(f"❌ {error}")
+
+
+def render_sidebar():
+    """Sidebar: patrimônio e alocação macro (afetam todo o app)"""
     with st.sidebar:
         # Logo e título da sidebar
         st.markdown("""
@@ -234,7 +130,6 @@ def main():
         
         # Patrimônio total
         with st.container():
-            st.markdown('<div class="main-card">', unsafe_allow_html=True)
             total = st.number_input(
                 "💰 **Patrimônio Total (R$)**",
                 min_value=0.0,
@@ -244,14 +139,13 @@ def main():
                 help="Valor total do seu patrimônio"
             )
             st.session_state.total_patrimony = total
-            st.markdown('</div>', unsafe_allow_html=True)
         
         # Alocação macro
         with st.container():
-            st.markdown('<div class="main-card">', unsafe_allow_html=True)
             st.subheader("📈 Alocação Macro")
             
             macro_total = 0.0
+            bars = []
             
             # Cores para cada classe
             colors = {
@@ -261,299 +155,256 @@ def main():
                 'Criptomoedas': '#9370DB'
             }
             
-            for asset_class in st.session_state.portfolio['macro']:
-                current = float(st.session_state.portfolio['macro'][asset_class])
+            for idx, asset_class in enumerate(st.session_state.portfolio['macro']):
+                # O valor inicial vai só na chave: Auto-corrigir e
+                # restore_portfolio também gravam nela (com `value=` junto,
+                # o Streamlit avisa do conflito)
+                key = f"slider_{asset_class}"
+                if key not in st.session_state:
+                    st.session_state[key] = float(st.session_state.portfolio['macro'][asset_class])
                 
                 # Slider com cor personalizada
                 value = st.slider(
                     f"**{asset_class}**",
                     min_value=0.0,
                     max_value=100.0,
-                    value=current,
                     step=0.5,
-                    key=f"slider_{asset_class}",
+                    key=key,
                     help=f"Alocação para {asset_class}"
                 )
                 
                 st.session_state.portfolio['macro'][asset_class] = float(value)
                 macro_total += float(value)
                 
-                # Barra de progresso simples
-                progress_html = f"""
-                <div style='margin: 5px 0 15px 0;'>
-                    <div style='display: flex; justify-content: space-between; font-size: 12px; color: #666;'>
-                        <span>0%</span>
-                        <span>{value:.1f}%</span>
-                        <span>100%</span>
-                    </div>
-                    <div style='background: #E0E0E0; height: 4px; border-radius: 2px;'>
-                        <div style='background: {colors[asset_class]}; width: {value}%; height: 100%; border-radius: 2px;'></div>
-                    </div>
-                </div>
-                """
-                st.markdown(progress_html, unsafe_allow_html=True)
+                bars.append({
+                    'name': asset_class,
+                    'percent': f"{value:.1f}",
+                    'width': value,
+                    'color': colors.get(asset_class, CLASS_COLORS[idx % len(CLASS_COLORS)])
+                })
+            
+            # Barras de progresso de todas as classes num só elemento
+            show(render_many('progress_bar', bars))
             
             # Status da soma
             if abs(macro_total - 100.0) < 0.01:
                 st.success(f"✅ **Soma:** {macro_total:.1f}%")
             else:
                 st.error(f"⚠️ **Soma:** {macro_total:.1f}% ≠ 100%")
-                # Auto-correção
-                if st.button("🔧 Auto-corrigir", use_container_width=True):
-                    if macro_total > 0:
-                        for key in st.session_state.portfolio['macro']:
-                            st.session_state.portfolio['macro'][key] = (
-                                st.session_state.portfolio['macro'][key] / macro_total * 100
-                            )
-                    st.rerun()
+                # Auto-correção (respeita travas e limites)
+                st.button("🔧 Auto-corrigir", use_container_width=True, on_click=auto_correct_macro)
+            
+            error = st.session_state.pop('_normalization_error', None)
+            if error:
+                st.error(f"❌ {error}")
             
-            st.markdown('</div>', unsafe_allow_html=True)
+            # Travas e limites por classe, usados pelo Auto-corrigir
+            with st.expander("🔒 Travas e limites", expanded=False):
+                classes = list(st.session_state.portfolio['macro'])
+                locked, lower, upper = constraint_arrays(classes, st.session_state.constraints['macro'])
+                limits = st.data_editor(
+                    {'Classe': classes, 'Travada': locked.tolist(),
+                     'Mín (%)': lower.tolist(), 'Máx (%)': upper.tolist()},
+                    column_config={
+                        'Classe': st.column_config.TextColumn(disabled=True),
+                        'Mín (%)': st.column_config.NumberColumn(min_value=0.0, max_value=100.0, format="%.1f"),
+                        'Máx (%)': st.column_config.NumberColumn(min_value=0.0, max_value=100.0, format="%.1f"),
+                    },
+                    hide_index=True,
+                    key=classes_key("macro_constraints", classes)
+                )
+                st.session_state.constraints['macro'] = dict(zip(
+                    limits['Classe'], zip(limits['Travada'], limits['Mín (%)'], limits['Máx (%)'])
+                ))
         
         # Botões de ação
         with st.container():
-            st.markdown('<div class="main-card">', unsafe_allow_html=True)
+            # Sempre habilitados: edições nos fragmentos entram no histórico
+            # sem redesenhar a sidebar (sem passo disponível, não fazem nada)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.button("↩️ Desfazer", use_container_width=True,
+                          on_click=step_history, args=('undo',))
+            with col2:
+                st.button("↪️ Refazer", use_container_width=True,
+                          on_click=step_history, args=('redo',))
+            
             col1, col2 = st.columns(2)
             with col1:
-                if st.button("🔄 Resetar", use_container_width=True, type="secondary"):
-                    st.session_state.portfolio = {
-                        'macro': {
-                            'Renda Fixa': 40.0,
-                            'Ações': 30.0,
-                            'FIIs': 20.0,
-                            'Criptomoedas': 10.0
-                        },
-                        'sub': {}
-                    }
-                    st.rerun()
+                st.button("🔄 Resetar", use_container_width=True, type="secondary",
+                          on_click=reset_portfolio)
             with col2:
                 if st.button("💾 Salvar", use_container_width=True, type="primary"):
-                    st.success("✅ Configuração salva!")
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Layout principal com abas
-    tab1, tab2, tab3 = st.tabs(["📊 **Dashboard**", "📝 **Editar Ativos**", "💾 **Exportar**"])
-    
-    with tab1:
-        # Cards de métricas no topo
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown("""
-            <div class="metric-card">
-                <div style="font-size: 12px; opacity: 0.9;">PATRIMÔNIO</div>
-                <div style="font-size: 24px; font-weight: 700;">R$ {:,}</div>
-            </div>
-            """.format(int(total)), unsafe_allow_html=True)
+                    # Gravação em segundo plano: não bloqueia o rerun
+                    store = get_default_store()
+                    store.save(st.session_state.portfolio_name, current_frame(), total,
+                               owner=session_owner())
+                    if store.last_error is not None:
+                        st.warning(f"⚠️ Última gravação falhou ({store.last_error}); tentando novamente")
+                    else:
+                        st.success("✅ Configuração salva!")
+            
+            st.text_input("Nome do portfólio", key="portfolio_name")
+            st.toggle("Salvar automaticamente", key="autosave",
+                      help="Grava uma nova versão a cada alteração")
         
-        with col2:
-            total_assets = sum(len(st.session_state.portfolio['sub'].get(cls, {})) 
-                             for cls in st.session_state.portfolio['macro'])
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 12px; opacity: 0.9;">TOTAL DE ATIVOS</div>
-                <div style="font-size: 24px; font-weight: 700;">{total_assets}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        with st.expander("📂 Portfólios salvos", expanded=False):
+            render_saved_portfolios()
         
-        with col3:
-            classes = len(st.session_state.portfolio['macro'])
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 12px; opacity: 0.9;">CLASSES</div>
-                <div style="font-size: 24px; font-weight: 700;">{classes}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        # Tempos da última renderização de cada seção
+        timings = st.session_state.get('_timings')
+        if timings:
+            with st.expander("⏱️ Desempenho", expanded=False):
+                for section, elapsed in timings.items():
+                    st.caption(f"{section}: {elapsed:.1f} ms")
+
+
+@st.fragment(key="dashboard")
+def render_dashboard():
+    """Aba Dashboard - fragmento reexecutado quando os sub-ativos mudam"""
+    with timed("dashboard"):
+        total = st.session_state.total_patrimony
+        frame = current_frame()
+        valuation = frame.valuate(total)
+        n_macro = len(st.session_state.portfolio['macro'])
         
-        with col4:
-            date_str = datetime.now().strftime("%d/%m")
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 12px; opacity: 0.9;">ATUALIZADO</div>
-                <div style="font-size: 24px; font-weight: 700;">{date_str}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        # Cards de métricas no topo (um só elemento)
+        show(render_grid('metric_card', [
+            {'label': "PATRIMÔNIO", 'value': "R$ {:,}".format(int(total))},
+            {'label': "TOTAL DE ATIVOS", 'value': int(frame.offsets[n_macro])},
+            {'label': "CLASSES", 'value': n_macro},
+            {'label': "ATUALIZADO", 'value': datetime.now().strftime("%d/%m")},
+        ]))
         
         st.divider()
         
         # Gráfico principal
-        st.markdown('<div class="main-card">', unsafe_allow_html=True)
         st.subheader("📈 Visão Geral da Alocação")
         
-        fig = go.Figure()
-        
-        labels = list(st.session_state.portfolio['macro'].keys())
-        values = list(st.session_state.portfolio['macro'].values())
-        
-        # Cores modernas
-        colors = ['#2E8B57', '#1E90FF', '#FF8C00', '#9370DB']
+        # Figura reaproveitada enquanto a alocação macro não mudar
+        fig = ChartBuilder(total).create_allocation_pie(st.session_state.portfolio['macro'])
+        colors = CLASS_COLORS
         
-        fig.add_trace(go.Pie(
-            labels=labels,
-            values=values,
-            hole=0.4,
-            textinfo='label+percent',
-            textposition='outside',
-            marker=dict(colors=colors, line=dict(color='white', width=2)),
-            hoverinfo='label+percent+value',
-            textfont=dict(size=14, color='black')
-        ))
+        st.plotly_chart(fig, use_container_width=True)
         
-        fig.update_layout(
-            title=dict(
-                text="Distribuição do Patrimônio",
-                font=dict(size=20, color='#1A1A1A')
-            ),
-            showlegend=True,
-            legend=dict(
-                font=dict(color='#1A1A1A'),
-                bgcolor='rgba(255,255,255,0.8)',
-                bordercolor='#E0E0E0'
-            ),
-            height=500,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
+        # Hierarquia: top-N sub-ativos por classe, demais agrupados em "Outros"
+        st.subheader("🌳 Hierarquia dos Ativos")
+        expand_class = st.selectbox(
+            "Expandir classe",
+            ["(nenhuma)"] + frame.classes[:n_macro],
+            help=f"Mostra todos os sub-ativos da classe (por padrão, os {SUNBURST_TOP_N} maiores)"
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        sunburst = ChartBuilder(total).create_sunburst_chart(
+            frame,
+            top_n=SUNBURST_TOP_N,
+            expanded=[expand_class] if expand_class != "(nenhuma)" else []
+        )
+        st.plotly_chart(sunburst, use_container_width=True)
         
         # Tabela de resumo
-        st.markdown('<div class="main-card">', unsafe_allow_html=True)
         st.subheader("📋 Resumo Detalhado")
         
-        # Criar tabela de resumo
-        summary_data = []
-        for asset_class, allocation in st.session_state.portfolio['macro'].items():
-            class_value = total * (float(allocation) / 100.0)
-            
-            summary_data.append({
-                'Classe': asset_class,
-                'Alocação': f"{allocation:.1f}%",
-                'Valor': format_currency(class_value),
-                'Cor': colors[list(st.session_state.portfolio['macro'].keys()).index(asset_class)]
-            })
+        # Cards de resumo por classe (um só elemento)
+        summary_data = [
+            {
+                'name': frame.classes[idx],
+                'allocation': f"{frame.macro[idx]:.1f}%",
+                'value': format_currency(valuation.class_values[idx]),
+                'color': colors[idx % len(colors)]
+            }
+            for idx in range(n_macro)
+        ]
+        show(render_grid('summary_card', summary_data))
         
-        # Exibir como cards
-        cols = st.columns(4)
-        for idx, item in enumerate(summary_data):
-            with cols[idx]:
-                st.markdown(f"""
-                <div style='
-                    background: linear-gradient(135deg, {item['Cor']}20, {item['Cor']}10);
-                    border-left: 4px solid {item['Cor']};
-                    border-radius: 8px;
-                    padding: 15px;
-                    margin-bottom: 10px;
-                '>
-                    <div style='font-weight: 600; color: {item['Cor']}; font-size: 14px;'>{item['Classe']}</div>
-                    <div style='font-size: 20px; font-weight: 700; color: #1A1A1A; margin: 5px 0;'>{item['Alocação']}</div>
-                    <div style='font-size: 12px; color: #666;'>{item['Valor']}</div>
-                </div>
-                """, unsafe_allow_html=True)
+        # Detalhes: uma só tabela para todos os sub-ativos
+        st.subheader("🔍 Detalhes dos Ativos")
+        display_detail_table(frame, valuation, n_macro)
+
+
+def render_class_editor(asset_class):
+    """Editor de uma classe - executado dentro do fragmento da classe"""
+    with timed(f"editor: {asset_class}"):
+        total = st.session_state.total_patrimony
+        classes = list(st.session_state.portfolio['macro'])
+        class_allocation = st.session_state.portfolio['macro'][asset_class]
         
-        # Detalhes expandíveis
-        for asset_class, allocation in st.session_state.portfolio['macro'].items():
-            class_value = total * (float(allocation) / 100.0)
-            
-            with st.expander(f"🔍 Detalhes de {asset_class} ({allocation:.1f}%)", expanded=False):
-                if asset_class in st.session_state.portfolio['sub']:
-                    assets = st.session_state.portfolio['sub'][asset_class]
-                    if assets:
-                        # Tabela interna
-                        for asset_name, asset_percent in assets.items():
-                            asset_percent_float = float(asset_percent)
-                            asset_value = class_value * (asset_percent_float / 100.0)
-                            
-                            col1, col2, col3 = st.columns([3, 1, 2])
-                            with col1:
-                                st.write(f"**{asset_name}**")
-                            with col2:
-                                st.metric("", f"{asset_percent_float:.1f}%")
-                            with col3:
-                                st.metric("", format_currency(asset_value))
-                    else:
-                        st.info("Nenhum sub-ativo definido. Use a aba 'Editar Ativos' para adicionar.")
+        # Card para cada classe
+        show(render(
+            'class_card',
+            name=asset_class,
+            allocation=f"{class_allocation:.1f}",
+            value=format_currency(total * (float(class_allocation) / 100.0))
+        ))
         
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    with tab2:
-        st.markdown('<div class="main-card">', unsafe_allow_html=True)
-        st.header("📝 Edição de Sub-Ativos")
-        st.markdown("Defina os ativos específicos dentro de cada classe de investimento.")
-        st.markdown('</div>', unsafe_allow_html=True)
+        # Edição na tabela: reexecuta só este editor (que grava a mudança)
+        # e os fragmentos que leem os sub-ativos, nessa ordem
+        scope = dependents(f"sub:{asset_class}", classes)
+        was_empty = not st.session_state.portfolio['sub'][asset_class]
+        edited = AssetEditor.edit_asset_class(
+            class_name=asset_class,
+            assets_dict=st.session_state.portfolio['sub'][asset_class],
+            class_allocation=float(class_allocation),
+            total_patrimony=float(total),
+            on_change=lambda: st.rerun(scope),
+            constraints=st.session_state.constraints['sub'].setdefault(asset_class, {}),
+            on_update=lambda: (mark_changed(), record_history(changed=(asset_class,)))
+        )
+        
+        if edited is not None:
+            set_sub_assets(asset_class, edited)
+            # O ativo padrão de uma classe vazia não vira um passo próprio
+            record_history(changed=(asset_class,), amend=was_empty)
+        
+        st.write("")  # Espaço
+
+
+@st.fragment(key="export")
+def render_export():
+    """Aba Exportar - fragmento reexecutado quando os sub-ativos mudam"""
+    with timed("export"):
+        total = st.session_state.total_patrimony
+        frame = current_frame()
+        n_macro = len(st.session_state.portfolio['macro'])
         
-        if ASSET_EDITOR_OK:
-            for asset_class, class_allocation in st.session_state.portfolio['macro'].items():
-                if asset_class not in st.session_state.portfolio['sub']:
-                    st.session_state.portfolio['sub'][asset_class] = {}
-                
-                # Card para cada classe
-                st.markdown(f"""
-                <div class="main-card">
-                    <h4 style='color: #2E8B57;'>{asset_class}</h4>
-                    <p style='color: #666; font-size: 14px; margin-bottom: 20px;'>
-                        Alocação total da classe: <strong>{class_allocation:.1f}%</strong> 
-                        ({format_currency(total * (float(class_allocation) / 100.0))})
-                    </p>
-                """, unsafe_allow_html=True)
-                
-                edited = AssetEditor.edit_asset_class(
-                    class_name=asset_class,
-                    assets_dict=st.session_state.portfolio['sub'][asset_class],
-                    class_allocation=float(class_allocation),
-                    total_patrimony=float(total)
-                )
-                
-                if edited is not None:
-                    st.session_state.portfolio['sub'][asset_class] = edited
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-                st.write("")  # Espaço
-        else:
-            st.warning("⚠️ Editor de ativos não disponível")
-    
-    with tab3:
-        st.markdown('<div class="main-card">', unsafe_allow_html=True)
         st.header("💾 Exportar Dados")
         st.markdown("Salve ou compartilhe sua configuração de portfólio.")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Exportar JSON
-            portfolio_json = json.dumps(st.session_state.portfolio, indent=2, ensure_ascii=False)
-            
+            # Payloads gerados só no clique e memoizados pelo conteúdo
             st.download_button(
                 label="📥 **Baixar como JSON**",
-                data=portfolio_json,
+                data=deferred_export('json', frame, total),
                 file_name=f"diagrama_cerrado_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
                 mime="application/json",
                 use_container_width=True,
                 help="Baixa a configuração completa do portfólio"
             )
             
-            # Exportar CSV
-            csv_data = []
-            for asset_class, allocation in st.session_state.portfolio['macro'].items():
-                class_value = total * (float(allocation) / 100.0)
-                csv_data.append([asset_class, "", allocation, class_value])
-                
-                if asset_class in st.session_state.portfolio['sub']:
-                    for asset_name, asset_percent in st.session_state.portfolio['sub'][asset_class].items():
-                        asset_value = class_value * (float(asset_percent) / 100.0)
-                        csv_data.append(["", asset_name, asset_percent, asset_value])
-            
-            df_csv = pd.DataFrame(csv_data, columns=["Classe", "Ativo", "Alocação (%)", "Valor (R$)"])
-            csv_string = df_csv.to_csv(index=False)
+            # Exportar CSV (uma linha por classe seguida dos sub-ativos)
+            compress_csv = st.checkbox("Compactar CSV (gzip)", value=False)
+            csv_name = f"relatorio_portfolio_{datetime.now().strftime('%Y%m%d')}.csv"
             
             st.download_button(
                 label="📊 **Baixar como CSV**",
-                data=csv_string,
-                file_name=f"relatorio_portfolio_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
+                data=deferred_export('csv.gz' if compress_csv else 'csv', frame, total),
+                file_name=csv_name + (".gz" if compress_csv else ""),
+                mime="application/gzip" if compress_csv else "text/csv",
                 use_container_width=True,
                 help="Baixa um relatório em formato de planilha"
             )
+            
+            # Snapshot binário (Arrow IPC), recarregável sem parse de JSON
+            if PYARROW_OK:
+                st.download_button(
+                    label="🗜️ **Baixar snapshot (Arrow)**",
+                    data=deferred_export('arrow', frame, total),
+                    file_name=f"diagrama_cerrado_{datetime.now().strftime('%Y%m%d_%H%M')}{SNAPSHOT_EXTENSION}",
+                    mime="application/vnd.apache.arrow.file",
+                    use_container_width=True,
+                    help="Baixa portfólio e patrimônio em formato binário compacto"
+                )
         
         with col2:
             # Visualizar dados
@@ -563,6 +414,7 @@ def main():
             
             # Copiar para clipboard
             if st.button("📋 **Copiar JSON**", use_container_width=True, type="secondary"):
+                portfolio_json = export_payload('json', frame, total)
                 st.code(portfolio_json[:300] + "..." if len(portfolio_json) > 300 else portfolio_json)
                 st.success("JSON copiado para a área de transferência!")
         
@@ -574,13 +426,70 @@ def main():
         with col1:
             st.metric("Classes", len(st.session_state.portfolio['macro']))
         with col2:
-            total_assets = sum(len(st.session_state.portfolio['sub'].get(cls, {})) 
-                             for cls in st.session_state.portfolio['macro'])
-            st.metric("Ativos", total_assets)
+            st.metric("Ativos", int(frame.offsets[n_macro]))
         with col3:
             st.metric("Data", datetime.now().strftime("%d/%m/%Y"))
+
+
+@st.fragment(key="rebalance")
+def render_rebalance():
+    """Aba Rebalancear - ordens para levar as posições à alocação alvo"""
+    with timed("rebalance"):
+        st.header("⚖️ Rebalanceamento")
+        display_rebalance(current_frame(), len(st.session_state.portfolio['macro']))
+
+
+def main():
+    """Função principal"""
+    
+    # Configurar tema
+    setup_light_theme()
+    
+    # Inicializar session_state - COM VALORES FLOAT!
+    init_state()
+    
+    # Sidebar no escopo do app: patrimônio e macro afetam todas as seções
+    with timed("sidebar"):
+        render_sidebar()
+    
+    # Rerun completo: a sidebar só altera 'macro' e o total; os sub-ativos
+    # são registrados por quem os altera. Só um portfólio substituído
+    # (desfazer, abrir, importar) exige comparar todas as classes
+    mark_changed()
+    record_history(changed=() if history_is_current() else None)
+    if st.session_state.get('autosave'):
+        # Saves seguidos são agrupados; versões sem mudança são descartadas
+        get_default_store().save(
+            st.session_state.portfolio_name, current_frame(), st.session_state.total_patrimony,
+            owner=session_owner()
+        )
+    
+    # Layout principal com abas; cada seção é um fragmento com chave própria
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "📊 **Dashboard**", "📝 **Editar Ativos**", "⚖️ **Rebalancear**", "💾 **Exportar**"
+    ])
+    
+    with tab1:
+        render_dashboard()
+    
+    with tab2:
+        st.header("📝 Edição de Sub-Ativos")
+        st.markdown("Defina os ativos específicos dentro de cada classe de investimento.")
         
-        st.markdown('</div>', unsafe_allow_html=True)
+        if ASSET_EDITOR_OK:
+            for idx, asset_class in enumerate(st.session_state.portfolio['macro']):
+                if asset_class not in st.session_state.portfolio['sub']:
+                    st.session_state.portfolio['sub'][asset_class] = {}
+                
+                st.fragment(render_class_editor, key=editor_fragment_key(idx))(asset_class)
+        else:
+            st.warning("⚠️ Editor de ativos não disponível")
+    
+    with tab3:
+        render_rebalance()
+    
+    with tab4:
+        render_export()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+"""
+Benchmarks do Diagrama do Cerrado
+"""
\ No newline at end of file
@@ -0,0 +1,135 @@
+# benchmarks/bench_imports.py
+"""
+Benchmark de cold start: tempo de import de cada módulo num interpretador novo
+
+Cada alvo é importado com `python -X importtime` (mediana de várias
+execuções); o relatório mostra o tempo por pacote de topo. Os orçamentos
+ficam em benchmarks/import_budget.json:
+
+    {"alvo": {"max_ms": 50, "forbidden": ["pandas"]}}
+
+`forbidden` lista módulos que o alvo não pode carregar (dependências que
+devem ser importadas só no primeiro uso).
+
+Uso: python -m benchmarks.bench_imports [alvo ...] [--runs N] [--top N]
+Falha (código 1) se algum alvo passar do orçamento ou carregar um módulo proibido.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(ROOT_DIR, 'benchmarks', 'import_budget.json')
+
+
+def parse_importtime(stderr):
+    """
+    Lê a saída de `-X importtime`
+    
+    Returns:
+        list: tuplas (módulo, self_us, cumulativo_us, profundidade)
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # cabeçalho
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def measure(target):
+    """
+    Importa `target` num interpretador novo
+    
+    Returns:
+        list: registros do importtime a partir do pacote do alvo (sem os
+        módulos carregados na inicialização do interpretador)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {target}"],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"falha ao importar {target}:\n{result.stderr[-2000:]}")
+    records = parse_importtime(result.stderr)
+    
+    # O alvo é o último registro de nível 0; os imports aninhados nele
+    # (inclusive os pacotes pai) aparecem antes
+    end = max(i for i, (name, _, _, depth) in enumerate(records) if depth == 0 and name == target)
+    start = end
+    while start > 0 and records[start - 1][3] > 0:
+        start -= 1
+    return records[start:end + 1]
+
+
+def breakdown(records):
+    """Tempo próprio (ms) agregado por pacote de topo"""
+    totals = Counter()
+    for name, self_us, _, _ in records:
+        totals[name.split('.')[0]] += self_us / 1000
+    return totals
+
+
+def run_target(target, runs):
+    """Mediana do tempo total (ms), registros da execução mediana e módulos carregados"""
+    samples = []
+    for _ in range(runs):
+        records = measure(target)
+        total = records[-1][2] / 1000
+        samples.append((total, records))
+    samples.sort(key=lambda sample: sample[0])
+    total, records = samples[len(samples) // 2]
+    return total, records, {name for name, _, _, _ in records}
+
+
+def main(argv):
+    args = argv[1:]
+    runs = top = None
+    for flag in ('--runs', '--top'):
+        if flag in args:
+            i = args.index(flag)
+            value = int(args[i + 1])
+            del args[i:i + 2]
+            if flag == '--runs':
+                runs = value
+            else:
+                top = value
+    runs = runs or 5
+    top = top or 8
+    
+    with open(BUDGET_PATH, encoding='utf-8') as f:
+        budgets = json.load(f)
+    targets = args or list(budgets)
+    
+    failed = False
+    for target in targets:
+        budget = budgets.get(target, {})
+        total, records, loaded = run_target(target, runs)
+        max_ms = budget.get('max_ms')
+        
+        status = "ok"
+        if max_ms is not None and total > max_ms:
+            status = f"ERRO: acima do orçamento de {max_ms:.0f} ms"
+            failed = True
+        print(f"{target}: {total:.1f} ms (mediana de {runs}) - {status}")
+        
+        for package, elapsed in breakdown(records).most_common(top):
+            print(f"    {package:<28} {elapsed:8.1f} ms")
+        
+        forbidden = sorted(m for m in budget.get('forbidden', ()) if m in loaded)
+        if forbidden:
+            print(f"    ERRO: carregou módulos que deveriam ser importados sob demanda: {', '.join(forbidden)}")
+            failed = True
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,289 @@
+# benchmarks/bench_suite.py
+"""
+Suíte de benchmarks dos caminhos quentes, de 10 a 1M sub-ativos
+
+Casos:
+    validation  PortfolioValidator.full_portfolio_validation (a partir do dict)
+    currency    format_currency sobre o valor de cada sub-ativo
+    sunburst    ChartBuilder.create_sunburst_chart (cache de figuras limpo)
+    export_csv  CSV Nível/Categoria do DataManager
+    export_json JSON do DataManager
+    editor      processamento da tabela editada do AssetEditor (uma classe)
+
+A velocidade da máquina varia dezenas de % em poucos segundos (VMs com CPU
+compartilhada), então cada tamanho é medido em várias rodadas, alternando os
+casos, e cada bloco de repetições é cercado por uma carga de calibração fixa.
+O score de um caso é a mediana, entre as rodadas, de tempo / calibração; a
+dispersão entre as rodadas dá o ruído daquele caso e tamanho. Os resultados
+(tempo mediano, score e dispersão) podem ser gravados como baseline em
+benchmarks/baseline.json e comparados nas execuções seguintes; a razão exibida
+na comparação é a dos scores.
+
+Uso:
+    python -m benchmarks.bench_suite                     # compara com o baseline
+    python -m benchmarks.bench_suite --save              # grava/atualiza o baseline
+    python -m benchmarks.bench_suite --cases validation,editor --sizes 10,10000
+    python -m benchmarks.bench_suite --rounds 9          # mais rodadas, menos ruído
+
+Falha (código 1) se algum caso ficar mais lento que o baseline além da
+tolerância e além do ruído medido para aquele caso e tamanho.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.generators import SIZES, editor_table, skewed_frame
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Rodadas por tamanho; em cada uma, um bloco de repetições por caso: ao
+# menos uma, até somar MIN_TIME segundos (no máximo MAX_REPEATS)
+DEFAULT_ROUNDS = 5
+MAX_REPEATS = 15
+MIN_TIME = 0.05
+
+# Regressão: score acima de baseline * (1 + tolerância), por mais que
+# NOISE_SPREADS vezes a dispersão medida para o caso e tamanho, e tempo
+# mediano mais lento por mais que NOISE_FLOOR segundos
+DEFAULT_TOLERANCE = 0.3
+NOISE_FLOOR = 0.0005
+NOISE_SPREADS = 3.0
+
+# Execuções da calibração antes e depois de cada bloco
+CALIBRATION_REPEATS = 3
+
+# median: tempo mediano (s); score: mediana de tempo / calibração; spread:
+# dispersão do score entre as rodadas (desvio absoluto mediano escalado
+# para desvio padrão)
+Timing = namedtuple('Timing', ['median', 'score', 'spread'])
+
+
+def _validation(frame, total):
+    from cerrado.engine.validation import PortfolioValidator
+    portfolio = frame.to_dict()
+    return lambda: PortfolioValidator.full_portfolio_validation(portfolio)
+
+
+def _currency(frame, total):
+    from cerrado.engine.formatting import format_currency
+    values = frame.valuate(total).asset_values.tolist()
+    return lambda: [format_currency(value) for value in values]
+
+
+def _sunburst(frame, total):
+    from components import charts
+    builder = charts.ChartBuilder(total)
+    
+    def run():
+        charts._figure_cache.clear()
+        return builder.create_sunburst_chart(frame, top_n=charts.SUNBURST_TOP_N)
+    return run
+
+
+def _export_csv(frame, total):
+    from cerrado.engine.export import collect, iter_level_csv
+    return lambda: collect(iter_level_csv(frame))
+
+
+def _export_json(frame, total):
+    from cerrado.engine.export import EXPORT_BUILDERS
+    return lambda: EXPORT_BUILDERS['json'](frame, total)
+
+
+def _editor(frame, total):
+    from components.asset_editor import process_edits
+    table = editor_table(len(frame))
+    return lambda: process_edits(table, {})
+
+
+# Caso -> preparo(frame, total) que devolve a função medida
+CASES = {
+    'validation': _validation,
+    'currency': _currency,
+    'sunburst': _sunburst,
+    'export_csv': _export_csv,
+    'export_json': _export_json,
+    'editor': _editor,
+}
+
+
+def _calibration():
+    """Carga fixa (numpy e strings em Python, como os casos) que mede a máquina"""
+    values = np.arange(200_000, dtype=np.float64)
+    labels = ",".join([str(i) for i in range(20_000)])
+    return (values * 1.5).sum(), len(labels)
+
+
+def _timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def _calibrate():
+    """Tempo mediano (s) da calibração agora"""
+    return statistics.median(_timed(_calibration) for _ in range(CALIBRATION_REPEATS))
+
+
+def measure(run):
+    """Um bloco de repetições de `run()`: (tempo mediano, calibração), em s
+    
+    As repetições rodam em sequência (caches aquecidos, como no app); a
+    calibração é medida só antes e depois delas.
+    """
+    before = _calibrate()
+    timings = []
+    spent = 0.0
+    while not timings or (len(timings) < MAX_REPEATS and spent < MIN_TIME):
+        elapsed = _timed(run)
+        timings.append(elapsed)
+        spent += elapsed
+    return statistics.median(timings), (before + _calibrate()) / 2
+
+
+def summarize(blocks):
+    """Timing a partir dos blocos (tempo, calibração) das rodadas"""
+    scores = [elapsed / calibration for elapsed, calibration in blocks]
+    score = statistics.median(scores)
+    mad = statistics.median(abs(s - score) for s in scores)
+    return Timing(statistics.median(elapsed for elapsed, _ in blocks), score, 1.4826 * mad)
+
+
+def run_suite(cases, sizes, rounds=DEFAULT_ROUNDS, total=10_000_000.0, out=sys.stdout):
+    """Executa os casos; devolve {caso: {tamanho: Timing}}"""
+    results = {case: {} for case in cases}
+    for size in sizes:
+        frame = skewed_frame(size)
+        runs = {}
+        for case in cases:
+            try:
+                runs[case] = CASES[case](frame, total)
+            except ImportError as e:
+                print(f"{case:<12} {size:>9,}  ignorado ({e})", file=out)
+                continue
+            runs[case]()  # aquecimento
+        
+        # Rodadas alternando os casos: uma fase lenta da máquina atinge
+        # uma rodada de cada caso, não todas as medições de um deles
+        blocks = {case: [] for case in runs}
+        for _ in range(rounds):
+            for case, run in runs.items():
+                blocks[case].append(measure(run))
+        
+        for case in runs:
+            timing = summarize(blocks[case])
+            results[case][str(size)] = timing
+            print(f"{case:<12} {size:>9,}  {timing.median * 1000:10.3f} ms  "
+                  f"score {timing.score:9.4f} ± {timing.spread:.4f}", file=out)
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Grava os resultados, mantendo casos/tamanhos do baseline que não foram medidos"""
+    baseline = load_baseline(path) or {'results': {}}
+    for section in ('score', 'spread'):
+        baseline.setdefault(section, {})
+    for case, timings in results.items():
+        baseline['results'].setdefault(case, {}).update(
+            (size, timing.median) for size, timing in timings.items())
+        baseline['score'].setdefault(case, {}).update(
+            (size, timing.score) for size, timing in timings.items())
+        baseline['spread'].setdefault(case, {}).update(
+            (size, timing.spread) for size, timing in timings.items())
+    baseline['meta'] = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp, path)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, out=sys.stdout):
+    """Imprime a comparação com o baseline; devolve a lista de regressões"""
+    regressions = []
+    scores = baseline.get('score', {})
+    spreads = baseline.get('spread', {})
+    print(f"\n{'caso':<12} {'tamanho':>9}  {'baseline':>12} {'atual':>12} {'razão':>7}", file=out)
+    for case, timings in results.items():
+        for size, timing in timings.items():
+            current = timing.median
+            reference = baseline['results'].get(case, {}).get(size)
+            reference_score = scores.get(case, {}).get(size)
+            if reference is None or reference_score is None:
+                print(f"{case:<12} {int(size):>9,}  {'-':>12} {current * 1000:9.3f} ms", file=out)
+                continue
+            ratio = timing.score / reference_score if reference_score else float('inf')
+            margin = NOISE_SPREADS * max(spreads.get(case, {}).get(size, 0.0), timing.spread)
+            slower = (ratio > 1 + tolerance and timing.score - reference_score > margin
+                      and current - reference > NOISE_FLOOR)
+            if slower:
+                regressions.append((case, size, ratio))
+            print(
+                f"{case:<12} {int(size):>9,}  {reference * 1000:9.3f} ms {current * 1000:9.3f} ms "
+                f"{ratio:6.2f}x{'  REGRESSÃO' if slower else ''}",
+                file=out
+            )
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite")
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help=f"casos separados por vírgula (default: {','.join(CASES)})")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help="quantidades de sub-ativos separadas por vírgula")
+    parser.add_argument('--save', action='store_true', help="grava os resultados como baseline")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="arquivo de baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"lentidão aceita antes de acusar regressão (default: {DEFAULT_TOLERANCE:.0%})")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS,
+                        help=f"rodadas por tamanho (default: {DEFAULT_ROUNDS})")
+    args = parser.parse_args(argv[1:])
+    
+    cases = [case for case in args.cases.split(',') if case]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"casos desconhecidos: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    
+    results = run_suite(cases, sizes, max(args.rounds, 1))
+    
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"\nbaseline gravado em {args.baseline}")
+        return 0
+    
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nsem baseline em {args.baseline} (use --save para gravar um)")
+        return 0
+    
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nERRO: {len(regressions)} caso(s) acima da tolerância de {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,39 @@
+# benchmarks/bench_validators.py
+"""
+Benchmark do validador vetorizado (cerrado.engine.validation.validate_frame)
+
+Uso: python -m benchmarks.bench_validators [n_ativos] [orçamento_s]
+Falha (código 1) se a validação passar do orçamento.
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.generators import skewed_frame
+from cerrado.engine.validation import validate_frame
+
+
+def main(argv):
+    n_assets = int(argv[1]) if len(argv) > 1 else 1_000_000
+    budget = float(argv[2]) if len(argv) > 2 else 0.5
+    frame = skewed_frame(n_assets)
+    
+    validate_frame(frame)  # aquecimento
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        issues = validate_frame(frame)
+        timings.append(time.perf_counter() - start)
+    
+    best = min(timings)
+    print(f"validate_frame: {n_assets:,} ativos em {best * 1000:.1f} ms "
+          f"(mediana {np.median(timings) * 1000:.1f} ms, {issues.size} erros)")
+    if best > budget:
+        print(f"ERRO: acima do orçamento de {budget * 1000:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,66 @@
+# benchmarks/generators.py
+"""
+Portfólios sintéticos para benchmarks: tamanhos de classe com cauda longa
+"""
+import numpy as np
+import pandas as pd
+
+from cerrado.engine.frame import PortfolioFrame
+
+# Tamanhos padrão (quantidade total de sub-ativos)
+SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+DEFAULT_CLASSES = 12
+
+# Expoente da lei de Zipf: a classe k recebe ~1/k^skew dos ativos
+DEFAULT_SKEW = 1.2
+
+
+def class_sizes(n_holdings, n_classes=DEFAULT_CLASSES, skew=DEFAULT_SKEW, seed=0):
+    """Quantidade de sub-ativos por classe (Zipf; toda classe tem ao menos 1 se couber)"""
+    rng = np.random.default_rng(seed)
+    weights = np.arange(1, n_classes + 1, dtype=np.float64) ** -skew
+    weights /= weights.sum()
+    if n_holdings < n_classes:
+        return rng.multinomial(n_holdings, weights)
+    return 1 + rng.multinomial(n_holdings - n_classes, weights)
+
+
+def skewed_frame(n_holdings, n_classes=DEFAULT_CLASSES, skew=DEFAULT_SKEW, seed=0):
+    """
+    Portfólio com n_holdings sub-ativos em classes de tamanhos desiguais
+    
+    As alocações dentro de cada classe também têm cauda longa (Pareto) e
+    somam 100%; a alocação macro soma 100%.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = class_sizes(n_holdings, n_classes, skew, seed)
+    class_ids = np.repeat(np.arange(n_classes, dtype=np.int32), sizes)
+    
+    percents = rng.pareto(1.5, n_holdings) + 0.01
+    sums = np.bincount(class_ids, weights=percents, minlength=n_classes)
+    percents = percents / sums[class_ids] * 100.0
+    
+    macro = rng.dirichlet(np.ones(n_classes)) * 100.0
+    return PortfolioFrame(
+        classes=[f"Classe {i}" for i in range(n_classes)],
+        macro=macro,
+        class_ids=class_ids,
+        assets=np.char.add('ATV', np.arange(n_holdings).astype(str)),
+        percents=percents,
+    )
+
+
+def editor_table(n_rows, seed=0, scale=1.1):
+    """Tabela do data_editor de uma classe com n_rows ativos (soma ≠ 100%, força renormalização)"""
+    rng = np.random.default_rng(seed)
+    percents = rng.pareto(1.5, n_rows) + 0.01
+    percents = percents / percents.sum() * 100.0 * scale
+    return pd.DataFrame({
+        'Ativo': np.char.add('ATV', np.arange(n_rows).astype(str)),
+        'Alocação (%)': percents,
+        'Valor (R$)': percents * 1000.0,
+        'Travado': np.zeros(n_rows, dtype=bool),
+        'Mín (%)': np.zeros(n_rows),
+        'Máx (%)': np.full(n_rows, 100.0),
+    })
@@ -0,0 +1,4 @@
+# cerrado/__init__.py
+"""
+Diagrama do Cerrado - núcleo reutilizável (sem interface)
+"""
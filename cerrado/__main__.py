@@ -0,0 +1,10 @@
+# cerrado/__main__.py
+"""
+python -m cerrado: linha de comando em lote (ver cerrado.cli)
+"""
+import sys
+
+from cerrado.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
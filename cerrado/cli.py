@@ -0,0 +1,318 @@
+# cerrado/cli.py
+"""
+Linha de comando para processar portfólios em lote (sem interface)
+
+Uso:
+    python -m cerrado validate carteiras/
+    python -m cerrado value 'carteiras/**/*.json' --total 250000 -o valores.csv
+    python -m cerrado drift carteiras/ --target modelo.json -o desvios.csv
+    python -m cerrado export carteiras/ --format arrow --out-dir snapshots/   # espelha as subpastas
+
+Os arquivos são distribuídos em blocos (--chunk-size) por um pool de
+processos (--jobs). Cada bloco devolve suas linhas de CSV, gravadas na saída
+consolidada na ordem dos arquivos assim que ficam prontas; o progresso e a
+vazão vão para stderr.
+"""
+import argparse
+import csv
+import glob
+import io
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cerrado.engine.export import EXPORT_BUILDERS, export_payload, iter_app_rows
+from cerrado.engine.frame import PortfolioFrame
+from cerrado.engine.importer import PortfolioImportError, import_portfolio
+from cerrado.engine.rebalance import allocation_drift
+from cerrado.engine.snapshot import SNAPSHOT_EXTENSION, SnapshotError, read_snapshot
+from cerrado.engine.validation import format_issue, validate_frame
+
+DEFAULT_TOTAL = 100000.0
+DEFAULT_CHUNK_SIZE = 32
+
+# Intervalo mínimo entre atualizações da linha de progresso (segundos)
+PROGRESS_EVERY = 0.2
+
+# Cabeçalho da saída consolidada de cada comando
+COLUMNS = {
+    'validate': ['Arquivo', 'Status', 'Mensagem'],
+    'value': ['Arquivo', 'Classe', 'Ativo', 'Alocação (%)', 'Valor (R$)'],
+    'drift': ['Arquivo', 'Nível', 'Classe', 'Ativo', 'Atual (%)', 'Alvo (%)', 'Desvio (p.p.)'],
+    'export': ['Arquivo', 'Saída', 'Bytes'],
+}
+
+# Extensão dos arquivos gerados por `export`, por formato
+EXPORT_EXTENSIONS = {'json': '.json', 'csv': '.csv', 'csv.gz': '.csv.gz', 'arrow': SNAPSHOT_EXTENSION}
+
+
+def find_inputs(patterns):
+    """Expande diretórios (*.json e snapshots, recursivo) e globs, sem repetir arquivos"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for directory, _, names in os.walk(pattern):
+                paths.extend(
+                    os.path.join(directory, name) for name in names
+                    if name.endswith(('.json', SNAPSHOT_EXTENSION))
+                )
+        else:
+            paths.extend(glob.glob(pattern, recursive=True) or [pattern])
+    return sorted(dict.fromkeys(paths))
+
+
+def load(path, total=None):
+    """
+    Lê um portfólio JSON (formato do "Baixar como JSON") ou um snapshot
+    
+    Returns:
+        tuple: (PortfolioFrame, patrimônio); `total` tem precedência sobre o
+        patrimônio gravado no snapshot
+    """
+    if path.endswith(SNAPSHOT_EXTENSION):
+        frame, stored = read_snapshot(path)
+        return frame, total if total is not None else stored
+    with open(path, 'rb') as f:
+        return import_portfolio(f), total
+
+
+def _validate(path, frame, total, options):
+    issues = validate_frame(frame)
+    if not issues.size:
+        return [[path, 'ok', '']]
+    return [[path, 'erro', format_issue(frame, issue)] for issue in issues]
+
+
+def _value(path, frame, total, options):
+    return [[path, *row] for row in iter_app_rows(frame, DEFAULT_TOTAL if total is None else total)]
+
+
+def _drift(path, frame, total, options):
+    rows, turnover = allocation_drift(frame, options['target'])
+    out = [[path, *row] for row in rows]
+    out.append([path, 'Total', '', '', '', '', turnover])
+    return out
+
+
+def export_target(path, root, out_dir, fmt):
+    """Arquivo gerado por `export`: espelha o caminho de `path` relativo a `root`"""
+    name = os.path.relpath(os.path.abspath(path), root)
+    for extension in ('.json', SNAPSHOT_EXTENSION):
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+    return os.path.join(out_dir, name + EXPORT_EXTENSIONS[fmt])
+
+
+def export_collisions(paths, root, out_dir, fmt):
+    """Saídas que seriam geradas por mais de uma entrada: {saída: [entradas]}"""
+    targets = {}
+    for path in paths:
+        targets.setdefault(export_target(path, root, out_dir, fmt), []).append(path)
+    return {output: sources for output, sources in targets.items() if len(sources) > 1}
+
+
+def _export(path, frame, total, options):
+    fmt = options['format']
+    output = export_target(path, options['root'], options['out_dir'], fmt)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    
+    payload = export_payload(fmt, frame, DEFAULT_TOTAL if total is None else total)
+    data = payload.encode('utf-8') if isinstance(payload, str) else payload
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, output)
+    return [[path, output, len(data)]]
+
+
+COMMANDS = {
+    'validate': _validate,
+    'value': _value,
+    'drift': _drift,
+    'export': _export,
+}
+
+
+def process_chunk(command, paths, options):
+    """
+    Processa um bloco de arquivos (executado nos processos do pool)
+    
+    Returns:
+        tuple: (texto CSV das linhas, arquivos, linhas, arquivos com problema,
+        bytes lidos); em `validate`, portfólios com erros contam como problema
+    """
+    handler = COMMANDS[command]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    n_rows = n_failed = n_bytes = 0
+    
+    for path in paths:
+        try:
+            n_bytes += os.path.getsize(path)
+            frame, total = load(path, options.get('total'))
+            rows = handler(path, frame, total, options)
+        except Exception as e:
+            # Qualquer erro vale só para este arquivo; o lote continua
+            n_failed += 1
+            message = str(e) if isinstance(e, (OSError, PortfolioImportError, SnapshotError)) \
+                else f"{type(e).__name__}: {e}"
+            if command != 'validate':
+                print(f"{path}: {message}", file=sys.stderr)
+                continue
+            rows = [[path, 'inválido', message]]
+        else:
+            if command == 'validate' and rows[0][1] != 'ok':
+                n_failed += 1
+        writer.writerows(rows)
+        n_rows += len(rows)
+    
+    return buffer.getvalue(), len(paths), n_rows, n_failed, n_bytes
+
+
+def _chunks(paths, size):
+    for start in range(0, len(paths), size):
+        yield paths[start:start + size]
+
+
+def run(command, paths, options, output, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=sys.stderr):
+    """
+    Executa `command` sobre `paths`, gravando o CSV consolidado em `output`
+    
+    Returns:
+        dict: estatísticas (arquivos, linhas, falhas, bytes, segundos)
+    """
+    stats = {'files': 0, 'rows': 0, 'failed': 0, 'bytes': 0, 'seconds': 0.0}
+    csv.writer(output, lineterminator='\n').writerow(COLUMNS[command])
+    start = time.perf_counter()
+    
+    chunks = list(_chunks(paths, chunk_size))
+    if jobs == 1:
+        results = (process_chunk(command, chunk, options) for chunk in chunks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        # map() devolve os blocos na ordem dos arquivos, à medida que terminam
+        results = executor.map(process_chunk, [command] * len(chunks), chunks,
+                               [options] * len(chunks))
+    
+    last_report = 0.0
+    try:
+        for text, n_files, n_rows, n_failed, n_bytes in results:
+            output.write(text)
+            stats['files'] += n_files
+            stats['rows'] += n_rows
+            stats['failed'] += n_failed
+            stats['bytes'] += n_bytes
+            
+            elapsed = time.perf_counter() - start
+            done = stats['files'] == len(paths)
+            if progress is not None and (done or elapsed - last_report >= PROGRESS_EVERY):
+                last_report = elapsed
+                progress.write(
+                    f"\r[{stats['files']:>{len(str(len(paths)))}}/{len(paths)}] "
+                    f"{stats['files'] / len(paths):6.1%} - "
+                    f"{stats['files'] / elapsed if elapsed else 0:,.0f} arquivos/s"
+                )
+                progress.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def _patrimony(text):
+    """Tipo do --total: valor finito e não negativo (0 é aceito)"""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido: {text!r}")
+    if not (math.isfinite(value) and value >= 0):
+        raise argparse.ArgumentTypeError(f"o patrimônio deve ser finito e não negativo: {text}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m cerrado",
+        description="Processa portfólios exportados pelo Diagrama do Cerrado em lote"
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('inputs', nargs='+', help="arquivos, diretórios ou globs ('**' recursivo)")
+    common.add_argument('-o', '--output', help="CSV consolidado (default: stdout)")
+    common.add_argument('-j', '--jobs', type=int, default=None,
+                        help="processos do pool (default: núcleos da máquina; 1 = sem pool)")
+    common.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"arquivos por bloco enviado a cada processo (default: {DEFAULT_CHUNK_SIZE})")
+    common.add_argument('-q', '--quiet', action='store_true', help="sem progresso em stderr")
+    
+    sub.add_parser('validate', parents=[common], help="valida somas, nomes e valores")
+    
+    value = sub.add_parser('value', parents=[common], help="valor em R$ de cada classe e ativo")
+    value.add_argument('--total', type=_patrimony, default=None,
+                       help=f"patrimônio total (default: o do snapshot ou {DEFAULT_TOTAL:,.0f})")
+    
+    drift = sub.add_parser('drift', parents=[common], help="desvio em relação a uma carteira modelo")
+    drift.add_argument('--target', required=True, help="portfólio de referência (JSON ou snapshot)")
+    
+    export = sub.add_parser('export', parents=[common], help="converte cada portfólio para outro formato")
+    export.add_argument('--format', choices=sorted(EXPORT_BUILDERS), default='csv')
+    export.add_argument('--out-dir', required=True, help="diretório dos arquivos gerados")
+    export.add_argument('--total', type=_patrimony, default=None,
+                        help=f"patrimônio total (default: o do snapshot ou {DEFAULT_TOTAL:,.0f})")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    paths = find_inputs(args.inputs)
+    if not paths:
+        print("nenhum arquivo encontrado", file=sys.stderr)
+        return 2
+    
+    options = {'total': getattr(args, 'total', None)}
+    if args.command == 'drift':
+        try:
+            options['target'], _ = load(args.target)
+        except (OSError, PortfolioImportError, SnapshotError) as e:
+            print(f"{args.target}: {e}", file=sys.stderr)
+            return 2
+    elif args.command == 'export':
+        # Saídas espelham as entradas a partir do diretório comum a todas
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+        collisions = export_collisions(paths, root, args.out_dir, args.format)
+        if collisions:
+            for output, sources in sorted(collisions.items()):
+                print(f"{output}: gerado por {', '.join(sources)}", file=sys.stderr)
+            print("saídas em conflito; nada foi exportado", file=sys.stderr)
+            return 2
+        os.makedirs(args.out_dir, exist_ok=True)
+        options.update(format=args.format, out_dir=args.out_dir, root=root)
+    
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        stats = run(args.command, paths, options, output, jobs=args.jobs,
+                    chunk_size=max(1, args.chunk_size),
+                    progress=None if args.quiet else sys.stderr)
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: `| head`): encerra sem traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if args.output:
+            output.close()
+    
+    if not args.quiet:
+        seconds = stats['seconds'] or 1e-9
+        print(
+            f"\n{stats['files']:,} arquivos ({stats['bytes'] / 1e6:,.1f} MB), "
+            f"{stats['rows']:,} linhas, {stats['failed']:,} com problemas em {seconds:.2f} s - "
+            f"{stats['files'] / seconds:,.0f} arquivos/s, {stats['bytes'] / 1e6 / seconds:,.1f} MB/s",
+            file=sys.stderr
+        )
+    return 0 if stats['failed'] == 0 else 1
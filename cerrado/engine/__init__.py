@@ -0,0 +1,63 @@
+# cerrado/engine/__init__.py
+"""
+Motor de cálculo do Diagrama do Cerrado: árvore de alocação, valoração,
+validação, normalização, rebalanceamento e exportação
+
+Não depende de Streamlit nem de Plotly. Os submódulos são importados sob
+demanda: `import cerrado.engine` não carrega NumPy até o primeiro uso.
+"""
+import importlib
+
+# Nome público -> submódulo que o define
+_EXPORTS = {
+    # frame
+    'PortfolioFrame': 'frame',
+    'Valuation': 'frame',
+    # validation
+    'ISSUE_DTYPE': 'validation',
+    'PortfolioValidator': 'validation',
+    'format_issue': 'validation',
+    'validate_frame': 'validation',
+    'validate_percentage_sum': 'validation',
+    'validate_portfolio': 'validation',
+    # normalization
+    'NormalizationError': 'normalization',
+    'constraint_arrays': 'normalization',
+    'equal_allocation': 'normalization',
+    'normalize_allocation': 'normalization',
+    'project_simplex': 'normalization',
+    # rebalance
+    'RebalancePlan': 'rebalance',
+    'allocation_drift': 'rebalance',
+    'allocate_contribution': 'rebalance',
+    'include_holdings': 'rebalance',
+    'plan_rebalance': 'rebalance',
+    'target_weights': 'rebalance',
+    # summary / formatting
+    'summary_rows': 'summary',
+    'format_currency': 'formatting',
+    'format_percentage': 'formatting',
+    # importer / snapshot / export
+    'PortfolioImportError': 'importer',
+    'import_portfolio': 'importer',
+    'SnapshotError': 'snapshot',
+    'read_snapshot': 'snapshot',
+    'write_snapshot': 'snapshot',
+    'deferred_export': 'export',
+    'export_payload': 'export',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # próximas consultas não passam por aqui
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
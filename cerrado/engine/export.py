@@ -0,0 +1,143 @@
+# cerrado/engine/export.py
+"""
+Exportação do portfólio em streaming (CSV em blocos, gzip opcional)
+"""
+import csv
+import io
+import json
+import zlib
+
+from cerrado.engine.memo import MemoryLRU
+from cerrado.engine.snapshot import snapshot_bytes
+
+
+# Layout da aba Exportar (app.py)
+APP_CSV_COLUMNS = ["Classe", "Ativo", "Alocação (%)", "Valor (R$)"]
+
+# Layout do relatório do DataManager
+LEVEL_CSV_COLUMNS = ['Nível', 'Categoria', 'Ativo', 'Alocação (%)', 'Porcentagem do Total']
+
+# Linhas por bloco de CSV emitido
+CHUNK_ROWS = 5000
+
+# Payloads prontos mantidos em memória (compartilhados entre sessões)
+EXPORT_CACHE_ENTRIES = 16
+
+
+def _class_blocks(frame, class_idx, chunk_rows):
+    """Fatias de linhas de uma classe, em blocos de até chunk_rows"""
+    start, end = int(frame.offsets[class_idx]), int(frame.offsets[class_idx + 1])
+    for block_start in range(start, end, chunk_rows):
+        yield slice(block_start, min(block_start + chunk_rows, end))
+
+
+def iter_app_rows(frame, total_patrimony, chunk_rows=CHUNK_ROWS):
+    """Linhas do layout Classe/Ativo: cada classe seguida dos seus sub-ativos"""
+    valuation = frame.valuate(total_patrimony)
+    macro = frame.macro.tolist()
+    class_values = valuation.class_values.tolist()
+    
+    for idx, asset_class in enumerate(frame.classes):
+        if not frame.in_macro[idx]:
+            continue
+        yield [asset_class, "", macro[idx], class_values[idx]]
+        for rows in _class_blocks(frame, idx, chunk_rows):
+            yield from zip(
+                [""] * (rows.stop - rows.start),
+                frame.assets[rows].tolist(),
+                frame.percents[rows].tolist(),
+                valuation.asset_values[rows].tolist()
+            )
+
+
+def iter_level_rows(frame, chunk_rows=CHUNK_ROWS):
+    """Linhas do layout Nível/Categoria do DataManager"""
+    valuation = frame.valuate(0.0)
+    macro = frame.macro.tolist()
+    
+    for idx, asset_class in enumerate(frame.classes):
+        if not frame.in_macro[idx]:
+            continue
+        yield ['Classe', asset_class, asset_class, macro[idx], macro[idx]]
+        for rows in _class_blocks(frame, idx, chunk_rows):
+            n_rows = rows.stop - rows.start
+            yield from zip(
+                ['Sub-ativo'] * n_rows,
+                [asset_class] * n_rows,
+                frame.assets[rows].tolist(),
+                frame.percents[rows].tolist(),
+                valuation.asset_shares[rows].tolist()
+            )
+
+
+def iter_csv(rows, columns, chunk_rows=CHUNK_ROWS):
+    """Converte linhas em blocos de texto CSV (cabeçalho no primeiro bloco)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_app_csv(frame, total_patrimony, chunk_rows=CHUNK_ROWS):
+    """CSV da aba Exportar, em blocos"""
+    return iter_csv(iter_app_rows(frame, total_patrimony, chunk_rows), APP_CSV_COLUMNS, chunk_rows)
+
+
+def iter_level_csv(frame, chunk_rows=CHUNK_ROWS):
+    """CSV do relatório do DataManager, em blocos"""
+    return iter_csv(iter_level_rows(frame, chunk_rows), LEVEL_CSV_COLUMNS, chunk_rows)
+
+
+def iter_gzip(chunks, encoding='utf-8', level=6):
+    """Compacta blocos de texto em gzip, também em streaming"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode(encoding))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def collect(chunks, gzip=False):
+    """Junta os blocos num único payload (str, ou bytes se gzip)"""
+    if gzip:
+        return b"".join(iter_gzip(chunks))
+    return "".join(chunks)
+
+
+def _json_payload(frame, total_patrimony):
+    return json.dumps(frame.to_dict(), indent=2, ensure_ascii=False)
+
+
+# Formatos de exportação: nome -> builder(frame, total_patrimony)
+EXPORT_BUILDERS = {
+    'json': _json_payload,
+    'csv': lambda frame, total: collect(iter_app_csv(frame, total)),
+    'csv.gz': lambda frame, total: collect(iter_app_csv(frame, total), gzip=True),
+    'arrow': snapshot_bytes,
+}
+
+_export_cache = MemoryLRU(max_entries=EXPORT_CACHE_ENTRIES)
+
+
+def export_payload(fmt, frame, total_patrimony):
+    """Payload de exportação, memoizado pelo hash do conteúdo + patrimônio"""
+    key = (fmt, frame.content_hash(), float(total_patrimony))
+    return _export_cache.get_or_build(key, lambda: EXPORT_BUILDERS[fmt](frame, total_patrimony))
+
+
+def deferred_export(fmt, frame, total_patrimony):
+    """Callable sem argumentos que gera o payload só quando chamado"""
+    return lambda: export_payload(fmt, frame, total_patrimony)
\ No newline at end of file
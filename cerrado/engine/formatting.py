@@ -0,0 +1,21 @@
+# cerrado/engine/formatting.py
+"""
+Formatação de valores para relatórios e interface
+"""
+
+
+def format_currency(value):
+    """Formata valor monetário"""
+    if value >= 1_000_000_000:
+        return f'R$ {value/1_000_000_000:.2f}B'
+    elif value >= 1_000_000:
+        return f'R$ {value/1_000_000:.2f}M'
+    elif value >= 1_000:
+        return f'R$ {value/1_000:.1f}K'
+    else:
+        return f'R$ {value:,.2f}'
+
+
+def format_percentage(value):
+    """Formata porcentagem"""
+    return f'{value:.2f}%'
@@ -0,0 +1,143 @@
+# cerrado/engine/frame.py
+"""
+Modelo colunar do portfólio, apoiado em arrays NumPy
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+import numpy as np
+
+
+Valuation = namedtuple('Valuation', [
+    'class_values',   # valor em R$ de cada classe
+    'asset_values',   # valor em R$ de cada sub-ativo
+    'asset_shares',   # % de cada sub-ativo sobre o patrimônio total
+    'class_sums',     # soma das % de sub-ativos de cada classe
+    'class_counts',   # quantidade de sub-ativos por classe
+])
+
+
+class PortfolioFrame:
+    """Portfólio em formato colunar: uma linha por sub-ativo
+
+    As classes ficam em `classes`/`macro` (uma posição por classe) e os
+    sub-ativos em `class_ids`/`assets`/`percents`, agrupados por classe na
+    mesma ordem de `classes`. `offsets[i]:offsets[i + 1]` delimita as
+    linhas da classe `i`.
+    """
+
+    def __init__(self, classes, macro, class_ids, assets, percents,
+                 in_macro=None, has_sub=None):
+        self.classes = list(classes)
+        self.macro = np.asarray(macro, dtype=np.float64)
+
+        class_ids = np.asarray(class_ids, dtype=np.int32)
+        assets = np.asarray(assets, dtype=str)
+        percents = np.asarray(percents, dtype=np.float64)
+
+        # Garante linhas agrupadas por classe (ordenação estável)
+        if class_ids.size and np.any(class_ids[1:] < class_ids[:-1]):
+            order = np.argsort(class_ids, kind='stable')
+            class_ids, assets, percents = class_ids[order], assets[order], percents[order]
+
+        self.class_ids = class_ids
+        self.assets = assets
+        self.percents = percents
+
+        n_classes = len(self.classes)
+        self.counts = np.bincount(class_ids, minlength=n_classes)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+
+        # Flags para reconstruir exatamente o dict original
+        self.in_macro = (np.ones(n_classes, dtype=bool) if in_macro is None
+                         else np.asarray(in_macro, dtype=bool))
+        self.has_sub = (self.counts > 0 if has_sub is None
+                        else np.asarray(has_sub, dtype=bool))
+        self._content_hash = None
+
+    def __len__(self):
+        return int(self.percents.size)
+
+    @classmethod
+    def from_dict(cls, portfolio):
+        """Cria o frame a partir do formato {'macro': {...}, 'sub': {...}}"""
+        macro = portfolio.get('macro', {})
+        sub = portfolio.get('sub', {})
+
+        classes = list(macro)
+        # Classes que só existem em 'sub' entram no final, sem alocação macro
+        classes.extend(c for c in sub if c not in macro)
+        index = {name: i for i, name in enumerate(classes)}
+
+        assets, percents, counts = [], [], np.zeros(len(classes), dtype=np.int64)
+        has_sub = np.zeros(len(classes), dtype=bool)
+        for asset_class in classes:
+            sub_assets = sub.get(asset_class)
+            if sub_assets is None:
+                continue
+            i = index[asset_class]
+            has_sub[i] = True
+            counts[i] = len(sub_assets)
+            assets.extend(sub_assets.keys())
+            percents.extend(sub_assets.values())
+
+        return cls(
+            classes=classes,
+            macro=[float(macro.get(c, 0.0)) for c in classes],
+            class_ids=np.repeat(np.arange(len(classes), dtype=np.int32), counts),
+            assets=assets,
+            percents=percents,
+            in_macro=[c in macro for c in classes],
+            has_sub=has_sub,
+        )
+
+    def to_dict(self):
+        """Converte de volta para o formato dict/JSON do session_state"""
+        macro_values = self.macro.tolist()
+        assets = self.assets.tolist()
+        percents = self.percents.tolist()
+        offsets = self.offsets.tolist()
+
+        macro, sub = {}, {}
+        for i, asset_class in enumerate(self.classes):
+            if self.in_macro[i]:
+                macro[asset_class] = macro_values[i]
+            if self.has_sub[i]:
+                start, end = offsets[i], offsets[i + 1]
+                sub[asset_class] = dict(zip(assets[start:end], percents[start:end]))
+
+        return {'macro': macro, 'sub': sub}
+
+    def content_hash(self):
+        """Hash do conteúdo (classes, alocações e sub-ativos), calculado uma vez"""
+        if self._content_hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(json.dumps(self.classes, ensure_ascii=False).encode())
+            for values in (self.macro, self.in_macro, self.has_sub,
+                           self.class_ids, self.percents, self.assets):
+                digest.update(values.dtype.str.encode())
+                digest.update(np.ascontiguousarray(values).tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+    
+    def class_slice(self, class_idx):
+        """Intervalo de linhas dos sub-ativos de uma classe"""
+        return slice(int(self.offsets[class_idx]), int(self.offsets[class_idx + 1]))
+
+    def valuate(self, total_patrimony):
+        """Calcula valores, participações e somas por classe numa só passada"""
+        class_values = total_patrimony * (self.macro / 100.0)
+        asset_factor = self.percents / 100.0
+        asset_values = class_values[self.class_ids] * asset_factor
+        asset_shares = self.macro[self.class_ids] * asset_factor
+        class_sums = np.bincount(self.class_ids, weights=self.percents,
+                                 minlength=len(self.classes))
+
+        return Valuation(
+            class_values=class_values,
+            asset_values=asset_values,
+            asset_shares=asset_shares,
+            class_sums=class_sums,
+            class_counts=self.counts,
+        )
@@ -0,0 +1,265 @@
+# cerrado/engine/importer.py
+"""
+Importação incremental de portfólios JSON (formato exportado pela aba Exportar)
+"""
+import json
+import math
+from array import array
+
+import numpy as np
+
+from cerrado.engine.frame import PortfolioFrame
+
+try:
+    import ijson
+    IJSON_OK = True
+except ImportError:
+    IJSON_OK = False
+
+
+# Intervalo (em bytes lidos) entre chamadas do callback de progresso
+PROGRESS_EVERY = 256 * 1024
+
+
+class PortfolioImportError(ValueError):
+    """Erro estrutural no arquivo importado, com o caminho do elemento"""
+    
+    def __init__(self, message, path=""):
+        super().__init__(f"{path}: {message}" if path else message)
+        self.path = path
+
+
+class _ProgressReader:
+    """Envolve o arquivo e informa quantos bytes já foram lidos"""
+    
+    def __init__(self, fileobj, progress, total_bytes):
+        self.fileobj = fileobj
+        self.progress = progress
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self._next_report = PROGRESS_EVERY
+    
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.bytes_read += len(data)
+        if self.progress is not None and (not data or self.bytes_read >= self._next_report):
+            self.progress(self.bytes_read, self.total_bytes)
+            self._next_report = self.bytes_read + PROGRESS_EVERY
+        return data
+
+
+def _dict_events(value):
+    """Eventos no formato do ijson.basic_parse a partir de um objeto já lido"""
+    if isinstance(value, dict):
+        yield 'start_map', None
+        for key, item in value.items():
+            yield 'map_key', key
+            yield from _dict_events(item)
+        yield 'end_map', None
+    elif isinstance(value, list):
+        yield 'start_array', None
+        for item in value:
+            yield from _dict_events(item)
+        yield 'end_array', None
+    elif value is None:
+        yield 'null', None
+    elif isinstance(value, bool):
+        yield 'boolean', value
+    elif isinstance(value, (int, float)):
+        yield 'number', value
+    else:
+        yield 'string', value
+
+
+def _events(reader):
+    if IJSON_OK:
+        return ijson.basic_parse(reader, use_float=True)
+    # Sem ijson: lê tudo de uma vez, mas mantém a mesma validação
+    return _dict_events(json.load(reader))
+
+
+def _path(*parts):
+    return ".".join(str(p) for p in parts if p != "")
+
+
+class _Builder:
+    """Acumula classes e sub-ativos direto em arrays do PortfolioFrame"""
+    
+    def __init__(self):
+        self.classes = []
+        self.index = {}
+        self.macro = []
+        self.in_macro = []
+        self.macro_order = []
+        self.has_sub = []
+        self.class_ids = array('i')
+        self.assets = []
+        self.percents = array('d')
+    
+    def class_idx(self, name):
+        idx = self.index.get(name)
+        if idx is None:
+            idx = self.index[name] = len(self.classes)
+            self.classes.append(name)
+            self.macro.append(0.0)
+            self.in_macro.append(False)
+            self.has_sub.append(False)
+        return idx
+    
+    def frame(self):
+        # Mesma ordem de PortfolioFrame.from_dict: classes na ordem de
+        # 'macro', depois as que só aparecem em 'sub'
+        n = len(self.classes)
+        order = self.macro_order + [i for i in range(n) if not self.in_macro[i]]
+        class_ids = np.asarray(self.class_ids, dtype=np.int32)
+        if order != list(range(n)):
+            remap = np.empty(n, dtype=np.int32)
+            remap[order] = np.arange(n, dtype=np.int32)
+            class_ids = remap[class_ids]
+        
+        return PortfolioFrame(
+            classes=[self.classes[i] for i in order],
+            macro=[self.macro[i] for i in order],
+            class_ids=class_ids,
+            assets=self.assets,
+            percents=self.percents,
+            in_macro=[self.in_macro[i] for i in order],
+            has_sub=[self.has_sub[i] for i in order],
+        )
+
+
+def _next(events, path):
+    try:
+        return next(events)
+    except StopIteration:
+        raise PortfolioImportError("arquivo terminou antes do esperado", path) from None
+
+
+def _expect_map(events, path):
+    event, _ = _next(events, path)
+    if event != 'start_map':
+        raise PortfolioImportError("esperado um objeto {...}", path)
+
+
+def _read_number(events, path):
+    event, value = _next(events, path)
+    if event != 'number':
+        raise PortfolioImportError("esperado um número", path)
+    value = float(value)
+    if not math.isfinite(value):
+        raise PortfolioImportError("número inválido", path)
+    return value
+
+
+def _read_key(event, value, path):
+    if event != 'map_key':
+        raise PortfolioImportError("estrutura inválida", path)
+    if not isinstance(value, str) or not value.strip():
+        raise PortfolioImportError("nome vazio", path)
+    return value
+
+
+def _skip_value(events, path):
+    depth = 0
+    while True:
+        event, _ = _next(events, path)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _read_macro(events, builder):
+    _expect_map(events, 'macro')
+    while True:
+        event, value = _next(events, 'macro')
+        if event == 'end_map':
+            return
+        asset_class = _read_key(event, value, 'macro')
+        path = _path('macro', asset_class)
+        idx = builder.class_idx(asset_class)
+        if builder.in_macro[idx]:
+            raise PortfolioImportError("classe duplicada", path)
+        builder.macro[idx] = _read_number(events, path)
+        builder.in_macro[idx] = True
+        builder.macro_order.append(idx)
+
+
+def _read_sub(events, builder):
+    _expect_map(events, 'sub')
+    while True:
+        event, value = _next(events, 'sub')
+        if event == 'end_map':
+            return
+        asset_class = _read_key(event, value, 'sub')
+        class_path = _path('sub', asset_class)
+        idx = builder.class_idx(asset_class)
+        if builder.has_sub[idx]:
+            raise PortfolioImportError("classe duplicada", class_path)
+        builder.has_sub[idx] = True
+        
+        _expect_map(events, class_path)
+        seen = set()
+        while True:
+            event, value = _next(events, class_path)
+            if event == 'end_map':
+                break
+            asset = _read_key(event, value, class_path)
+            path = _path(class_path, asset)
+            if asset in seen:
+                raise PortfolioImportError("ativo duplicado", path)
+            seen.add(asset)
+            percent = _read_number(events, path)
+            builder.class_ids.append(idx)
+            builder.assets.append(asset)
+            builder.percents.append(percent)
+
+
+def import_portfolio(fileobj, progress=None, total_bytes=None):
+    """
+    Lê um portfólio JSON em streaming, validando cada classe e ativo
+    
+    Args:
+        fileobj: arquivo binário ou texto aberto
+        progress: callback opcional `progress(bytes_lidos, total_bytes)`
+        total_bytes: tamanho do arquivo, repassado ao callback
+    
+    Returns:
+        PortfolioFrame: portfólio importado
+    
+    Raises:
+        PortfolioImportError: no primeiro erro estrutural encontrado
+    """
+    reader = _ProgressReader(fileobj, progress, total_bytes)
+    builder = _Builder()
+    found = set()
+    
+    try:
+        events = iter(_events(reader))
+        _expect_map(events, "")
+        while True:
+            event, key = _next(events, "")
+            if event == 'end_map':
+                break
+            if key == 'macro':
+                _read_macro(events, builder)
+            elif key == 'sub':
+                _read_sub(events, builder)
+            else:
+                _skip_value(events, key)
+            found.add(key)
+    except PortfolioImportError:
+        raise
+    except Exception as e:
+        # JSON malformado (ijson.JSONError / json.JSONDecodeError)
+        raise PortfolioImportError(f"JSON inválido perto do byte {reader.bytes_read}: {e}") from e
+    
+    missing = {'macro', 'sub'} - found
+    if missing:
+        raise PortfolioImportError(f"chave obrigatória ausente: {', '.join(sorted(missing))}")
+    
+    if progress is not None:
+        progress(reader.bytes_read, total_bytes)
+    return builder.frame()
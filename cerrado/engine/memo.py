@@ -0,0 +1,40 @@
+# cerrado/engine/memo.py
+"""
+Cache em memória (LRU) usado pelos cálculos do motor
+"""
+import threading
+from collections import Counter, OrderedDict
+
+
+class MemoryLRU:
+    """Cache em memória do processo, com tamanho limitado (LRU)"""
+    
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def get_or_build(self, key, build):
+        """Retorna o valor da chave ou o constrói com `build()`"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.stats['hit'] += 1
+                return self._data[key]
+            self.stats['miss'] += 1
+        
+        value = build()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,151 @@
+# cerrado/engine/normalization.py
+"""
+Normalização com restrições: projeção no simplex com travas e limites por entrada
+"""
+import numpy as np
+
+
+# Restrição padrão de uma entrada: (travada, mínimo, máximo)
+DEFAULT_CONSTRAINT = (False, 0.0, 100.0)
+
+
+class NormalizationError(ValueError):
+    """Travas e limites incompatíveis com o total desejado"""
+
+
+def project_simplex(values, total=100.0, lower=None, upper=None, locked=None, tolerance=1e-9):
+    """
+    Projeta valores em {x : sum(x) = total, lower <= x <= upper}
+    
+    Entradas travadas mantêm o valor atual; as demais recebem
+    x_i = clip(v_i - tau, lower_i, upper_i), o ponto mais próximo (distância
+    euclidiana) que respeita as restrições. tau sai de uma varredura pelos 2n
+    pontos de quebra ordenados: O(n log n).
+    
+    Args:
+        values: valores atuais
+        total: soma desejada (default: 100)
+        lower: mínimo por entrada, escalar ou array (default: 0)
+        upper: máximo por entrada, escalar ou array (default: total)
+        locked: máscara das entradas travadas (default: nenhuma)
+        tolerance: folga numérica na checagem de viabilidade
+    
+    Returns:
+        np.ndarray: valores projetados
+    
+    Raises:
+        NormalizationError: se nenhuma solução respeita travas e limites
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = values.size
+    lower = np.broadcast_to(np.asarray(0.0 if lower is None else lower, dtype=np.float64), (n,))
+    upper = np.broadcast_to(np.asarray(total if upper is None else upper, dtype=np.float64), (n,))
+    locked = np.zeros(n, dtype=bool) if locked is None else np.asarray(locked, dtype=bool)
+    
+    result = values.copy()
+    free = ~locked
+    remaining = total - values[locked].sum()
+    x, lo, hi = values[free], lower[free], upper[free]
+    
+    if np.any(lo > hi):
+        raise NormalizationError("Mínimo maior que o máximo em alguma entrada")
+    if lo.sum() > remaining + tolerance or hi.sum() < remaining - tolerance:
+        raise NormalizationError(
+            f"Travas e limites não permitem somar {total:g} "
+            f"(livre: {remaining:.2f}, mínimos: {lo.sum():.2f}, máximos: {hi.sum():.2f})"
+        )
+    if x.size == 0:
+        return result
+    
+    # Nenhuma entrada passa do que sobra após os mínimos das demais
+    hi = np.minimum(hi, remaining - (lo.sum() - lo))
+    
+    # g(tau) = sum(clip(x - tau, lo, hi)) é linear por partes e não crescente;
+    # cada entrada fica "ativa" (inclinação -1) entre x - hi e x - lo
+    breakpoints = np.concatenate((x - hi, x - lo))
+    steps = np.concatenate((np.ones(x.size), -np.ones(x.size)))
+    order = np.argsort(breakpoints, kind='stable')
+    breakpoints, steps = breakpoints[order], steps[order]
+    
+    active = np.cumsum(steps)[:-1]
+    g = hi.sum() - np.concatenate(([0.0], np.cumsum(active * np.diff(breakpoints))))
+    
+    # Primeiro ponto de quebra em que g fica <= remaining; interpola no trecho anterior
+    k = int(np.searchsorted(-g, -remaining, side='left'))
+    if k == 0:
+        tau = breakpoints[0]
+    elif k >= g.size:
+        tau = breakpoints[-1]
+    else:
+        slope = active[k - 1]
+        tau = breakpoints[k - 1] + ((g[k - 1] - remaining) / slope if slope > 0 else 0.0)
+    
+    result[free] = np.clip(x - tau, lo, hi)
+    return result
+
+
+def constraint_arrays(names, constraints=None):
+    """
+    Restrições em colunas, na ordem de `names`
+    
+    Args:
+        names: nomes das entradas
+        constraints: {nome: (travada, mínimo, máximo)}; ausentes usam DEFAULT_CONSTRAINT
+    
+    Returns:
+        tuple: arrays (locked, lower, upper)
+    """
+    constraints = constraints or {}
+    rules = [constraints.get(name, DEFAULT_CONSTRAINT) for name in names]
+    if not rules:
+        return np.zeros(0, dtype=bool), np.zeros(0), np.zeros(0)
+    locked, lower, upper = zip(*rules)
+    return (np.array(locked, dtype=bool),
+            np.array(lower, dtype=np.float64),
+            np.array(upper, dtype=np.float64))
+
+
+def normalize_allocation(allocation, constraints=None, total=100.0, values=None):
+    """
+    Normaliza um dict {nome: %} para somar `total` respeitando as restrições
+    
+    Sem travas nem limites ativos, reescala proporcionalmente (ativos
+    pequenos continuam pequenos, não zerados); com restrições, usa a
+    projeção de project_simplex.
+    
+    Args:
+        allocation: {nome: porcentagem}
+        constraints: {nome: (travada, mínimo, máximo)}; ausentes usam DEFAULT_CONSTRAINT
+        total: soma desejada (default: 100)
+        values: valores de partida no lugar dos de `allocation` (ex.: pesos iguais)
+    
+    Returns:
+        dict: {nome: porcentagem} na mesma ordem
+    
+    Raises:
+        NormalizationError: se as restrições forem incompatíveis
+    """
+    names = list(allocation)
+    if not names:
+        return {}
+    locked, lower, upper = constraint_arrays(names, constraints)
+    
+    current = np.fromiter(allocation.values(), dtype=np.float64, count=len(names))
+    start = current if values is None else np.where(locked, current, values)
+    
+    unconstrained = not locked.any() and np.all(lower <= 0) and np.all(upper >= total)
+    start_total = start.sum()
+    if unconstrained and np.all(start >= 0) and start_total > 0:
+        return dict(zip(names, (start * (total / start_total)).tolist()))
+    
+    projected = project_simplex(start, total=total, lower=lower, upper=upper, locked=locked)
+    return dict(zip(names, projected.tolist()))
+
+
+def equal_allocation(allocation, constraints=None, total=100.0):
+    """Pesos iguais entre as entradas livres, respeitando travas e limites"""
+    n = len(allocation)
+    if n == 0:
+        return {}
+    return normalize_allocation(allocation, constraints, total,
+                                values=np.full(n, total / n))
@@ -0,0 +1,320 @@
+# cerrado/engine/rebalance.py
+"""
+Rebalanceamento: lista de ordens de compra/venda para atingir a alocação alvo
+"""
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+from cerrado.engine.frame import PortfolioFrame
+
+
+# Ordem sobre um sub-ativo: quantity > 0 compra, < 0 venda (múltiplo do lote)
+ORDER_DTYPE = np.dtype([
+    ('row', np.int64),          # linha do sub-ativo no PortfolioFrame
+    ('quantity', np.float64),
+    ('price', np.float64),
+    ('value', np.float64),      # quantity * price
+])
+
+# Também usado pelo aporte (allocate_contribution), só com compras
+RebalancePlan = namedtuple('RebalancePlan', [
+    'orders',         # registros ORDER_DTYPE: vendas primeiro, maiores valores antes
+    'cash',           # caixa após executar as ordens
+    'total',          # patrimônio considerado (posições + caixa)
+    'drift_before',   # desvio de cada linha em p.p. (peso atual - alvo)
+    'drift_after',    # desvio de cada linha após as ordens
+])
+
+
+def target_weights(frame):
+    """Peso-alvo de cada sub-ativo, em % do patrimônio total"""
+    return frame.macro[frame.class_ids] * frame.percents / 100.0
+
+
+def _row_keys(frame):
+    class_names = np.asarray(frame.classes, dtype=object)[frame.class_ids].tolist()
+    return list(zip(class_names, frame.assets.tolist()))
+
+
+def include_holdings(frame, positions):
+    """
+    Acrescenta ao frame-alvo as posições em carteira que não estão nele
+    
+    Cada posição com quantidade > 0 fora do alvo vira uma linha com alvo 0%
+    na sua classe (classes fora do alvo entram sem alocação macro): ela
+    conta no patrimônio e plan_rebalance a vende.
+    
+    Args:
+        frame: PortfolioFrame com a alocação alvo
+        positions: {(classe, ativo): (quantidade, preço[, lote])}
+    
+    Returns:
+        tuple: (PortfolioFrame, máscara das linhas acrescentadas); sem
+        posições de fora, o próprio frame
+    """
+    known = set(_row_keys(frame))
+    extra = [key for key, position in positions.items()
+             if key not in known and position[0] > 0]
+    if not extra:
+        return frame, np.zeros(len(frame), dtype=bool)
+    
+    classes = list(frame.classes)
+    macro = frame.macro.tolist()
+    in_macro = frame.in_macro.tolist()
+    has_sub = frame.has_sub.tolist()
+    index = {name: i for i, name in enumerate(classes)}
+    for asset_class, _ in extra:
+        if asset_class not in index:
+            index[asset_class] = len(classes)
+            classes.append(asset_class)
+            macro.append(0.0)
+            in_macro.append(False)
+            has_sub.append(False)
+        has_sub[index[asset_class]] = True
+    
+    class_ids = np.concatenate((frame.class_ids, [index[c] for c, _ in extra])).astype(np.int32)
+    assets = np.concatenate((frame.assets.astype(object), [a for _, a in extra]))
+    percents = np.concatenate((frame.percents, np.zeros(len(extra))))
+    added = np.concatenate((np.zeros(len(frame), dtype=bool), np.ones(len(extra), dtype=bool)))
+    
+    # Linhas agrupadas por classe, como o PortfolioFrame espera
+    order = np.argsort(class_ids, kind='stable')
+    extended = PortfolioFrame(classes, macro, class_ids[order], assets[order].tolist(),
+                              percents[order], in_macro=in_macro, has_sub=has_sub)
+    return extended, added[order]
+
+
+def align_positions(frame, positions):
+    """
+    Alinha posições às linhas do frame
+    
+    Posições fora do frame são ignoradas; para vendê-las, passe antes o
+    frame por include_holdings.
+    
+    Args:
+        frame: PortfolioFrame com a alocação alvo
+        positions: {(classe, ativo): (quantidade, preço[, lote])}
+    
+    Returns:
+        tuple: arrays (quantities, prices, lot_sizes); linhas sem posição
+        ficam com quantidade 0, preço NaN e lote 1
+    """
+    n = len(frame)
+    quantities = np.zeros(n)
+    prices = np.full(n, np.nan)
+    lot_sizes = np.ones(n)
+    
+    for row, key in enumerate(_row_keys(frame)):
+        position = positions.get(key)
+        if position is None:
+            continue
+        quantities[row] = position[0]
+        prices[row] = position[1]
+        if len(position) > 2:
+            lot_sizes[row] = position[2]
+    
+    return quantities, prices, lot_sizes
+
+
+def _lot_values(prices, lot_sizes):
+    """Valor de um lote por linha; 0 onde não é possível negociar"""
+    lot_values = prices * lot_sizes
+    tradable = np.isfinite(lot_values) & (prices > 0) & (lot_sizes > 0)
+    return np.where(tradable, lot_values, 0.0), tradable
+
+
+def _orders(rows, n_lots, lot_sizes, prices):
+    """Monta os registros de ordem: vendas primeiro, maiores valores antes"""
+    quantity = n_lots[rows] * lot_sizes[rows]
+    value = quantity * prices[rows]
+    order = np.lexsort((-np.abs(value), value > 0))
+    
+    records = np.empty(rows.size, dtype=ORDER_DTYPE)
+    records['row'] = rows[order]
+    records['quantity'] = quantity[order]
+    records['price'] = prices[rows][order]
+    records['value'] = value[order]
+    return records
+
+
+def plan_rebalance(frame, quantities, prices, lot_sizes=1.0, min_order_value=0.0,
+                   drift_band=0.0, cash=0.0):
+    """
+    Calcula a lista mínima de ordens para levar as posições à alocação alvo
+    
+    Só negocia as linhas cujo desvio passa da banda de tolerância; cada
+    ordem é arredondada para lotes inteiros (em direção a zero) e ordens
+    abaixo do valor mínimo são descartadas. As compras são limitadas ao
+    caixa disponível mais o resultado das vendas.
+    
+    Args:
+        frame: PortfolioFrame com a alocação alvo (macro x sub)
+        quantities: quantidade atual de cada linha do frame
+        prices: preço unitário de cada linha (NaN/<= 0: não negociável)
+        lot_sizes: tamanho do lote, escalar ou por linha (default: 1)
+        min_order_value: valor mínimo de uma ordem em R$ (default: 0)
+        drift_band: desvio tolerado em pontos percentuais (default: 0)
+        cash: caixa disponível além das posições (default: 0)
+    
+    Returns:
+        RebalancePlan
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    lot_sizes = np.broadcast_to(np.asarray(lot_sizes, dtype=np.float64), quantities.shape)
+    lot_values, tradable = _lot_values(prices, lot_sizes)
+    
+    values = np.where(tradable, quantities * prices, 0.0)
+    total = values.sum() + cash
+    targets = target_weights(frame)
+    
+    if total <= 0:
+        drift = np.zeros_like(values)
+        return RebalancePlan(np.empty(0, dtype=ORDER_DTYPE), float(cash), 0.0, drift, drift)
+    
+    drift_before = values / total * 100.0 - targets
+    active = tradable & (np.abs(drift_before) > drift_band)
+    
+    # Diferença para o alvo em lotes inteiros, arredondada em direção a zero
+    # (vendas nunca passam da quantidade em carteira, pois o alvo é >= 0)
+    delta = np.where(active, targets / 100.0 * total - values, 0.0)
+    n_lots = np.trunc(np.divide(delta, lot_values, out=np.zeros_like(delta), where=active))
+    n_lots[np.abs(n_lots * lot_values) < min_order_value] = 0.0
+    
+    # Compras limitadas ao caixa + vendas
+    order_values = n_lots * lot_values
+    buys = order_values > 0
+    buy_total = order_values[buys].sum()
+    available = cash - order_values[~buys].sum()
+    if buy_total > available:
+        n_lots[buys] = np.floor(n_lots[buys] * max(available, 0.0) / buy_total)
+        n_lots[buys & (n_lots * lot_values < min_order_value)] = 0.0
+        order_values = n_lots * lot_values
+    
+    drift_after = (values + order_values) / total * 100.0 - targets
+    rows = np.flatnonzero(n_lots)
+    
+    return RebalancePlan(
+        orders=_orders(rows, n_lots, lot_sizes, prices),
+        cash=float(cash - order_values.sum()),
+        total=float(total),
+        drift_before=drift_before,
+        drift_after=drift_after,
+    )
+
+
+def _water_level(deficits, amount):
+    """
+    Nível L tal que sum(max(deficit - L, 0)) == amount (L >= 0)
+    
+    Ordena os déficits uma vez: O(n log n).
+    """
+    d = np.sort(deficits[deficits > 0])[::-1]
+    if d.size == 0:
+        return 0.0
+    k = np.arange(1, d.size + 1)
+    levels = (np.cumsum(d) - amount) / k
+    next_deficit = np.append(d[1:], 0.0)
+    return max(float(levels[np.argmax(levels >= next_deficit)]), 0.0)
+
+
+def allocate_contribution(frame, quantities, prices, amount, lot_sizes=1.0):
+    """
+    Distribui um aporte comprando só os ativos abaixo do alvo, sem vendas
+    
+    Primeiro "enche" os maiores déficits até um nível comum (water filling)
+    e arredonda para lotes inteiros; a sobra vai, via heap, lote a lote para
+    o ativo com maior déficit restante, só se o lote inteiro ainda cabe no
+    déficit (nenhum ativo passa do alvo). Total: O(n log n).
+    
+    Args:
+        frame: PortfolioFrame com a alocação alvo (macro x sub)
+        quantities: quantidade atual de cada linha do frame
+        prices: preço unitário de cada linha (NaN/<= 0: não negociável)
+        amount: valor do aporte em R$
+        lot_sizes: tamanho do lote, escalar ou por linha (default: 1)
+    
+    Returns:
+        RebalancePlan: só ordens de compra; `cash` é a sobra do aporte
+    """
+    quantities = np.asarray(quantities, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    lot_sizes = np.broadcast_to(np.asarray(lot_sizes, dtype=np.float64), quantities.shape)
+    lot_values, tradable = _lot_values(prices, lot_sizes)
+    
+    values = np.where(tradable, quantities * prices, 0.0)
+    total = values.sum() + amount
+    targets = target_weights(frame)
+    
+    if total <= 0 or amount <= 0:
+        drift = values / total * 100.0 - targets if total > 0 else np.zeros_like(values)
+        return RebalancePlan(np.empty(0, dtype=ORDER_DTYPE), float(max(amount, 0.0)),
+                             float(max(total, 0.0)), drift, drift)
+    
+    # Déficit de cada linha em R$ em relação ao alvo após o aporte
+    deficits = np.where(tradable, targets / 100.0 * total - values, 0.0)
+    level = _water_level(deficits, amount)
+    wanted = np.maximum(deficits - level, 0.0)
+    n_lots = np.floor(np.divide(wanted, lot_values, out=np.zeros_like(wanted), where=tradable))
+    remaining = amount - (n_lots * lot_values).sum()
+    
+    # Sobra: maior déficit restante primeiro, só lotes que cabem no déficit
+    # (o water filling deixa menos de um lote por linha abaixo do nível)
+    rest = deficits - n_lots * lot_values
+    candidates = np.flatnonzero(tradable & (lot_values <= rest) & (lot_values <= remaining))
+    heap = list(zip((-rest[candidates]).tolist(), candidates.tolist()))
+    heapq.heapify(heap)
+    while heap:
+        neg_rest, row = heapq.heappop(heap)
+        lot = lot_values[row]
+        if lot > remaining:
+            continue
+        n_lots[row] += 1
+        remaining -= lot
+        left = -neg_rest - lot
+        if lot <= left:
+            heapq.heappush(heap, (-left, row))
+    
+    order_values = n_lots * lot_values
+    return RebalancePlan(
+        orders=_orders(np.flatnonzero(n_lots), n_lots, lot_sizes, prices),
+        cash=float(remaining),
+        total=float(total),
+        drift_before=values / total * 100.0 - targets,
+        drift_after=(values + order_values) / total * 100.0 - targets,
+    )
+
+
+def allocation_drift(frame, target):
+    """
+    Desvio entre duas alocações, por classe e por sub-ativo
+    
+    Args:
+        frame: PortfolioFrame com a alocação atual
+        target: PortfolioFrame com a alocação de referência
+    
+    Returns:
+        tuple: (linhas, turnover); cada linha é (nível, classe, ativo, atual,
+        alvo, desvio) em % do patrimônio; turnover é a metade da soma dos
+        desvios absolutos dos sub-ativos (fração da carteira a negociar)
+    """
+    rows = []
+    current_macro = dict(zip(frame.classes, frame.macro.tolist()))
+    target_macro = dict(zip(target.classes, target.macro.tolist()))
+    for asset_class in dict.fromkeys([*target.classes, *frame.classes]):
+        now, goal = current_macro.get(asset_class, 0.0), target_macro.get(asset_class, 0.0)
+        rows.append(('Classe', asset_class, '', now, goal, now - goal))
+    
+    def weights(f):
+        names = np.asarray(f.classes, dtype=object)[f.class_ids].tolist()
+        return dict(zip(zip(names, f.assets.tolist()), target_weights(f).tolist()))
+    
+    current, goal = weights(frame), weights(target)
+    turnover = 0.0
+    for key in dict.fromkeys([*goal, *current]):
+        now, wanted = current.get(key, 0.0), goal.get(key, 0.0)
+        rows.append(('Ativo', key[0], key[1], now, wanted, now - wanted))
+        turnover += abs(now - wanted)
+    return rows, turnover / 2.0
@@ -0,0 +1,103 @@
+# cerrado/engine/snapshot.py
+"""
+Snapshot binário do portfólio (Arrow IPC) com cabeçalho de metadados
+"""
+import json
+import os
+
+import numpy as np
+
+from cerrado.engine.frame import PortfolioFrame
+
+try:
+    import pyarrow as pa
+    PYARROW_OK = True
+except ImportError:
+    PYARROW_OK = False
+
+
+SNAPSHOT_SCHEMA_VERSION = 1
+SNAPSHOT_EXTENSION = ".arrow"
+METADATA_KEY = b"diagrama_cerrado"
+
+
+class SnapshotError(ValueError):
+    """Snapshot inválido ou de versão não suportada"""
+
+
+def _require_pyarrow():
+    if not PYARROW_OK:
+        raise SnapshotError("pyarrow não está instalado")
+
+
+def _to_table(frame, total_patrimony):
+    metadata = {
+        'schema_version': SNAPSHOT_SCHEMA_VERSION,
+        'total_patrimony': float(total_patrimony),
+        'classes': frame.classes,
+        'macro': {c: float(v) for c, v, m in zip(frame.classes, frame.macro, frame.in_macro) if m},
+        'has_sub': frame.has_sub.tolist(),
+    }
+    table = pa.table({
+        'class_id': pa.array(frame.class_ids, type=pa.int32()),
+        'asset': pa.array(frame.assets.tolist(), type=pa.string()),
+        'percent': pa.array(frame.percents, type=pa.float64()),
+    })
+    return table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode()})
+
+
+def write_snapshot(frame, total_patrimony, sink):
+    """Grava o snapshot num caminho ou stream de saída"""
+    _require_pyarrow()
+    table = _to_table(frame, total_patrimony)
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def snapshot_bytes(frame, total_patrimony):
+    """Snapshot em memória (para download)"""
+    _require_pyarrow()
+    sink = pa.BufferOutputStream()
+    write_snapshot(frame, total_patrimony, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def read_snapshot(source):
+    """
+    Lê um snapshot; caminhos de arquivo são mapeados em memória
+    
+    Args:
+        source: caminho, bytes ou arquivo aberto
+    
+    Returns:
+        tuple: (PortfolioFrame, total_patrimony)
+    """
+    _require_pyarrow()
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(os.fspath(source), 'r')
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = pa.BufferReader(source)
+    
+    try:
+        table = pa.ipc.open_file(source).read_all()
+        metadata = json.loads((table.schema.metadata or {})[METADATA_KEY])
+    except (pa.ArrowInvalid, KeyError, ValueError) as e:
+        raise SnapshotError(f"arquivo não é um snapshot válido: {e}") from e
+    
+    version = metadata.get('schema_version')
+    if version != SNAPSHOT_SCHEMA_VERSION:
+        raise SnapshotError(f"versão de snapshot não suportada: {version}")
+    
+    classes = metadata['classes']
+    macro = metadata['macro']
+    frame = PortfolioFrame(
+        classes=classes,
+        macro=[macro.get(c, 0.0) for c in classes],
+        # Colunas numéricas sem nulos: visão direta sobre o buffer Arrow
+        class_ids=table.column('class_id').combine_chunks().to_numpy(),
+        assets=np.asarray(table.column('asset').to_pylist(), dtype=str),
+        percents=table.column('percent').combine_chunks().to_numpy(),
+        in_macro=[c in macro for c in classes],
+        has_sub=metadata['has_sub'],
+    )
+    return frame, metadata['total_patrimony']
@@ -0,0 +1,49 @@
+# cerrado/engine/summary.py
+"""
+Linhas de resumo do portfólio (classes e sub-ativos) prontas para exibição
+"""
+from cerrado.engine.formatting import format_currency
+
+
+def summary_rows(frame, total_patrimony, n_classes=None):
+    """
+    Linhas Tipo/Nome/Alocação/Valor/Detalhes do resumo detalhado
+    
+    Args:
+        frame: PortfolioFrame
+        total_patrimony: patrimônio total
+        n_classes: quantas classes incluir (default: todas)
+    
+    Returns:
+        list: uma linha por classe seguida das linhas dos seus sub-ativos
+    """
+    valuation = frame.valuate(total_patrimony)
+    n_classes = len(frame.classes) if n_classes is None else n_classes
+    
+    rows = []
+    for idx in range(n_classes):
+        # Linha da classe principal
+        rows.append({
+            'Tipo': 'Classe',
+            'Nome': frame.classes[idx],
+            'Alocação (%)': f"{frame.macro[idx]:.2f}%",
+            'Valor (R$)': format_currency(valuation.class_values[idx]),
+            'Detalhes': ''
+        })
+        
+        # Sub-ativos
+        sl = frame.class_slice(idx)
+        for sub_asset, sub_allocation, sub_value, sub_share in zip(
+            frame.assets[sl].tolist(),
+            frame.percents[sl].tolist(),
+            valuation.asset_values[sl].tolist(),
+            valuation.asset_shares[sl].tolist()
+        ):
+            rows.append({
+                'Tipo': 'Sub-ativo',
+                'Nome': f"  └─ {sub_asset}",
+                'Alocação (%)': f"{sub_allocation:.2f}%",
+                'Valor (R$)': format_currency(sub_value),
+                'Detalhes': f"{sub_share:.2f}% do total"
+            })
+    return rows
@@ -0,0 +1,199 @@
+# cerrado/engine/validation.py
+"""
+Validações para o Diagrama do Cerrado
+"""
+import numpy as np
+
+from cerrado.engine.frame import PortfolioFrame
+
+
+# Registro estruturado de erro: asset_idx = -1 para erros de classe
+# e class_idx = -1 para erros do portfólio inteiro (soma macro)
+ISSUE_DTYPE = np.dtype([
+    ('code', 'U16'),
+    ('class_idx', np.int32),
+    ('asset_idx', np.int64),
+    ('value', np.float64),
+])
+
+MACRO_SUM = 'macro_sum'
+SUB_SUM = 'sub_sum'
+EMPTY_NAME = 'empty_name'
+NEGATIVE_MACRO = 'negative_macro'
+NEGATIVE_SUB = 'negative_sub'
+
+
+def validate_percentage_sum(values, target=100, tolerance=0.01):
+    """
+    Valida se a soma dos valores é igual ao target
+    
+    Args:
+        values: Lista ou iterável de valores
+        target: Valor alvo (default: 100)
+        tolerance: Tolerância permitida (default: 0.01)
+    
+    Returns:
+        bool: True se válido, False caso contrário
+    """
+    if not values:
+        return False
+    
+    total = sum(values)
+    return abs(total - target) <= tolerance
+
+
+def _issues(code, class_idx, asset_idx, value):
+    """Monta registros de erro a partir de arrays"""
+    records = np.empty(len(value), dtype=ISSUE_DTYPE)
+    records['code'] = code
+    records['class_idx'] = class_idx
+    records['asset_idx'] = asset_idx
+    records['value'] = value
+    return records
+
+
+def validate_frame(frame, target=100, tolerance=0.01):
+    """
+    Valida o portfólio inteiro numa única passada vetorizada
+    
+    Args:
+        frame: PortfolioFrame a validar
+        target: Soma alvo das porcentagens (default: 100)
+        tolerance: Tolerância permitida (default: 0.01)
+    
+    Returns:
+        np.ndarray: registros ISSUE_DTYPE, vazio se o portfólio é válido
+    """
+    n_classes = len(frame.classes)
+    class_range = np.arange(n_classes, dtype=np.int32)
+    in_macro = frame.in_macro
+    
+    macro_total = frame.macro[in_macro].sum()
+    class_sums = np.bincount(frame.class_ids, weights=frame.percents, minlength=n_classes)
+    
+    # Comparações negadas: somas NaN (valores NaN/inf) também são erro
+    bad_sum = (frame.counts > 0) & ~(np.abs(class_sums - target) <= tolerance)
+    negative_macro = in_macro & (frame.macro < 0)
+    negative_sub = frame.percents < 0
+    empty_name = (frame.assets == '') | np.char.isspace(frame.assets)
+    
+    parts = []
+    if not in_macro.any() or not (abs(macro_total - target) <= tolerance):
+        parts.append(_issues(MACRO_SUM, -1, -1, [macro_total]))
+    if bad_sum.any():
+        parts.append(_issues(SUB_SUM, class_range[bad_sum], -1, class_sums[bad_sum]))
+    if empty_name.any():
+        rows = np.flatnonzero(empty_name)
+        parts.append(_issues(EMPTY_NAME, frame.class_ids[rows], rows, frame.percents[rows]))
+    if negative_macro.any():
+        parts.append(_issues(NEGATIVE_MACRO, class_range[negative_macro], -1,
+                             frame.macro[negative_macro]))
+    if negative_sub.any():
+        rows = np.flatnonzero(negative_sub)
+        parts.append(_issues(NEGATIVE_SUB, frame.class_ids[rows], rows, frame.percents[rows]))
+    
+    if not parts:
+        return np.empty(0, dtype=ISSUE_DTYPE)
+    return np.concatenate(parts)
+
+
+def format_issue(frame, issue):
+    """Descreve um registro de erro em texto"""
+    code = str(issue['code'])
+    class_idx = int(issue['class_idx'])
+    value = float(issue['value'])
+    asset_class = frame.classes[class_idx] if class_idx >= 0 else ''
+    
+    if code == MACRO_SUM:
+        return f"Alocação macro: {value:.2f}% ≠ 100%"
+    if code == SUB_SUM:
+        return f"{asset_class}: {value:.2f}% ≠ 100%"
+    if code == EMPTY_NAME:
+        return f"{asset_class}: Nome vazio"
+    if code == NEGATIVE_MACRO:
+        return f"{asset_class} macro: {value}"
+    asset_name = frame.assets[int(issue['asset_idx'])]
+    return f"{asset_class}/{asset_name}: {value}"
+
+
+def validate_portfolio(portfolio):
+    """Mensagens das somas inválidas (macro e sub-alocações) do portfólio"""
+    frame = portfolio if isinstance(portfolio, PortfolioFrame) else PortfolioFrame.from_dict(portfolio)
+    issues = validate_frame(frame)
+    sums = issues[(issues['code'] == MACRO_SUM) | (issues['code'] == SUB_SUM)]
+    return [format_issue(frame, issue) for issue in sums]
+
+
+class PortfolioValidator:
+    """Classe para validações do portfólio"""
+    
+    @staticmethod
+    def validate_macro_allocation(macro_allocation):
+        """Valida a alocação macro"""
+        total = sum(macro_allocation.values())
+        if not validate_percentage_sum(macro_allocation.values()):
+            return False, f"Soma das alocações macro: {total:.2f}% (deve ser 100%)"
+        return True, "✅ Alocação macro válida"
+    
+    @staticmethod
+    def validate_sub_allocations(portfolio):
+        """Valida todas as sub-alocações"""
+        frame = PortfolioFrame.from_dict(portfolio)
+        return PortfolioValidator._sub_result(frame, validate_frame(frame))
+    
+    @staticmethod
+    def validate_asset_names(portfolio):
+        """Valida nomes dos ativos"""
+        frame = PortfolioFrame.from_dict(portfolio)
+        return PortfolioValidator._names_result(validate_frame(frame))
+    
+    @staticmethod
+    def validate_negative_values(portfolio):
+        """Valida valores negativos"""
+        frame = PortfolioFrame.from_dict(portfolio)
+        return PortfolioValidator._negative_result(frame, validate_frame(frame))
+    
+    @staticmethod
+    def _macro_result(issues):
+        found = issues[issues['code'] == MACRO_SUM]
+        if found.size:
+            return False, f"Soma das alocações macro: {found['value'][0]:.2f}% (deve ser 100%)"
+        return True, "✅ Alocação macro válida"
+    
+    @staticmethod
+    def _sub_result(frame, issues):
+        found = issues[issues['code'] == SUB_SUM]
+        if found.size:
+            return False, " | ".join(format_issue(frame, issue) for issue in found)
+        return True, "✅ Todas sub-alocações válidas"
+    
+    @staticmethod
+    def _names_result(issues):
+        if np.any(issues['code'] == EMPTY_NAME):
+            return False, "Nomes de ativos vazios encontrados"
+        return True, "✅ Todos os nomes são válidos"
+    
+    @staticmethod
+    def _negative_result(frame, issues):
+        found = issues[np.isin(issues['code'], (NEGATIVE_MACRO, NEGATIVE_SUB))]
+        if found.size:
+            return False, f"Valores negativos: {', '.join(format_issue(frame, issue) for issue in found)}"
+        return True, "✅ Todos os valores são positivos"
+    
+    @staticmethod
+    def full_portfolio_validation(portfolio):
+        """Executa todas as validações numa única passada"""
+        frame = portfolio if isinstance(portfolio, PortfolioFrame) else PortfolioFrame.from_dict(portfolio)
+        issues = validate_frame(frame)
+        
+        valid_macro, msg_macro = PortfolioValidator._macro_result(issues)
+        valid_sub, msg_sub = PortfolioValidator._sub_result(frame, issues)
+        valid_names, msg_names = PortfolioValidator._names_result(issues)
+        valid_values, msg_values = PortfolioValidator._negative_result(frame, issues)
+        
+        return [
+            ("Alocação Macro", valid_macro, msg_macro),
+            ("Sub-alocações", valid_sub, msg_sub),
+            ("Nomes dos Ativos", valid_names, msg_names),
+            ("Valores Negativos", valid_values, msg_values),
+        ]
@@ -0,0 +1,206 @@
+# components/app_state.py
+"""
+Estado do portfólio na sessão: versões, dependências dos fragmentos e tempos
+"""
+import copy
+import hashlib
+import re
+import time
+import uuid
+from contextlib import contextmanager
+
+import streamlit as st
+
+from utils.history import History, freeze, thaw
+from cerrado.engine.frame import PortfolioFrame
+from utils.portfolio_store import DEFAULT_NAME
+
+
+DEFAULT_PORTFOLIO = {
+    'macro': {
+        'Renda Fixa': 40.0,
+        'Ações': 30.0,
+        'FIIs': 20.0,
+        'Criptomoedas': 10.0
+    },
+    'sub': {
+        'Renda Fixa': {'Tesouro Selic': 100.0},
+        'Ações': {'PETR4': 50.0, 'VALE3': 30.0, 'ITUB4': 20.0},
+        'FIIs': {'MXRF11': 60.0, 'HGLG11': 40.0},
+        'Criptomoedas': {'Bitcoin': 70.0, 'Ethereum': 30.0}
+    }
+}
+
+DEFAULT_TOTAL_PATRIMONY = 100000.0
+
+# Parâmetro da URL com o dono dos portfólios salvos desta sessão
+OWNER_PARAM = 'owner'
+_OWNER_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+# Partes do estado lidas por cada fragmento. 'total' e 'macro' só mudam na
+# sidebar (rerun completo); 'sub:<classe>' muda no editor daquela classe.
+# Os editores de classe dependem de ('total', 'macro', 'sub:<classe>').
+FRAGMENT_DEPENDENCIES = {
+    'dashboard': ('total', 'macro', 'sub'),
+    'export': ('total', 'macro', 'sub'),
+    'rebalance': ('macro', 'sub'),
+}
+
+
+def init_state():
+    """Inicializa o session_state - COM VALORES FLOAT!"""
+    if 'portfolio' not in st.session_state:
+        st.session_state.portfolio = copy.deepcopy(DEFAULT_PORTFOLIO)
+    if 'total_patrimony' not in st.session_state:
+        st.session_state.total_patrimony = DEFAULT_TOTAL_PATRIMONY
+    if 'constraints' not in st.session_state:
+        # Travas e limites: {'macro': {classe: (travada, mín, máx)},
+        #                    'sub': {classe: {ativo: (travada, mín, máx)}}}
+        st.session_state.constraints = {'macro': {}, 'sub': {}}
+    if '_state_version' not in st.session_state:
+        st.session_state._state_version = 0
+    if 'portfolio_name' not in st.session_state:
+        st.session_state.portfolio_name = DEFAULT_NAME
+    session_owner()
+    if 'history' not in st.session_state:
+        st.session_state.history = History(
+            freeze(st.session_state.portfolio, st.session_state.total_patrimony)
+        )
+        st.session_state._history_portfolio = st.session_state.portfolio
+
+
+def session_owner():
+    """
+    Dono dos portfólios que esta sessão grava e lista no store
+    
+    O store é um só por processo; sem dono, todas as abas e navegadores
+    dividiriam o mesmo "Meu portfólio". O id vai para a URL (?owner=) e
+    sobrevive a um recarregamento da página.
+    """
+    owner = st.session_state.get('store_owner')
+    if owner is None:
+        owner = st.query_params.get(OWNER_PARAM, '')
+        if not _OWNER_PATTERN.fullmatch(owner):
+            owner = uuid.uuid4().hex
+            st.query_params[OWNER_PARAM] = owner
+        st.session_state.store_owner = owner
+    return owner
+
+
+def editor_fragment_key(class_idx):
+    """Chave do fragmento do editor de uma classe"""
+    return f"class_editor_{class_idx}"
+
+
+def classes_key(prefix, classes):
+    """Chave de um data_editor com uma linha por classe
+    
+    As edições pendentes do data_editor são por índice de linha: mudar as
+    classes (abrir, desfazer, importar) muda a chave e descarta essas edições.
+    """
+    digest = hashlib.blake2b("\0".join(classes).encode(), digest_size=8).hexdigest()
+    return f"{prefix}_{digest}"
+
+
+def dependents(piece, classes):
+    """
+    Fragmentos a reexecutar quando uma parte do estado muda
+    
+    Args:
+        piece: 'total', 'macro' ou 'sub:<classe>'
+        classes: classes na ordem da alocação macro
+    
+    Returns:
+        list: chaves dos fragmentos; o editor da classe vem primeiro, pois
+        é ele que grava a edição antes dos demais lerem o estado
+    """
+    keys = []
+    if piece.startswith('sub:'):
+        asset_class = piece[len('sub:'):]
+        if asset_class in classes:
+            keys.append(editor_fragment_key(classes.index(asset_class)))
+        piece = 'sub'
+    keys.extend(key for key, deps in FRAGMENT_DEPENDENCIES.items() if piece in deps)
+    return keys
+
+
+def mark_changed():
+    """Registra uma alteração no portfólio (invalida o frame em cache)"""
+    st.session_state._state_version += 1
+
+
+def set_sub_assets(asset_class, assets):
+    """Grava os sub-ativos de uma classe se houve mudança"""
+    sub = st.session_state.portfolio['sub']
+    if sub.get(asset_class) != assets:
+        sub[asset_class] = assets
+        mark_changed()
+
+
+def restore_portfolio(portfolio, total=None):
+    """
+    Substitui o portfólio da sessão (usar em callbacks, antes dos widgets)
+    
+    Atualiza as chaves dos sliders e descarta o estado dos editores de
+    sub-ativos, que senão reaplicariam edições do portfólio anterior.
+    """
+    previous = st.session_state.portfolio
+    st.session_state.portfolio = portfolio
+    if total is not None:
+        st.session_state.total_patrimony = float(total)
+    
+    for asset_class, value in portfolio['macro'].items():
+        st.session_state[f"slider_{asset_class}"] = float(value)
+        # Sliders de AssetEditor.create_macro_sliders, se estiverem em uso
+        if f"macro_{asset_class}" in st.session_state:
+            st.session_state[f"macro_{asset_class}"] = float(value)
+    for asset_class in set(previous['sub']) | set(portfolio['sub']):
+        st.session_state.pop(f"editor_{asset_class}", None)
+        st.session_state.pop(f"_editor_signature_{asset_class}", None)
+    mark_changed()
+
+
+def record_history(changed=None, amend=False):
+    """Registra o estado atual no histórico (`changed`: classes editadas)"""
+    st.session_state._history_portfolio = st.session_state.portfolio
+    return st.session_state.history.record(
+        st.session_state.portfolio, st.session_state.total_patrimony, changed, amend
+    )
+
+
+def history_is_current():
+    """Se o portfólio da sessão é o mesmo objeto já registrado no histórico
+
+    False quando ele foi substituído (desfazer, abrir, importar) e o
+    próximo registro precisa comparar todas as classes.
+    """
+    return st.session_state.get('_history_portfolio') is st.session_state.portfolio
+
+
+def step_history(direction):
+    """Callback de desfazer/refazer: restaura o snapshot vizinho"""
+    history = st.session_state.history
+    snapshot = history.undo() if direction == 'undo' else history.redo()
+    if snapshot is not None:
+        restore_portfolio(thaw(snapshot), snapshot.total)
+
+
+def current_frame():
+    """PortfolioFrame do estado atual, recalculado só após alterações"""
+    version = st.session_state._state_version
+    cached = st.session_state.get('_frame_cache')
+    if cached is None or cached[0] != version:
+        cached = (version, PortfolioFrame.from_dict(st.session_state.portfolio))
+        st.session_state._frame_cache = cached
+    return cached[1]
+
+
+@contextmanager
+def timed(section):
+    """Mede o tempo de renderização de uma seção (em ms)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = st.session_state.setdefault('_timings', {})
+        timings[section] = (time.perf_counter() - start) * 1000
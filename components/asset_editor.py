@@ -2,8 +2,15 @@
 """
 Editor de ativos - Versão Tema Claro
 """
-import streamlit as st
+import json
+
+import numpy as np
 import pandas as pd
+import streamlit as st
+
+from cerrado.engine.normalization import (
+    NormalizationError, constraint_arrays, equal_allocation, normalize_allocation
+)
 
 
 def validate_percentage_sum_local(values, target=100, tolerance=0.01):
@@ -14,12 +21,100 @@ def validate_percentage_sum_local(values, target=100, tolerance=0.01):
     return abs(total - target) <= tolerance
 
 
+def _edit_signature(editor_state):
+    """Assinatura do estado de edição do data_editor (linhas editadas/incluídas/removidas)"""
+    if not editor_state:
+        return None
+    return json.dumps(
+        {key: editor_state[key] for key in ('edited_rows', 'added_rows', 'deleted_rows')},
+        sort_keys=True, default=str
+    )
+
+
+def _dict_hash(assets_dict):
+    """Hash do conteúdo de um dict de sub-ativos"""
+    return hash(tuple(assets_dict.items()))
+
+
+def process_edits(edited_df, constraints):
+    """
+    Converte a tabela editada em {ativo: %}, renormalizando se preciso
+    
+    Args:
+        edited_df: DataFrame do data_editor (Ativo, Alocação (%), Travado, Mín (%), Máx (%))
+        constraints: {ativo: (travado, mín, máx)}, atualizado com os valores da tabela
+    
+    Returns:
+        tuple: (dict ou None, soma editada em %, erro da normalização ou None);
+        None quando não há ativos nomeados ou a soma não é positiva
+    """
+    if edited_df.empty:
+        return None, 0.0, None
+    
+    names = edited_df['Ativo'].dropna().astype(str).str.strip()
+    names = names[names != '']
+    if names.empty:
+        return None, 0.0, None
+    
+    rows = edited_df.loc[names.index].fillna(
+        {'Alocação (%)': 0.0, 'Travado': False, 'Mín (%)': 0.0, 'Máx (%)': 100.0}
+    )
+    percents = rows['Alocação (%)'].astype(float)
+    new_dict = dict(zip(names.tolist(), percents.tolist()))
+    
+    # Travas e limites editados na tabela
+    constraints.clear()
+    constraints.update(zip(names.tolist(), zip(
+        rows['Travado'].astype(bool).tolist(),
+        rows['Mín (%)'].astype(float).tolist(),
+        rows['Máx (%)'].astype(float).tolist()
+    )))
+    
+    # Validar soma
+    values = np.fromiter(new_dict.values(), dtype=np.float64, count=len(new_dict))
+    total_percent = values.sum()
+    if not np.isfinite(total_percent) or total_percent <= 0:
+        return None, total_percent, None
+    
+    # Rebalancear se necessário
+    if abs(total_percent - 100) > 0.01:
+        try:
+            new_dict = normalize_allocation(new_dict, constraints)
+        except NormalizationError as e:
+            return new_dict, total_percent, str(e)
+    return new_dict, total_percent, None
+
+
+def _fit_macro_sliders(asset_classes, constraints):
+    """Callback: projeta os sliders macro em 100% respeitando travas e limites"""
+    current = {c: float(st.session_state.get(f"macro_{c}", 0.0)) for c in asset_classes}
+    try:
+        fitted = normalize_allocation(current, constraints)
+    except NormalizationError as e:
+        st.session_state._macro_fit_error = str(e)
+        return
+    for asset_class, value in fitted.items():
+        st.session_state[f"macro_{asset_class}"] = value
+
+
 class AssetEditor:
     """Editor de ativos com tema claro"""
     
     @staticmethod
-    def edit_asset_class(class_name, assets_dict, class_allocation=100.0, total_patrimony=0.0):
-        """Editor para classe de ativos - Tema Claro"""
+    def edit_asset_class(class_name, assets_dict, class_allocation=100.0, total_patrimony=0.0,
+                         on_change=None, constraints=None, on_update=None):
+        """Editor para classe de ativos - Tema Claro
+        
+        `on_change` é repassado ao data_editor (ex.: rerun dos fragmentos
+        que dependem da classe). `on_update` é chamado quando Adicionar ou
+        Balancear alteram `assets_dict` no lugar, antes do rerun (ex.: para
+        registrar a mudança no histórico). `constraints` ({ativo: (travada, mín, máx)})
+        é atualizado no lugar com as colunas de trava e limites. Retorna None
+        quando não houve edição desde o último processamento (o estado não
+        precisa ser regravado).
+        """
+        if constraints is None:
+            constraints = {}
         
         st.markdown(f"""
         <div style='
@@ -34,7 +129,8 @@ class AssetEditor:
         """, unsafe_allow_html=True)
         
         # Se vazio, criar um item padrão
-        if not assets_dict:
+        defaulted = not assets_dict
+        if defaulted:
             assets_dict = {"Ativo 1": 100.0}
         
         # Informações da classe
@@ -46,24 +142,22 @@ class AssetEditor:
             *Distribua 100% entre os ativos abaixo:*
             """)
         
-        # Converter dict para DataFrame
-        items_list = []
-        for asset, percent in assets_dict.items():
-            if total_patrimony > 0 and class_allocation > 0:
-                asset_value = total_patrimony * (class_allocation / 100) * (percent / 100)
-                items_list.append({
-                    'Ativo': asset,
-                    'Alocação (%)': percent,
-                    'Valor (R$)': f"R$ {asset_value:,.2f}"
-                })
-            else:
-                items_list.append({
-                    'Ativo': asset,
-                    'Alocação (%)': percent,
-                    'Valor (R$)': "R$ 0,00"
-                })
-        
-        df = pd.DataFrame(items_list)
+        # Converter dict para DataFrame (colunas inteiras, sem laço por linha)
+        percents = np.fromiter(assets_dict.values(), dtype=np.float64, count=len(assets_dict))
+        if total_patrimony > 0 and class_allocation > 0:
+            values = total_patrimony * (class_allocation / 100) * (percents / 100)
+        else:
+            values = np.zeros_like(percents)
+        
+        locked, lower, upper = constraint_arrays(assets_dict, constraints)
+        df = pd.DataFrame({
+            'Ativo': list(assets_dict),
+            'Alocação (%)': percents,
+            'Valor (R$)': values,
+            'Travado': locked,
+            'Mín (%)': lower,
+            'Máx (%)': upper
+        })
         
         # Editor de dados
         edited_df = st.data_editor(
@@ -81,14 +175,27 @@ class AssetEditor:
                     step=0.5,
                     format="%.2f"
                 ),
-                "Valor (R$)": st.column_config.TextColumn(
+                "Valor (R$)": st.column_config.NumberColumn(
                     "Valor",
+                    format="R$ %.2f",
                     disabled=True
+                ),
+                "Travado": st.column_config.CheckboxColumn(
+                    "🔒",
+                    help="Mantém o percentual ao rebalancear",
+                    default=False
+                ),
+                "Mín (%)": st.column_config.NumberColumn(
+                    min_value=0.0, max_value=100.0, default=0.0, format="%.1f"
+                ),
+                "Máx (%)": st.column_config.NumberColumn(
+                    min_value=0.0, max_value=100.0, default=100.0, format="%.1f"
                 )
             },
             num_rows="dynamic",
             use_container_width=True,
-            key=f"editor_{class_name}"
+            key=f"editor_{class_name}",
+            on_change=on_change
         )
         
         # Botões de ação
@@ -100,18 +207,24 @@ class AssetEditor:
                         use_container_width=True,
                         help="Adiciona novo ativo"):
                 assets_dict[f"Ativo {len(assets_dict)+1}"] = 0.0
+                if on_update is not None:
+                    on_update()
                 st.rerun()
         
         with col2:
             if st.button("🔄 Balancear", 
                         key=f"balance_{class_name}",
                         use_container_width=True,
-                        help="Distribui igualmente entre ativos"):
+                        help="Distribui igualmente entre os ativos livres, respeitando limites"):
                 if assets_dict:
-                    num_assets = len(assets_dict)
-                    for key in assets_dict:
-                        assets_dict[key] = 100.0 / num_assets
-                    st.rerun()
+                    try:
+                        assets_dict.update(equal_allocation(assets_dict, constraints))
+                    except NormalizationError as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        if on_update is not None:
+                            on_update()
+                        st.rerun()
         
         with col3:
             if st.button("✅ Validar", 
@@ -125,34 +238,35 @@ class AssetEditor:
                     else:
                         st.error(f"❌ Soma: {total:.2f}% ≠ 100%")
         
+        # Sem edição nova desde o último processamento: nada a reconstruir
+        edits = _edit_signature(st.session_state.get(f"editor_{class_name}"))
+        signature_key = f"_editor_signature_{class_name}"
+        if not defaulted and st.session_state.get(signature_key) == (edits, _dict_hash(assets_dict)):
+            return None
+        
+        result = assets_dict
+        
         # Processar edições
-        if not edited_df.empty:
-            valid_rows = edited_df.dropna(subset=['Ativo'])
-            valid_rows = valid_rows[valid_rows['Ativo'].str.strip() != '']
-            
-            if not valid_rows.empty:
-                new_dict = {}
-                for _, row in valid_rows.iterrows():
-                    asset_name = str(row['Ativo']).strip()
-                    percent = float(row['Alocação (%)'])
-                    new_dict[asset_name] = percent
-                
-                # Validar soma
-                total_percent = sum(new_dict.values())
-                
-                if total_percent > 0:
-                    # Rebalancear se necessário
-                    if abs(total_percent - 100) > 0.01:
-                        st.warning(f"⚠️ Rebalanceando para 100% (atual: {total_percent:.1f}%)")
-                        new_dict = {k: (v / total_percent) * 100 for k, v in new_dict.items()}
-                    
-                    return new_dict
-        
-        return assets_dict
+        new_dict, total_percent, error = process_edits(edited_df, constraints)
+        if new_dict is not None:
+            if error:
+                st.error(f"❌ {error}")
+            elif abs(total_percent - 100) > 0.01:
+                st.warning(f"⚠️ Rebalanceando para 100% (atual: {total_percent:.1f}%)")
+            result = new_dict
+        
+        # O resultado volta como entrada no próximo rerun: com as mesmas
+        # edições, não é reprocessado (nem renormalizado de novo)
+        st.session_state[signature_key] = (edits, _dict_hash(result))
+        return result
     
     @staticmethod
-    def create_macro_sliders(portfolio_state):
-        """Cria sliders para alocação macro"""
+    def create_macro_sliders(portfolio_state, constraints=None):
+        """Cria sliders para alocação macro
+        
+        `constraints` ({classe: (travada, mín, máx)}) é respeitado pelo botão
+        de ajuste para 100%.
+        """
         st.markdown("""
         <div style='
             background: #F8F9FA;
@@ -190,13 +304,16 @@ class AssetEditor:
                     30.0 if asset_class == 'Ações' else
                     20.0 if asset_class == 'FIIs' else 10.0)
                 
-                # Slider
+                # Slider: o valor inicial vai só na chave (o ajuste para 100%
+                # também grava nela; passar `value=` junto gera aviso)
+                key = f"macro_{asset_class}"
+                if key not in st.session_state:
+                    st.session_state[key] = float(current)
                 value = st.slider(
-                    "",
+                    asset_class,
                     0.0, 100.0,
-                    float(current),
-                    0.5,
-                    key=f"macro_{asset_class}",
+                    step=0.5,
+                    key=key,
                     label_visibility="collapsed"
                 )
                 
@@ -238,6 +355,17 @@ class AssetEditor:
         </div>
         """, unsafe_allow_html=True)
         
+        if abs(total - 100) >= 0.01:
+            st.button("🔧 Ajustar para 100%",
+                      key="macro_fit",
+                      use_container_width=True,
+                      on_click=_fit_macro_sliders,
+                      args=(asset_classes, constraints))
+        
+        error = st.session_state.pop('_macro_fit_error', None)
+        if error:
+            st.error(f"❌ {error}")
+        
         return total, macro_values
 
 
@@ -1,81 +1,226 @@
 # components/asset_integration.py
-import requests
+# requests, PIL e yfinance são importados no primeiro uso: carregar o módulo
+# (e o app) não paga o custo dessas bibliotecas
 import streamlit as st
-from PIL import Image
 from io import BytesIO
 import base64
-import yfinance as yf
-import pandas as pd
+import hashlib
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import DEFAULT_PATH, get_default_cache
+
+# Endpoints HTTP (substituíveis, ex.: servidor local de testes)
+DEFAULT_ENDPOINTS = {
+    'yahoo_spark': 'https://query1.finance.yahoo.com/v7/finance/spark',
+    'coingecko': 'https://api.coingecko.com/api/v3',
+}
+
+# Limites de símbolos por requisição de cada provedor
+B3_BATCH_SIZE = 20
+CRYPTO_BATCH_SIZE = 250
+
+PriceResult = namedtuple('PriceResult', ['prices', 'errors'])
+
+LOGO_SIZE = 40
+GENERIC_LOGO = "https://via.placeholder.com/40/808080/FFFFFF?text=?"
+
+
+class ThumbnailStore:
+    """Miniaturas de logos endereçadas pelo hash do conteúdo"""
+    
+    def __init__(self, directory=None, size=LOGO_SIZE):
+        self.directory = directory or os.path.join(os.path.dirname(DEFAULT_PATH), 'logos')
+        self.size = size
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def path_for(self, digest):
+        """Caminho local de uma miniatura"""
+        return os.path.join(self.directory, f"{digest}.png")
+    
+    def has(self, digest):
+        return os.path.exists(self.path_for(digest))
+    
+    def put(self, image_bytes):
+        """Reduz a imagem para `size` px e grava; retorna o hash"""
+        from PIL import Image
+        
+        image = Image.open(BytesIO(image_bytes))
+        image.thumbnail((self.size, self.size))
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        
+        buffer = BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        data = buffer.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            # Grava em arquivo temporário e renomeia: seguro entre processos
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return digest
+    
+    def data_uri(self, digest):
+        """Miniatura como data URI base64 (para HTML inline)"""
+        with open(self.path_for(digest), 'rb') as f:
+            return "data:image/png;base64," + base64.b64encode(f.read()).decode()
+
 
 class AssetIntegration:
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, http=None, endpoints=None, max_workers=8, cache=None, thumbnails=None):
+        """
+        Args:
+            http: objeto com `.get(url, params=..., timeout=...)` no padrão
+                do requests (default: requests.Session)
+            endpoints: URLs base que substituem DEFAULT_ENDPOINTS
+            max_workers: threads para buscar lotes em paralelo
+            cache: CacheStore para preços e logos (default: cache
+                persistente compartilhado do processo)
+            thumbnails: ThumbnailStore para as miniaturas dos logos
+        """
+        self.cache = cache if cache is not None else get_default_cache()
+        if http is None:
+            import requests
+            
+            http = requests.Session()
+            http.headers.update({'User-Agent': 'Mozilla/5.0'})
+        self.http = http
+        self.endpoints = {**DEFAULT_ENDPOINTS, **(endpoints or {})}
+        self.max_workers = max_workers
+        self._thumbnails = thumbnails
+    
+    @property
+    def thumbnails(self):
+        if self._thumbnails is None:
+            self._thumbnails = ThumbnailStore()
+        return self._thumbnails
         
-    def get_stock_logo(self, ticker):
+    def get_stock_logo(self, ticker, warn=True):
         """Obtém logo de ação/FII da B3"""
         cache_key = f"stock_{ticker}"
+        placeholder = f"https://via.placeholder.com/40/2E8B57/FFFFFF?text={ticker[:3]}"
         
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        found, logo = self.cache.lookup('logo', cache_key)
+        if found:
+            return logo or placeholder
         
         try:
             # Usando yfinance para dados básicos
+            import yfinance as yf
+            
             stock = yf.Ticker(f"{ticker}.SA")
             info = stock.info
             
             if 'logo_url' in info:
-                self.cache[cache_key] = info['logo_url']
+                self.cache.set('logo', cache_key, info['logo_url'])
                 return info['logo_url']
             
             # Fallback para APIs públicas
             b3_logo = self._get_b3_logo(ticker)
             if b3_logo:
-                self.cache[cache_key] = b3_logo
+                self.cache.set('logo', cache_key, b3_logo)
                 return b3_logo
                 
         except Exception as e:
-            st.warning(f"Não foi possível obter logo para {ticker}: {e}")
+            if warn:
+                st.warning(f"Não foi possível obter logo para {ticker}: {e}")
         
-        # Retorna placeholder
-        return f"https://via.placeholder.com/40/2E8B57/FFFFFF?text={ticker[:3]}"
+        # Falha cacheada: retorna placeholder sem repetir a consulta
+        self.cache.set_failure('logo', cache_key)
+        return placeholder
     
     def get_crypto_logo(self, symbol):
         """Obtém logo de criptomoeda"""
         cache_key = f"crypto_{symbol}"
+        fallback = f"https://cryptoicons.org/api/icon/{symbol.lower()}/40"
         
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        found, logo = self.cache.lookup('logo', cache_key)
+        if found:
+            return logo or fallback
         
         try:
             # CoinGecko API (gratuita)
-            url = f"https://api.coingecko.com/api/v3/coins/{symbol.lower()}"
-            response = requests.get(url, timeout=5)
+            url = f"{self.endpoints['coingecko']}/coins/{symbol.lower()}"
+            response = self.http.get(url, timeout=5)
             
             if response.status_code == 200:
                 data = response.json()
                 logo = data['image']['small']
-                self.cache[cache_key] = logo
+                self.cache.set('logo', cache_key, logo)
                 return logo
         except:
             pass
         
         # CryptoIcons fallback
-        return f"https://cryptoicons.org/api/icon/{symbol.lower()}/40"
+        self.cache.set_failure('logo', cache_key)
+        return fallback
+    
+    @staticmethod
+    def _asset_kind(asset_name):
+        """Identifica o tipo de ativo pelo nome"""
+        name = asset_name.upper()
+        if any(x in name for x in ['PETR', 'VALE', 'ITUB', 'B3']):
+            return 'stock'
+        if 'BTC' in name or 'ETH' in name:
+            return 'crypto'
+        return None
+    
+    def get_logo_url(self, asset_name, warn=True):
+        """URL do logo conforme o tipo de ativo"""
+        kind = self._asset_kind(asset_name)
+        if kind == 'stock':
+            return self.get_stock_logo(asset_name, warn=warn)
+        if kind == 'crypto':
+            return self.get_crypto_logo(asset_name)
+        return GENERIC_LOGO
+    
+    def _fetch_thumbnail(self, asset_name):
+        """Resolve o logo e retorna a miniatura local (ou a URL, se falhar)"""
+        url = self.get_logo_url(asset_name, warn=False)
+        
+        found, digest = self.cache.lookup('logo', f"thumb_{url}")
+        if found and digest and self.thumbnails.has(digest):
+            return self.thumbnails.path_for(digest)
+        if found and digest is None:
+            return url
+        
+        try:
+            response = self.http.get(url, timeout=5)
+            response.raise_for_status()
+            digest = self.thumbnails.put(response.content)
+        except Exception:
+            self.cache.set_failure('logo', f"thumb_{url}")
+            return url
+        
+        self.cache.set('logo', f"thumb_{url}", digest)
+        return self.thumbnails.path_for(digest)
     
-    def display_asset_with_logo(self, asset_name, allocation, value_brl):
+    def prefetch_logos(self, asset_names):
+        """
+        Resolve e baixa em paralelo os logos de vários ativos
+        
+        Returns:
+            dict: {ativo: caminho da miniatura local ou URL de fallback}
+        """
+        names = list(dict.fromkeys(asset_names))
+        if not names:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as pool:
+            return dict(zip(names, pool.map(self._fetch_thumbnail, names)))
+    
+    def display_asset_with_logo(self, asset_name, allocation, value_brl, logo=None):
         """Exibe ativo com logo e informações"""
         col1, col2, col3 = st.columns([1, 3, 2])
         
         with col1:
-            # Identificar tipo de ativo
-            if any(x in asset_name.upper() for x in ['PETR', 'VALE', 'ITUB', 'B3']):
-                logo_url = self.get_stock_logo(asset_name)
-            elif 'BTC' in asset_name.upper() or 'ETH' in asset_name.upper():
-                logo_url = self.get_crypto_logo(asset_name)
-            else:
-                logo_url = "https://via.placeholder.com/40/808080/FFFFFF?text=?"
-            
-            st.image(logo_url, width=40)
+            if logo is None:
+                logo = self.prefetch_logos([asset_name])[asset_name]
+            st.image(logo, width=LOGO_SIZE)
         
         with col2:
             st.write(f"**{asset_name}**")
@@ -84,14 +229,121 @@ class AssetIntegration:
             st.write(f"**{allocation:.1f}%**")
             st.caption(f"R$ {value_brl:,.2f}")
     
+    def display_assets_with_logos(self, assets):
+        """Exibe vários ativos, com todos os logos buscados de uma vez
+        
+        Args:
+            assets: iterável de (nome, alocação %, valor em R$)
+        """
+        assets = list(assets)
+        logos = self.prefetch_logos(name for name, _, _ in assets)
+        for asset_name, allocation, value_brl in assets:
+            self.display_asset_with_logo(asset_name, allocation, value_brl,
+                                         logo=logos[asset_name])
+    
     def get_asset_price(self, ticker, asset_type):
         """Obtém preço atual do ativo"""
-        try:
+        return self.get_prices([ticker], asset_type).prices.get(ticker, 0)
+    
+    def get_prices(self, tickers, asset_type):
+        """Obtém preços de vários ativos do mesmo tipo em lotes"""
+        return self.get_prices_by_type({asset_type: tickers})
+    
+    def get_prices_by_type(self, tickers_by_type):
+        """
+        Obtém preços em lotes, com os lotes de todos os tipos em paralelo
+        
+        Args:
+            tickers_by_type: dict {tipo de ativo: lista de tickers}
+        
+        Returns:
+            PriceResult: `prices` {ticker: preço} com o que foi obtido e
+            `errors` {ticker: mensagem} para o que falhou
+        """
+        jobs = []
+        prices = {}
+        errors = {}
+        for asset_type, tickers in tickers_by_type.items():
+            pending = []
+            for ticker in dict.fromkeys(tickers):
+                found, price = self.cache.lookup('price', f"{asset_type}:{ticker}")
+                if not found:
+                    pending.append(ticker)
+                elif price is None:
+                    errors[ticker] = "Cotação indisponível (falha recente)"
+                else:
+                    prices[ticker] = price
+            tickers = pending
+            
             if asset_type in ['Ações', 'FIIs']:
-                stock = yf.Ticker(f"{ticker}.SA")
-                return stock.info.get('regularMarketPrice', 0)
+                fetch, size = self._fetch_b3_batch, B3_BATCH_SIZE
             elif asset_type == 'Criptomoedas':
-                # Simulação - implementar API real
-                return 0
-        except:
-            return 0
\ No newline at end of file
+                fetch, size = self._fetch_crypto_batch, CRYPTO_BATCH_SIZE
+            else:
+                errors.update((t, f"Sem cotação para {asset_type}") for t in tickers)
+                continue
+            jobs.extend((asset_type, fetch, tickers[i:i + size])
+                        for i in range(0, len(tickers), size))
+        
+        if not jobs:
+            return PriceResult(prices, errors)
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as pool:
+            futures = [(pool.submit(fetch, batch), asset_type, batch)
+                       for asset_type, fetch, batch in jobs]
+            for future, asset_type, batch in futures:
+                try:
+                    batch_prices, batch_errors = future.result()
+                except Exception as e:
+                    batch_prices, batch_errors = {}, {t: str(e) for t in batch}
+                
+                for ticker, price in batch_prices.items():
+                    self.cache.set('price', f"{asset_type}:{ticker}", price)
+                for ticker in batch_errors:
+                    self.cache.set_failure('price', f"{asset_type}:{ticker}")
+                prices.update(batch_prices)
+                errors.update(batch_errors)
+        
+        return PriceResult(prices, errors)
+    
+    def _fetch_b3_batch(self, tickers):
+        """Cotações de ações/FIIs da B3 numa única requisição multi-símbolo"""
+        symbols = {f"{t}.SA": t for t in tickers}
+        response = self.http.get(
+            self.endpoints['yahoo_spark'],
+            params={'symbols': ','.join(symbols), 'range': '1d', 'interval': '1d'},
+            timeout=10
+        )
+        response.raise_for_status()
+        
+        prices = {}
+        for item in (response.json().get('spark') or {}).get('result') or []:
+            ticker = symbols.get(item.get('symbol'))
+            try:
+                price = item['response'][0]['meta']['regularMarketPrice']
+            except (KeyError, IndexError, TypeError):
+                continue
+            if ticker is not None and price is not None:
+                prices[ticker] = float(price)
+        
+        errors = {t: "Cotação não encontrada" for t in tickers if t not in prices}
+        return prices, errors
+    
+    def _fetch_crypto_batch(self, symbols):
+        """Cotações de criptomoedas (em R$) numa única requisição"""
+        ids = {s.lower(): s for s in symbols}
+        response = self.http.get(
+            f"{self.endpoints['coingecko']}/simple/price",
+            params={'ids': ','.join(ids), 'vs_currencies': 'brl'},
+            timeout=10
+        )
+        response.raise_for_status()
+        
+        prices = {}
+        for coin_id, quote in response.json().items():
+            symbol = ids.get(coin_id)
+            if symbol is not None and quote.get('brl') is not None:
+                prices[symbol] = float(quote['brl'])
+        
+        errors = {s: "Cotação não encontrada" for s in symbols if s not in prices}
+        return prices, errors
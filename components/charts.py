@@ -1,38 +1,180 @@
 # components/charts.py
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-from utils.formatters import format_currency, format_percentage
+# Plotly é importado só ao construir uma figura (fora do cache): o import
+# custa centenas de ms e não é necessário para carregar o módulo
+import hashlib
+import json
+import numpy as np
+from cerrado.engine.memo import MemoryLRU
+from cerrado.engine.formatting import format_currency
+from cerrado.engine.frame import PortfolioFrame
+
+# Cores das classes macro (pizza e barras)
+CLASS_COLORS = ['#2E8B57', '#1E90FF', '#FF8C00', '#9370DB']
+
+# Paleta do sunburst (plotly.express.colors.qualitative.Set3, sem importar
+# plotly.express, que carrega pandas)
+SUNBURST_COLORS = [
+    'rgb(141,211,199)', 'rgb(255,255,179)', 'rgb(190,186,218)', 'rgb(251,128,114)',
+    'rgb(128,177,211)', 'rgb(253,180,98)', 'rgb(179,222,105)', 'rgb(252,205,229)',
+    'rgb(217,217,217)', 'rgb(188,128,189)', 'rgb(204,235,197)', 'rgb(255,237,111)',
+]
+
+# Sub-ativos exibidos por classe no sunburst antes de agrupar em "Outros"
+SUNBURST_TOP_N = 15
+OTHERS_LABEL = "Outros"
+
+# Figuras prontas, serializadas (to_plotly_json), compartilhadas entre
+# sessões do processo; cada chamada recebe uma figura nova montada a partir
+# delas, sem revalidar
+FIGURE_CACHE_ENTRIES = 64
+_figure_cache = MemoryLRU(max_entries=FIGURE_CACHE_ENTRIES)
+
+
+def chart_key(kind, *inputs):
+    """Chave do cache: hash das entradas relevantes para o gráfico"""
+    payload = json.dumps([kind, *inputs], ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
 
 class ChartBuilder:
     def __init__(self, total_patrimony):
         self.total_patrimony = total_patrimony
     
-    def create_sunburst_chart(self, portfolio_data):
-        """Cria gráfico sunburst com valores em R$"""
+    @staticmethod
+    def _cached(key, build):
+        """Figura a partir do JSON em cache: quem a recebe pode alterá-la
+        sem afetar as outras sessões"""
+        import plotly.graph_objects as go
+        
+        spec = _figure_cache.get_or_build(key, lambda: build().to_plotly_json())
+        # O spec saiu de uma figura já validada: só copiar (~1 ms, contra
+        # ~16 ms de uma cópia validada com go.Figure(figura))
+        return go.Figure(spec, _validate=False)
+    
+    def create_allocation_pie(self, macro):
+        """Gráfico de pizza da alocação macro (painel principal)"""
+        labels = list(macro.keys())
+        values = [float(v) for v in macro.values()]
+        key = chart_key('pie', labels, values)
+        return self._cached(key, lambda: self._build_allocation_pie(labels, values))
+    
+    @staticmethod
+    def _build_allocation_pie(labels, values):
+        import plotly.graph_objects as go
+        
+        fig = go.Figure()
+        
+        fig.add_trace(go.Pie(
+            labels=labels,
+            values=values,
+            hole=0.4,
+            textinfo='label+percent',
+            textposition='outside',
+            marker=dict(colors=CLASS_COLORS, line=dict(color='white', width=2)),
+            hoverinfo='label+percent+value',
+            textfont=dict(size=14, color='black')
+        ))
+        
+        fig.update_layout(
+            title=dict(
+                text="Distribuição do Patrimônio",
+                font=dict(size=20, color='#1A1A1A')
+            ),
+            showlegend=True,
+            legend=dict(
+                font=dict(color='#1A1A1A'),
+                bgcolor='rgba(255,255,255,0.8)',
+                bordercolor='#E0E0E0'
+            ),
+            height=500,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)'
+        )
+        
+        return fig
+    
+    def create_sunburst_chart(self, portfolio_data, top_n=None, expanded=()):
+        """Cria gráfico sunburst com valores em R$
+        
+        Args:
+            portfolio_data: dict do portfólio ou PortfolioFrame
+            top_n: se definido, mantém só os top_n sub-ativos (por valor) de
+                cada classe e agrupa o restante num nó "Outros"
+            expanded: classes exibidas com todos os sub-ativos
+        """
+        frame = (portfolio_data if isinstance(portfolio_data, PortfolioFrame)
+                 else PortfolioFrame.from_dict(portfolio_data))
+        expanded = sorted(expanded)
+        key = chart_key('sunburst', frame.content_hash(), float(self.total_patrimony),
+                        top_n, expanded)
+        return self._cached(key, lambda: self._build_sunburst(frame, top_n, set(expanded)))
+    
+    @staticmethod
+    def _top_rows(sub_values, top_n):
+        """Índices (na ordem original) dos top_n maiores valores, sem ordenação completa"""
+        top = np.argpartition(-sub_values, top_n - 1)[:top_n]
+        keep = np.zeros(sub_values.size, dtype=bool)
+        keep[top] = True
+        return keep
+    
+    def _build_sunburst(self, frame, top_n=None, expanded=frozenset()):
+        import plotly.graph_objects as go
+        
+        valuation = frame.valuate(self.total_patrimony)
+        
+        ids = []
         labels = []
         parents = []
         values = []
         text = []
         
         # Nível 1: Classes de ativos
-        for asset_class, allocation in portfolio_data['macro'].items():
+        for idx in range(len(frame.classes)):
+            if not frame.in_macro[idx]:
+                continue
+            asset_class = frame.classes[idx]
+            value_brl = float(valuation.class_values[idx])
+            ids.append(asset_class)
             labels.append(asset_class)
             parents.append("")
-            value_brl = self.total_patrimony * (allocation / 100)
             values.append(value_brl)
-            text.append(f"{allocation}%<br>{format_currency(value_brl)}")
+            text.append(f"{float(frame.macro[idx])}%<br>{format_currency(value_brl)}")
+            
+            # Nível 2: Sub-ativos (com nível de detalhe limitado)
+            rows = frame.class_slice(idx)
+            sub_assets = frame.assets[rows]
+            sub_percents = frame.percents[rows]
+            sub_values = valuation.asset_values[rows]
+            
+            others = None
+            if top_n and sub_values.size > top_n and asset_class not in expanded:
+                keep = self._top_rows(sub_values, top_n)
+                others = (int((~keep).sum()), float(sub_percents[~keep].sum()),
+                          float(sub_values[~keep].sum()))
+                sub_assets, sub_percents, sub_values = sub_assets[keep], sub_percents[keep], sub_values[keep]
             
-            # Nível 2: Sub-ativos
-            if asset_class in portfolio_data['sub']:
-                for sub_asset, sub_allocation in portfolio_data['sub'][asset_class].items():
-                    labels.append(sub_asset)
-                    parents.append(asset_class)
-                    sub_value_brl = value_brl * (sub_allocation / 100)
-                    values.append(sub_value_brl)
-                    text.append(f"{sub_allocation}%<br>{format_currency(sub_value_brl)}")
+            sub_names = sub_assets.tolist()
+            sub_values = sub_values.tolist()
+            # Ids com separador de tabulação: nomes iguais em classes diferentes não colidem
+            ids.extend(f"{asset_class}\t{name}" for name in sub_names)
+            labels.extend(sub_names)
+            parents.extend([asset_class] * len(sub_values))
+            values.extend(sub_values)
+            text.extend(
+                f"{sub_allocation}%<br>{format_currency(sub_value_brl)}"
+                for sub_allocation, sub_value_brl in zip(sub_percents.tolist(), sub_values)
+            )
+            
+            if others is not None:
+                count, others_percent, others_value = others
+                ids.append(f"{asset_class}\t\t{OTHERS_LABEL}")
+                labels.append(f"{OTHERS_LABEL} ({count})")
+                parents.append(asset_class)
+                values.append(others_value)
+                text.append(f"{others_percent:.2f}%<br>{format_currency(others_value)}")
         
         fig = go.Figure(go.Sunburst(
+            ids=ids,
             labels=labels,
             parents=parents,
             values=values,
@@ -44,7 +186,7 @@ class ChartBuilder:
                          "Valor Absoluto: %{value:,.2f}<br>" +
                          "<extra></extra>",
             marker=dict(
-                colors=px.colors.qualitative.Set3,
+                colors=SUNBURST_COLORS,
                 line=dict(width=2, color='#1a1a1a')
             ),
             maxdepth=2
@@ -63,11 +205,19 @@ class ChartBuilder:
     
     def create_horizontal_bar_chart(self, portfolio_data):
         """Gráfico de barras horizontal"""
+        macro = portfolio_data['macro']
+        key = chart_key('bar', list(macro.keys()), [float(v) for v in macro.values()],
+                        float(self.total_patrimony))
+        return self._cached(key, lambda: self._build_horizontal_bar(macro))
+    
+    def _build_horizontal_bar(self, macro):
+        import plotly.graph_objects as go
+        
         categories = []
         percentages = []
         values_brl = []
         
-        for asset_class, allocation in portfolio_data['macro'].items():
+        for asset_class, allocation in macro.items():
             categories.append(asset_class)
             percentages.append(allocation)
             values_brl.append(self.total_patrimony * (allocation / 100))
@@ -83,7 +233,7 @@ class ChartBuilder:
             textposition='auto',
             hoverinfo='text',
             marker=dict(
-                color=['#2E8B57', '#1E90FF', '#FF8C00', '#9370DB'],
+                color=CLASS_COLORS,
                 line=dict(color='#1a1a1a', width=1)
             )
         ))
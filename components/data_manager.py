@@ -5,40 +5,33 @@ import json
 import csv
 from io import StringIO
 from datetime import datetime
-from utils.formatters import format_currency
+from itertools import islice
+from cerrado.engine.export import (
+    LEVEL_CSV_COLUMNS, collect, deferred_export, export_payload, iter_level_csv, iter_level_rows
+)
+from cerrado.engine.formatting import format_currency
+from cerrado.engine.frame import PortfolioFrame
+from cerrado.engine.importer import PortfolioImportError, import_portfolio
+from cerrado.engine.snapshot import SNAPSHOT_EXTENSION, SnapshotError, read_snapshot
+from cerrado.engine.summary import summary_rows
+from cerrado.engine.validation import format_issue, validate_frame
+from components.app_state import restore_portfolio, session_owner
+from utils.portfolio_store import DEFAULT_NAME, get_default_store
+
+
+def _load_imported(frame, total):
+    """Callback do Carregar: substitui o portfólio pelo importado (antes dos widgets)"""
+    restore_portfolio(frame.to_dict(), total)
+
 
 class DataManager:
     @staticmethod
     def display_summary_table(portfolio, total_patrimony):
         """Exibe tabela de resumo detalhada"""
-        data = []
+        frame = PortfolioFrame.from_dict(portfolio)
         
-        for asset_class, class_allocation in portfolio['macro'].items():
-            class_value = total_patrimony * (class_allocation / 100)
-            
-            # Linha da classe principal
-            data.append({
-                'Tipo': 'Classe',
-                'Nome': asset_class,
-                'Alocação (%)': f"{class_allocation:.2f}%",
-                'Valor (R$)': format_currency(class_value),
-                'Detalhes': ''
-            })
-            
-            # Sub-atributos
-            if asset_class in portfolio['sub']:
-                for sub_asset, sub_allocation in portfolio['sub'][asset_class].items():
-                    sub_value = class_value * (sub_allocation / 100)
-                    data.append({
-                        'Tipo': 'Sub-ativo',
-                        'Nome': f"  └─ {sub_asset}",
-                        'Alocação (%)': f"{sub_allocation:.2f}%",
-                        'Valor (R$)': format_currency(sub_value),
-                        'Detalhes': f"{sub_allocation/100*class_allocation:.2f}% do total"
-                    })
-        
-        # Criar DataFrame
-        df = pd.DataFrame(data)
+        # Linhas de classes e sub-ativos (cerrado.engine.summary)
+        df = pd.DataFrame(summary_rows(frame, total_patrimony, len(portfolio['macro'])))
         
         # Exibir tabela estilizada
         st.dataframe(
@@ -62,7 +55,7 @@ class DataManager:
             classes_count = len(portfolio['macro'])
             st.metric("Classes de Ativos", classes_count)
         with col3:
-            sub_assets_count = sum(len(subs) for subs in portfolio['sub'].values())
+            sub_assets_count = len(frame)
             st.metric("Ativos Individuais", sub_assets_count)
         with col4:
             date_str = datetime.now().strftime("%d/%m/%Y")
@@ -75,90 +68,80 @@ class DataManager:
         
         # Exportar para JSON
         st.subheader("Exportar Configuração")
-        json_str = json.dumps(portfolio, indent=2, ensure_ascii=False)
+        # JSON gerado só quando pedido, memoizado pelo conteúdo
+        frame = PortfolioFrame.from_dict(portfolio)
+        total_patrimony = st.session_state.get('total_patrimony', 0.0)
         
         col1, col2 = st.columns(2)
         with col1:
             st.download_button(
                 label="📥 Baixar JSON",
-                data=json_str,
+                data=deferred_export('json', frame, total_patrimony),
                 file_name=f"diagrama_cerrado_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json"
             )
         
         with col2:
             if st.button("📋 Copiar para Clipboard"):
+                json_str = export_payload('json', frame, total_patrimony)
                 st.code(json_str[:500] + "..." if len(json_str) > 500 else json_str)
                 st.success("JSON copiado para clipboard!")
         
         # Importar de JSON
         st.subheader("Importar Configuração")
         uploaded_file = st.file_uploader(
-            "Escolha um arquivo JSON",
-            type=['json'],
-            help="Faça upload de um arquivo JSON exportado anteriormente"
+            "Escolha um arquivo JSON ou snapshot Arrow",
+            type=['json', SNAPSHOT_EXTENSION.lstrip('.')],
+            help="Faça upload de um arquivo JSON ou snapshot exportado anteriormente"
         )
         
         if uploaded_file is not None:
             try:
-                imported_data = json.load(uploaded_file)
+                imported_frame, imported_total = DataManager._import_uploaded(uploaded_file)
+                st.success("✅ Estrutura do arquivo válida!")
                 
-                # Validar estrutura
-                if 'macro' in imported_data and 'sub' in imported_data:
-                    st.success("✅ Estrutura do arquivo válida!")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("🔄 Carregar Configuração"):
-                            st.session_state.portfolio = imported_data
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button("👁️ Visualizar"):
-                            st.json(imported_data, expanded=False)
-                else:
-                    st.error("❌ Estrutura inválida. O arquivo deve conter 'macro' e 'sub'.")
+                # Somas e valores inconsistentes não impedem o carregamento
+                issues = validate_frame(imported_frame)
+                if issues.size:
+                    st.warning(" | ".join(format_issue(imported_frame, issue) for issue in issues[:5])
+                               + (f" (+{issues.size - 5})" if issues.size > 5 else ""))
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    # Via restore_portfolio: atualiza sliders e editores e o
+                    # histórico registra a troca (pode ser desfeita)
+                    st.button("🔄 Carregar Configuração", on_click=_load_imported,
+                              args=(imported_frame, imported_total))
+                
+                with col2:
+                    if st.button("👁️ Visualizar"):
+                        st.json(imported_frame.to_dict(), expanded=False)
+            except (PortfolioImportError, SnapshotError) as e:
+                st.error(f"❌ Estrutura inválida em {e}")
             except Exception as e:
                 st.error(f"Erro ao ler arquivo: {e}")
         
         # Exportar para CSV
         st.subheader("Exportar para CSV")
         
+        compress_csv = st.checkbox("Compactar CSV (gzip)", value=False, key="dm_csv_gzip")
+        
         if st.button("📊 Gerar Relatório CSV"):
-            # Preparar dados para CSV
-            csv_data = []
-            for asset_class, class_allocation in portfolio['macro'].items():
-                csv_data.append({
-                    'Nível': 'Classe',
-                    'Categoria': asset_class,
-                    'Ativo': asset_class,
-                    'Alocação (%)': class_allocation,
-                    'Porcentagem do Total': class_allocation
-                })
-                
-                if asset_class in portfolio['sub']:
-                    for sub_asset, sub_allocation in portfolio['sub'][asset_class].items():
-                        total_percentage = (sub_allocation / 100) * class_allocation
-                        csv_data.append({
-                            'Nível': 'Sub-ativo',
-                            'Categoria': asset_class,
-                            'Ativo': sub_asset,
-                            'Alocação (%)': sub_allocation,
-                            'Porcentagem do Total': total_percentage
-                        })
-            
-            df_csv = pd.DataFrame(csv_data)
-            csv_string = df_csv.to_csv(index=False)
+            # CSV gerado em blocos a partir do modelo colunar
+            csv_payload = collect(iter_level_csv(frame), gzip=compress_csv)
+            csv_name = f"relatorio_alocacao_{datetime.now().strftime('%Y%m%d')}.csv"
             
             st.download_button(
                 label="📥 Baixar CSV",
-                data=csv_string,
-                file_name=f"relatorio_alocacao_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
+                data=csv_payload,
+                file_name=csv_name + (".gz" if compress_csv else ""),
+                mime="application/gzip" if compress_csv else "text/csv"
             )
             
             # Pré-visualização
-            st.dataframe(df_csv.head(10), use_container_width=True)
+            preview = pd.DataFrame(list(islice(iter_level_rows(frame), 10)),
+                                   columns=LEVEL_CSV_COLUMNS)
+            st.dataframe(preview, use_container_width=True)
         
         # Limpar dados
         st.subheader("Manutenção")
@@ -175,13 +158,60 @@ class DataManager:
                 if st.button("❌ Cancelar"):
                     pass
     
+    @staticmethod
+    def _import_uploaded(uploaded_file):
+        """Importa o arquivo enviado uma única vez (reaproveitado nos reruns)
+        
+        Returns:
+            tuple: (PortfolioFrame, patrimônio total ou None se o formato não traz)
+        """
+        file_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+        cached = st.session_state.get('_imported_file')
+        if cached is not None and cached[0] == file_id:
+            return cached[1]
+        
+        if uploaded_file.name.endswith(SNAPSHOT_EXTENSION):
+            result = read_snapshot(uploaded_file.getvalue())
+            st.session_state._imported_file = (file_id, result)
+            return result
+        
+        bar = st.progress(0.0, text="Lendo arquivo...")
+        
+        def progress(done, total):
+            if total:
+                bar.progress(min(done / total, 1.0), text=f"Lendo arquivo... {done / 1e6:.1f} MB")
+        
+        try:
+            frame = import_portfolio(uploaded_file, progress=progress, total_bytes=uploaded_file.size)
+        finally:
+            bar.empty()
+        
+        st.session_state._imported_file = (file_id, (frame, None))
+        return frame, None
+    
     @staticmethod
     def save_to_session(portfolio):
-        """Salva portfólio na session_state"""
+        """Salva portfólio na session_state e agenda a gravação em disco"""
         st.session_state.portfolio = portfolio
         st.session_state.last_save = datetime.now()
+        get_default_store().save(
+            st.session_state.get('portfolio_name', DEFAULT_NAME),
+            portfolio,
+            st.session_state.get('total_patrimony'),
+            owner=session_owner()
+        )
     
     @staticmethod
     def load_from_session():
-        """Carrega portfólio da session_state"""
-        return st.session_state.get('portfolio', None)
\ No newline at end of file
+        """Carrega portfólio da session_state (ou a última versão salva)"""
+        portfolio = st.session_state.get('portfolio', None)
+        if portfolio is None:
+            portfolio, total = get_default_store().load(
+                st.session_state.get('portfolio_name', DEFAULT_NAME),
+                owner=session_owner()
+            )
+            if portfolio is not None:
+                st.session_state.portfolio = portfolio
+                if total is not None:
+                    st.session_state.total_patrimony = total
+        return portfolio
\ No newline at end of file
@@ -0,0 +1,91 @@
+# components/detail_table.py
+"""
+Tabela de detalhes dos sub-ativos: uma só tabela virtualizada para o portfólio
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+ALL_CLASSES = "Todas as classes"
+
+
+def detail_frame(frame, valuation, mask=None):
+    """
+    Monta o DataFrame de detalhes a partir das colunas do frame (sem laços)
+    
+    Args:
+        frame: PortfolioFrame
+        valuation: resultado de frame.valuate(total)
+        mask: filtro booleano opcional sobre as linhas
+    
+    Returns:
+        pd.DataFrame: uma linha por sub-ativo
+    """
+    rows = slice(None) if mask is None else mask
+    return pd.DataFrame({
+        'Classe': pd.Categorical.from_codes(frame.class_ids[rows], frame.classes),
+        'Ativo': frame.assets[rows],
+        'Na classe (%)': frame.percents[rows],
+        'Do total (%)': valuation.asset_shares[rows],
+        'Valor (R$)': valuation.asset_values[rows],
+    })
+
+
+def filter_mask(frame, class_idx=None, query=""):
+    """Filtro por classe e por trecho do nome (sem diferenciar maiúsculas)"""
+    mask = np.ones(len(frame), dtype=bool)
+    if class_idx is not None:
+        mask &= frame.class_ids == class_idx
+    query = query.strip().lower()
+    if query:
+        mask &= np.char.find(np.char.lower(frame.assets), query) >= 0
+    return mask
+
+
+def display_detail_table(frame, valuation, n_macro, key="details"):
+    """
+    Exibe os sub-ativos numa tabela com busca, filtro por classe e ordenação
+    
+    A quantidade de widgets é fixa; as linhas são carregadas sob demanda
+    conforme a rolagem (lazy), e a ordenação pelos cabeçalhos roda no servidor.
+    """
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        choice = st.selectbox(
+            "Classe",
+            [ALL_CLASSES] + frame.classes[:n_macro],
+            key=f"{key}_class"
+        )
+    with col2:
+        query = st.text_input(
+            "Buscar ativo",
+            placeholder="Ex.: PETR",
+            key=f"{key}_query"
+        )
+    
+    class_idx = None if choice == ALL_CLASSES else frame.classes.index(choice)
+    # Só classes da alocação macro (como no restante do dashboard)
+    mask = filter_mask(frame, class_idx, query) & (frame.class_ids < n_macro)
+    
+    if not mask.any():
+        if len(frame) == 0 or (class_idx is not None and not frame.counts[class_idx]):
+            st.info("Nenhum sub-ativo definido. Use a aba 'Editar Ativos' para adicionar.")
+        else:
+            st.info("Nenhum ativo encontrado.")
+        return
+    
+    df = detail_frame(frame, valuation, mask)
+    st.caption(f"{len(df)} de {len(frame)} ativos")
+    st.dataframe(
+        df,
+        column_config={
+            'Na classe (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Do total (%)': st.column_config.NumberColumn(format="%.2f%%"),
+            'Valor (R$)': st.column_config.NumberColumn(format="R$ %.2f"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        lazy=True,
+        key=f"{key}_table"
+    )
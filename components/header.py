@@ -1,6 +1,27 @@
 # components/header.py
 import streamlit as st
 
+from utils.static_assets import build_stylesheet
+
+
+@st.cache_resource(show_spinner=False)
+def _stylesheet(theme):
+    """CSS do tema, gerado uma vez por processo"""
+    return build_stylesheet(theme)
+
+
+def inject_theme(theme):
+    """Aplica o CSS do tema
+    
+    Com static serving, cada rerun envia só um @import do arquivo versionado
+    (o navegador baixa uma vez e reaproveita). Sem ele, envia o CSS minificado.
+    """
+    sheet = _stylesheet(theme)
+    if sheet.url and st.get_option("server.enableStaticServing"):
+        st.html(f'<style>@import url("{sheet.url}");</style>')
+    else:
+        st.html(f"<style>{sheet.css}</style>")
+
 def setup_theme():
     """Configura tema escuro personalizado"""
     st.set_page_config(
@@ -10,90 +31,8 @@ def setup_theme():
         initial_sidebar_state="expanded"
     )
     
-    # CSS personalizado
-    st.markdown("""
-    <style>
-    /* Tema escuro personalizado */
-    :root {
-        --primary-color: #2E8B57;
-        --secondary-color: #1E90FF;
-        --background-color: #0E1117;
-        --card-background: #262730;
-        --text-color: #FAFAFA;
-    }
-    
-    .stApp {
-        background: linear-gradient(135deg, #0c0c0c 0%, #1a1a1a 100%);
-    }
-    
-    /* Cards */
-    .stCard {
-        background-color: var(--card-background);
-        border-radius: 10px;
-        padding: 1.5rem;
-        border-left: 4px solid var(--primary-color);
-    }
-    
-    /* Títulos */
-    h1, h2, h3 {
-        color: var(--text-color) !important;
-        font-weight: 600;
-    }
-    
-    h1 {
-        border-bottom: 2px solid var(--primary-color);
-        padding-bottom: 0.5rem;
-    }
-    
-    /* Sliders personalizados */
-    .stSlider > div > div > div {
-        background-color: var(--primary-color);
-    }
-    
-    /* Botões */
-    .stButton > button {
-        background: linear-gradient(90deg, var(--primary-color), #32CD32);
-        color: white;
-        border: none;
-        border-radius: 5px;
-        padding: 0.5rem 1rem;
-        font-weight: 500;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(46, 139, 87, 0.4);
-    }
-    
-    /* Inputs */
-    .stTextInput > div > div > input,
-    .stNumberInput > div > div > input {
-        background-color: #1a1a1a;
-        color: white;
-        border: 1px solid #444;
-    }
-    
-    /* Data Editor */
-    .dataframe {
-        background-color: #1a1a1a !important;
-        color: white !important;
-    }
-    
-    /* Metric cards */
-    [data-testid="stMetric"] {
-        background-color: var(--card-background);
-        padding: 1rem;
-        border-radius: 10px;
-    }
-    
-    [data-testid="stMetricValue"] {
-        color: var(--primary-color) !important;
-        font-size: 1.8rem !important;
-    }
-    
-    </style>
-    """, unsafe_allow_html=True)
+    # CSS do tema (assets/theme_dark.css), versionado e servido como arquivo
+    inject_theme('dark')
 
 def create_header():
     """Cria cabeçalho personalizado"""
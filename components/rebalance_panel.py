@@ -0,0 +1,174 @@
+# components/rebalance_panel.py
+"""
+Painel de rebalanceamento: posições atuais e ordens para atingir a alocação alvo
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cerrado.engine.rebalance import allocate_contribution, include_holdings, plan_rebalance
+
+
+POSITION_COLUMNS = ['Classe', 'Ativo', 'Quantidade', 'Preço (R$)', 'Lote']
+
+
+def positions_frame(frame, positions):
+    """DataFrame de posições alinhado às linhas do frame (sem posição: zeros)"""
+    class_names = np.asarray(frame.classes, dtype=object)[frame.class_ids]
+    keys = list(zip(class_names.tolist(), frame.assets.tolist()))
+    stored = [positions.get(key, (0.0, 0.0, 1.0)) for key in keys]
+    values = np.array(stored, dtype=np.float64).reshape(-1, 3)
+    return pd.DataFrame({
+        'Classe': class_names,
+        'Ativo': frame.assets,
+        'Quantidade': values[:, 0],
+        'Preço (R$)': values[:, 1],
+        'Lote': values[:, 2],
+    })
+
+
+def orders_frame(frame, plan):
+    """DataFrame das ordens de um RebalancePlan"""
+    orders = plan.orders
+    rows = orders['row']
+    return pd.DataFrame({
+        'Operação': np.where(orders['quantity'] > 0, 'Compra', 'Venda'),
+        'Classe': np.asarray(frame.classes, dtype=object)[frame.class_ids[rows]],
+        'Ativo': frame.assets[rows],
+        'Quantidade': np.abs(orders['quantity']),
+        'Preço (R$)': orders['price'],
+        'Valor (R$)': np.abs(orders['value']),
+        'Desvio antes (p.p.)': plan.drift_before[rows],
+        'Desvio depois (p.p.)': plan.drift_after[rows],
+    })
+
+
+def display_rebalance(frame, n_macro, key="rebalance"):
+    """
+    Exibe o editor de posições, as ordens de rebalanceamento e o aporte
+    
+    As posições ficam em st.session_state.positions como
+    {(classe, ativo): (quantidade, preço, lote)}.
+    """
+    positions = st.session_state.setdefault('positions', {})
+    
+    st.markdown("Informe as posições atuais; as ordens levam a carteira à alocação alvo.")
+    
+    # Posições em ativos que saíram do alvo: linhas com alvo 0%, vendidas
+    frame, held_outside = include_holdings(frame, positions)
+    if held_outside.any():
+        st.caption(f"{int(held_outside.sum())} posição(ões) fora da alocação alvo: "
+                   "alvo 0%, entram nas vendas.")
+    
+    # A chave acompanha o conteúdo do frame: as edições pendentes do editor
+    # são por índice de linha e não valem para outro conjunto de ativos
+    # (as posições persistem em `positions`, por classe e ativo)
+    edited = st.data_editor(
+        positions_frame(frame, positions),
+        column_config={
+            'Classe': st.column_config.TextColumn(disabled=True),
+            'Ativo': st.column_config.TextColumn(disabled=True),
+            'Quantidade': st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+            'Preço (R$)': st.column_config.NumberColumn(min_value=0.0, format="R$ %.2f"),
+            'Lote': st.column_config.NumberColumn(min_value=0.0, step=1.0, format="%d"),
+        },
+        num_rows="fixed",
+        hide_index=True,
+        use_container_width=True,
+        key=f"{key}_positions_{frame.content_hash()}"
+    ).fillna({'Quantidade': 0.0, 'Preço (R$)': 0.0, 'Lote': 1.0})
+    
+    positions.update(zip(
+        zip(edited['Classe'].tolist(), edited['Ativo'].tolist()),
+        zip(edited['Quantidade'].tolist(), edited['Preço (R$)'].tolist(), edited['Lote'].tolist())
+    ))
+    
+    st.subheader("🔁 Rebalanceamento")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        cash = st.number_input("💵 Caixa disponível (R$)", min_value=0.0, value=0.0,
+                               step=100.0, key=f"{key}_cash")
+    with col2:
+        min_order = st.number_input("Ordem mínima (R$)", min_value=0.0, value=0.0,
+                                    step=10.0, key=f"{key}_min_order")
+    with col3:
+        band = st.number_input("Banda de tolerância (p.p.)", min_value=0.0, value=0.5,
+                               step=0.1, key=f"{key}_band",
+                               help="Só negocia ativos cujo peso se afasta do alvo mais que isso")
+    
+    # Só classes da alocação macro participam (e as posições fora do alvo)
+    in_macro = (frame.class_ids < n_macro) | held_outside
+    prices = np.where(in_macro, edited['Preço (R$)'].to_numpy(dtype=np.float64), np.nan)
+    
+    quantities = edited['Quantidade'].to_numpy(dtype=np.float64)
+    lot_sizes = edited['Lote'].to_numpy(dtype=np.float64)
+    
+    start = time.perf_counter()
+    plan = plan_rebalance(
+        frame,
+        quantities=quantities,
+        prices=prices,
+        lot_sizes=lot_sizes,
+        min_order_value=min_order,
+        drift_band=band,
+        cash=cash
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    
+    if plan.total <= 0:
+        st.info("Informe quantidades e preços para calcular as ordens.")
+    else:
+        display_plan(frame, plan, elapsed,
+                     "✅ Carteira dentro da banda de tolerância: nenhuma ordem necessária.")
+    
+    # Aporte: só compras, nos ativos mais abaixo do alvo
+    st.divider()
+    st.subheader("💰 Aporte")
+    amount = st.number_input("Valor do aporte (R$)", min_value=0.0, value=0.0,
+                             step=100.0, key=f"{key}_contribution")
+    if amount > 0:
+        start = time.perf_counter()
+        contribution = allocate_contribution(
+            frame,
+            quantities=quantities,
+            prices=prices,
+            amount=amount,
+            lot_sizes=lot_sizes
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        display_plan(frame, contribution, elapsed,
+                     "Nenhum lote cabe no aporte para os ativos abaixo do alvo.")
+
+
+def display_plan(frame, plan, elapsed, empty_message):
+    """Exibe métricas e a tabela de ordens de um RebalancePlan"""
+    values = plan.orders['value']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Ordens", len(plan.orders))
+    with col2:
+        st.metric("Compras", f"R$ {values[values > 0].sum():,.2f}")
+    with col3:
+        st.metric("Vendas", f"R$ {abs(values[values < 0].sum()):,.2f}")
+    with col4:
+        st.metric("Caixa final", f"R$ {plan.cash:,.2f}")
+    
+    if len(plan.orders):
+        st.dataframe(
+            orders_frame(frame, plan),
+            column_config={
+                'Quantidade': st.column_config.NumberColumn(format="%.2f"),
+                'Preço (R$)': st.column_config.NumberColumn(format="R$ %.2f"),
+                'Valor (R$)': st.column_config.NumberColumn(format="R$ %.2f"),
+                'Desvio antes (p.p.)': st.column_config.NumberColumn(format="%+.2f"),
+                'Desvio depois (p.p.)': st.column_config.NumberColumn(format="%+.2f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+    else:
+        st.success(empty_message)
+    
+    st.caption(f"{len(frame)} posições calculadas em {elapsed:.1f} ms")
@@ -0,0 +1,78 @@
+# components/templates.py
+"""
+Templates HTML compilados uma vez e renderizados em lote (um elemento por seção)
+"""
+import html
+from functools import lru_cache
+from string import Template
+
+import streamlit as st
+
+
+# Fragmentos HTML com placeholders $nome (string.Template)
+TEMPLATES = {
+    'metric_card': """<div class="metric-card">
+    <div style="font-size: 12px; opacity: 0.9;">$label</div>
+    <div style="font-size: 24px; font-weight: 700;">$value</div>
+</div>""",
+    'summary_card': """<div style='
+    background: linear-gradient(135deg, ${color}20, ${color}10);
+    border-left: 4px solid $color;
+    border-radius: 8px;
+    padding: 15px;
+    margin-bottom: 10px;
+'>
+    <div style='font-weight: 600; color: $color; font-size: 14px;'>$name</div>
+    <div style='font-size: 20px; font-weight: 700; color: #1A1A1A; margin: 5px 0;'>$allocation</div>
+    <div style='font-size: 12px; color: #666;'>$value</div>
+</div>""",
+    'progress_bar': """<div style='margin: 5px 0 15px 0;'>
+    <div style='display: flex; justify-content: space-between; font-size: 12px; color: #666;'>
+        <span>$name</span>
+        <span>$percent%</span>
+    </div>
+    <div style='background: #E0E0E0; height: 4px; border-radius: 2px;'>
+        <div style='background: $color; width: $width%; height: 100%; border-radius: 2px;'></div>
+    </div>
+</div>""",
+    'class_card': """<div class="main-card">
+    <h4 style='color: #2E8B57;'>$name</h4>
+    <p style='color: #666; font-size: 14px; margin-bottom: 0;'>
+        Alocação total da classe: <strong>$allocation%</strong> ($value)
+    </p>
+</div>""",
+    'grid': """<div class="card-grid" style="grid-template-columns: repeat($columns, minmax(0, 1fr));">$items</div>""",
+}
+
+
+@lru_cache(maxsize=None)
+def compiled(name):
+    """Template compilado (uma vez por processo)"""
+    return Template(TEMPLATES[name])
+
+
+def render(template, **values):
+    """Renderiza um template; textos são escapados"""
+    return compiled(template).substitute(
+        {key: html.escape(str(value)) for key, value in values.items()}
+    )
+
+
+def render_many(name, rows):
+    """Renderiza um template para cada dict de `rows`, numa só string"""
+    template = compiled(name)
+    escape = html.escape
+    return ''.join(
+        template.substitute({key: escape(str(value)) for key, value in row.items()})
+        for row in rows
+    )
+
+
+def render_grid(name, rows, columns=4):
+    """Renderiza `rows` como cards lado a lado (substitui st.columns + N markdowns)"""
+    return compiled('grid').substitute(columns=columns, items=render_many(name, rows))
+
+
+def show(markup):
+    """Envia o HTML da seção como um único elemento"""
+    st.markdown(markup, unsafe_allow_html=True)
@@ -0,0 +1,45 @@
+# tests/test_asset_editor.py
+"""
+Processamento da tabela editada de uma classe
+"""
+import math
+
+import pandas as pd
+import pytest
+
+from components.asset_editor import process_edits
+
+
+def _table(names, percents, locked=None):
+    n = len(names)
+    return pd.DataFrame({
+        'Ativo': names,
+        'Alocação (%)': percents,
+        'Travado': locked or [False] * n,
+        'Mín (%)': [0.0] * n,
+        'Máx (%)': [100.0] * n,
+    })
+
+
+def test_unconstrained_edits_scale_proportionally():
+    result, total, error = process_edits(_table(list('abcd'), [100.0, 1.0, 1.0, 50.0]), {})
+
+    assert error is None
+    assert total == 152.0
+    assert result == pytest.approx({k: v * 100 / 152 for k, v in zip('abcd', [100, 1, 1, 50])})
+
+
+def test_locked_rows_keep_their_value():
+    result, _, error = process_edits(
+        _table(['a', 'b', 'c'], [60.0, 30.0, 30.0], locked=[True, False, False]), {})
+
+    assert error is None
+    assert result == pytest.approx({'a': 60.0, 'b': 20.0, 'c': 20.0})
+
+
+def test_blank_allocation_counts_as_zero_and_nan_total_is_rejected():
+    result, _, _ = process_edits(_table(['a', 'b'], [100.0, math.nan]), {})
+    assert result == {'a': 100.0, 'b': 0.0}
+
+    result, _, _ = process_edits(_table(['a'], [math.inf]), {})
+    assert result is None
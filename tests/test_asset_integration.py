@@ -0,0 +1,199 @@
+# tests/test_asset_integration.py
+"""
+Cotações em lote e pré-busca de logos contra um servidor HTTP local
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from PIL import Image
+
+from components.asset_integration import (
+    B3_BATCH_SIZE,
+    AssetIntegration,
+    ThumbnailStore,
+)
+from utils.cache import CacheStore
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Imita o spark do Yahoo, o CoinGecko e um servidor de imagens"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server = self.server
+        with server.lock:
+            server.requests.append((url.path, params))
+
+        if url.path == '/spark':
+            symbols = params['symbols'].split(',')
+            if server.fail_symbols.intersection(symbols):
+                return self._send(500, b'erro')
+            result = [
+                {'symbol': s, 'response': [{'meta': {'regularMarketPrice': server.b3[s]}}]}
+                for s in symbols if s in server.b3
+            ]
+            return self._json({'spark': {'result': result, 'error': None}})
+
+        if url.path == '/api/simple/price':
+            ids = params['ids'].split(',')
+            return self._json({i: {'brl': server.crypto[i]} for i in ids if i in server.crypto})
+
+        if url.path.startswith('/api/coins/'):
+            coin_id = url.path.rsplit('/', 1)[-1]
+            return self._json({'image': {'small': f"{server.base_url}/img/{coin_id}.png"}})
+
+        if url.path.startswith('/img/'):
+            name = url.path.rsplit('/', 1)[-1]
+            if name in server.images:
+                return self._send(200, server.images[name], 'image/png')
+
+        self._send(404, b'')
+
+    def _json(self, payload):
+        self._send(200, json.dumps(payload).encode(), 'application/json')
+
+    def _send(self, status, body, content_type='text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _png(size, color):
+    buffer = BytesIO()
+    Image.new('RGB', (size, size), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.lock = threading.Lock()
+    server.requests = []
+    server.fail_symbols = set()
+    server.b3 = {}
+    server.crypto = {}
+    server.images = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def integration(stub, tmp_path):
+    cache = CacheStore(str(tmp_path / 'cache.sqlite3'))
+    return AssetIntegration(
+        http=requests.Session(),
+        endpoints={'yahoo_spark': f"{stub.base_url}/spark",
+                   'coingecko': f"{stub.base_url}/api"},
+        cache=cache,
+        thumbnails=ThumbnailStore(str(tmp_path / 'logos')),
+    )
+
+
+def _tickers(n):
+    return [f"TCK{i:02d}" for i in range(n)]
+
+
+def _requests_to(stub, path):
+    return [params for p, params in stub.requests if p == path]
+
+
+def test_b3_batches_respect_symbol_limit(stub, integration):
+    tickers = _tickers(2 * B3_BATCH_SIZE + 5)
+    stub.b3 = {f"{t}.SA": float(i) + 1 for i, t in enumerate(tickers)}
+
+    result = integration.get_prices_by_type({'Ações': tickers})
+
+    assert result.errors == {}
+    assert result.prices == {t: float(i) + 1 for i, t in enumerate(tickers)}
+    batches = [p['symbols'].split(',') for p in _requests_to(stub, '/spark')]
+    assert len(batches) == 3
+    assert all(len(b) <= B3_BATCH_SIZE for b in batches)
+    assert sorted(s for b in batches for s in b) == sorted(stub.b3)
+
+
+def test_b3_missing_symbol_is_reported(stub, integration):
+    stub.b3 = {'PETR4.SA': 38.5}
+
+    result = integration.get_prices_by_type({'FIIs': ['PETR4', 'XXXX11']})
+
+    assert result.prices == {'PETR4': 38.5}
+    assert set(result.errors) == {'XXXX11'}
+
+
+def test_crypto_uses_lowercase_ids(stub, integration):
+    stub.crypto = {'btc': 350000.0, 'eth': 18000.0}
+
+    result = integration.get_prices_by_type({'Criptomoedas': ['BTC', 'ETH', 'DOGE']})
+
+    assert result.prices == {'BTC': 350000.0, 'ETH': 18000.0}
+    assert set(result.errors) == {'DOGE'}
+    (params,) = _requests_to(stub, '/api/simple/price')
+    assert params['ids'].split(',') == ['btc', 'eth', 'doge']
+    assert params['vs_currencies'] == 'brl'
+
+
+def test_failed_batch_does_not_drop_the_others(stub, integration):
+    tickers = _tickers(2 * B3_BATCH_SIZE + 5)
+    stub.b3 = {f"{t}.SA": 10.0 for t in tickers}
+    stub.crypto = {'btc': 350000.0}
+    failing = tickers[B3_BATCH_SIZE:2 * B3_BATCH_SIZE]
+    stub.fail_symbols = {f"{failing[0]}.SA"}
+
+    result = integration.get_prices_by_type({'Ações': tickers, 'Criptomoedas': ['BTC']})
+
+    assert set(result.errors) == set(failing)
+    assert set(result.prices) == (set(tickers) - set(failing)) | {'BTC'}
+
+    # Sucessos e falhas ficam em cache: a repetição não vai à rede
+    calls = len(stub.requests)
+    again = integration.get_prices_by_type({'Ações': tickers, 'Criptomoedas': ['BTC']})
+    assert len(stub.requests) == calls
+    assert again.prices == result.prices
+    assert set(again.errors) == set(failing)
+
+
+def test_prefetch_logos_stores_thumbnails(stub, integration):
+    stub.images = {'btc.png': _png(200, 'orange'), 'eth.png': _png(120, 'blue')}
+
+    logos = integration.prefetch_logos(['BTC', 'ETH', 'BTC'])
+
+    assert list(logos) == ['BTC', 'ETH']
+    for path in logos.values():
+        assert os.path.dirname(path) == integration.thumbnails.directory
+        with Image.open(path) as image:
+            assert max(image.size) <= integration.thumbnails.size
+    assert logos['BTC'] != logos['ETH']
+
+    calls = len(stub.requests)
+    assert integration.prefetch_logos(['ETH', 'BTC']) == {'ETH': logos['ETH'], 'BTC': logos['BTC']}
+    assert len(stub.requests) == calls
+
+
+def test_prefetch_logos_falls_back_to_url(stub, integration):
+    stub.images = {'btc.png': _png(64, 'orange')}
+
+    logos = integration.prefetch_logos(['BTC', 'ETH'])
+
+    assert os.path.exists(logos['BTC'])
+    assert logos['ETH'] == f"{stub.base_url}/img/eth.png"
+
+    # Falha cacheada: a imagem não é pedida de novo
+    calls = len(stub.requests)
+    assert integration.prefetch_logos(['ETH'])['ETH'] == logos['ETH']
+    assert len(stub.requests) == calls
@@ -0,0 +1,52 @@
+# tests/test_charts.py
+"""
+Cache de figuras do ChartBuilder
+"""
+import pytest
+
+from components import charts
+from components.charts import ChartBuilder
+
+PORTFOLIO = {
+    'macro': {'A': 60.0, 'B': 40.0},
+    'sub': {'A': {f"a{i}": 100.0 / 20 for i in range(20)}, 'B': {'b1': 100.0}},
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    charts._figure_cache.clear()
+    yield
+    charts._figure_cache.clear()
+
+
+def test_hits_do_not_rebuild(monkeypatch):
+    builder = ChartBuilder(100_000.0)
+    first = builder.create_sunburst_chart(PORTFOLIO, top_n=5)
+
+    monkeypatch.setattr(ChartBuilder, '_build_sunburst',
+                        staticmethod(lambda *a: pytest.fail("figura reconstruída")))
+    again = builder.create_sunburst_chart(PORTFOLIO, top_n=5)
+
+    assert again is not first
+    assert again.to_plotly_json() == first.to_plotly_json()
+
+
+def test_changing_a_figure_does_not_leak_into_the_cache():
+    builder = ChartBuilder(100_000.0)
+    fig = builder.create_allocation_pie(PORTFOLIO['macro'])
+    fig.update_layout(title_text="alterado")
+    fig.data[0].values = (1, 1)
+
+    fresh = builder.create_allocation_pie(PORTFOLIO['macro'])
+    assert fresh.layout.title.text == "Distribuição do Patrimônio"
+    assert list(fresh.data[0].values) == [60.0, 40.0]
+
+
+def test_inputs_change_the_key():
+    builder = ChartBuilder(100_000.0)
+    pie = builder.create_allocation_pie({'A': 50.0, 'B': 50.0})
+    other = builder.create_allocation_pie({'A': 70.0, 'B': 30.0})
+
+    assert list(pie.data[0].values) == [50.0, 50.0]
+    assert list(other.data[0].values) == [70.0, 30.0]
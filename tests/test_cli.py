@@ -0,0 +1,122 @@
+# tests/test_cli.py
+"""
+Linha de comando: saídas espelhadas, erros por arquivo e códigos de saída
+"""
+import csv
+import json
+import os
+
+import pytest
+
+from cerrado.cli import main
+from cerrado.engine.snapshot import SNAPSHOT_EXTENSION
+
+PORTFOLIO = {'macro': {'Ações': 60.0, 'FIIs': 40.0},
+             'sub': {'Ações': {'PETR4': 100.0}, 'FIIs': {'MXRF11': 100.0}}}
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content if isinstance(content, str) else json.dumps(content), encoding='utf-8')
+    return path
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    root = tmp_path / 'carteiras'
+    _write(root / 'a.json', PORTFOLIO)
+    _write(root / 'clientes' / 'b.json', PORTFOLIO)
+    _write(root / 'clientes' / 'vip' / 'c.json', PORTFOLIO)
+    return root
+
+
+def _run(*argv):
+    return main([*argv, '-q', '-j', '1'])
+
+
+def test_export_mirrors_input_folders(inputs, tmp_path):
+    out_dir = tmp_path / 'saida'
+    report = tmp_path / 'relatorio.csv'
+
+    assert _run('export', str(inputs), '--format', 'json', '--out-dir', str(out_dir),
+                '-o', str(report)) == 0
+
+    exported = sorted(os.path.relpath(os.path.join(d, n), out_dir)
+                      for d, _, names in os.walk(out_dir) for n in names)
+    assert exported == sorted([os.path.join('a.json'),
+                               os.path.join('clientes', 'b.json'),
+                               os.path.join('clientes', 'vip', 'c.json')])
+    with open(out_dir / 'clientes' / 'vip' / 'c.json', encoding='utf-8') as f:
+        assert json.load(f) == PORTFOLIO
+
+    header, *rows = _read_csv(report)
+    assert header == ['Arquivo', 'Saída', 'Bytes']
+    assert [row[1] for row in rows] == [str(out_dir / 'a.json'),
+                                        str(out_dir / 'clientes' / 'b.json'),
+                                        str(out_dir / 'clientes' / 'vip' / 'c.json')]
+
+
+def test_export_refuses_colliding_outputs(tmp_path, capsys):
+    root = tmp_path / 'carteiras'
+    _write(root / 'a.json', PORTFOLIO)
+    _write(root / f'a{SNAPSHOT_EXTENSION}', '')
+    out_dir = tmp_path / 'saida'
+
+    assert _run('export', str(root), '--out-dir', str(out_dir)) == 2
+    assert 'a.csv' in capsys.readouterr().err
+    assert not out_dir.exists()
+
+
+def test_failed_file_is_reported_and_the_rest_is_processed(inputs, tmp_path, capsys):
+    broken = _write(inputs / 'clientes' / 'quebrado.json', '{"macro": ')
+    out_dir = tmp_path / 'saida'
+
+    assert _run('export', str(inputs), '--out-dir', str(out_dir)) == 1
+
+    err = capsys.readouterr().err
+    assert str(broken) in err
+    assert str(inputs / 'a.json') not in err
+    assert (out_dir / 'a.csv').exists()
+    assert (out_dir / 'clientes' / 'vip' / 'c.csv').exists()
+    assert not (out_dir / 'clientes' / 'quebrado.csv').exists()
+
+
+def test_validate_lists_invalid_files(inputs, tmp_path):
+    _write(inputs / 'quebrado.json', '[]')
+    report = tmp_path / 'validacao.csv'
+
+    assert _run('validate', str(inputs), '-o', str(report)) == 1
+
+    status = {os.path.basename(row[0]): row[1] for row in _read_csv(report)[1:]}
+    assert status == {'a.json': 'ok', 'b.json': 'ok', 'c.json': 'ok', 'quebrado.json': 'inválido'}
+
+
+def test_missing_input_is_a_failed_file(tmp_path, capsys):
+    missing = str(tmp_path / 'nada.json')
+
+    assert _run('validate', missing) == 1
+
+    rows = list(csv.reader(capsys.readouterr().out.splitlines()))
+    assert rows[1][:2] == [missing, 'inválido']
+
+
+def test_explicit_zero_total_is_not_replaced_by_default(inputs, tmp_path):
+    report = tmp_path / 'valores.csv'
+
+    assert _run('value', str(inputs / 'a.json'), '--total', '0', '-o', str(report)) == 0
+
+    values = [float(row[4]) for row in _read_csv(report)[1:]]
+    assert values and all(value == 0.0 for value in values)
+
+
+@pytest.mark.parametrize('total', ['-1', 'nan', 'inf', 'dez'])
+def test_invalid_total_is_rejected(inputs, total, capsys):
+    with pytest.raises(SystemExit) as exc:
+        _run('value', str(inputs), '--total', total)
+    assert exc.value.code == 2
+    assert '--total' in capsys.readouterr().err
@@ -0,0 +1,94 @@
+# tests/test_export.py
+"""
+Exportação em streaming contra o formato original (pandas) do DataManager e da aba Exportar
+"""
+import gzip
+import json
+
+import pandas as pd
+import pytest
+
+from cerrado.engine.export import (
+    collect,
+    export_payload,
+    iter_app_csv,
+    iter_level_csv,
+)
+from cerrado.engine.frame import PortfolioFrame
+
+PORTFOLIO = {
+    'macro': {'Renda Fixa': 37.5, 'Ações, BR': 33.3, 'FIIs': 19.2, 'Reserva': 10.0},
+    'sub': {
+        'Renda Fixa': {'Tesouro Selic': 100.0},
+        'Ações, BR': {'PETR4': 33.33, 'VALE3': 33.33, 'ITUB "PN"': 33.34},
+        'FIIs': {},
+        'Cripto': {'BTC': 100.0},                  # só em 'sub': fica fora dos CSVs
+    },
+}
+TOTAL = 123_456.78
+
+
+def _baseline_level_csv(portfolio):
+    """Relatório CSV do DataManager antes do PortfolioFrame"""
+    csv_data = []
+    for asset_class, class_allocation in portfolio['macro'].items():
+        csv_data.append({
+            'Nível': 'Classe',
+            'Categoria': asset_class,
+            'Ativo': asset_class,
+            'Alocação (%)': class_allocation,
+            'Porcentagem do Total': class_allocation
+        })
+        if asset_class in portfolio['sub']:
+            for sub_asset, sub_allocation in portfolio['sub'][asset_class].items():
+                total_percentage = (sub_allocation / 100) * class_allocation
+                csv_data.append({
+                    'Nível': 'Sub-ativo',
+                    'Categoria': asset_class,
+                    'Ativo': sub_asset,
+                    'Alocação (%)': sub_allocation,
+                    'Porcentagem do Total': total_percentage
+                })
+    return pd.DataFrame(csv_data).to_csv(index=False)
+
+
+def _baseline_app_csv(portfolio, total):
+    """CSV da aba Exportar antes do PortfolioFrame"""
+    csv_data = []
+    for asset_class, allocation in portfolio['macro'].items():
+        class_value = total * (float(allocation) / 100.0)
+        csv_data.append([asset_class, "", allocation, class_value])
+        if asset_class in portfolio['sub']:
+            for asset_name, asset_percent in portfolio['sub'][asset_class].items():
+                asset_value = class_value * (float(asset_percent) / 100.0)
+                csv_data.append(["", asset_name, asset_percent, asset_value])
+    df_csv = pd.DataFrame(csv_data, columns=["Classe", "Ativo", "Alocação (%)", "Valor (R$)"])
+    return df_csv.to_csv(index=False)
+
+
+@pytest.fixture
+def frame():
+    return PortfolioFrame.from_dict(PORTFOLIO)
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 2, 5000])
+def test_level_csv_matches_data_manager(frame, chunk_rows):
+    assert collect(iter_level_csv(frame, chunk_rows)) == _baseline_level_csv(PORTFOLIO)
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 5000])
+def test_app_csv_matches_export_tab(frame, chunk_rows):
+    assert collect(iter_app_csv(frame, TOTAL, chunk_rows)) == _baseline_app_csv(PORTFOLIO, TOTAL)
+
+
+def test_json_matches_export_tab(frame):
+    payload = export_payload('json', frame, TOTAL)
+
+    assert payload == json.dumps(PORTFOLIO, indent=2, ensure_ascii=False)
+    assert json.loads(payload) == PORTFOLIO
+
+
+def test_gzip_payload_decompresses_to_csv(frame):
+    payload = export_payload('csv.gz', frame, TOTAL)
+
+    assert gzip.decompress(payload).decode('utf-8') == _baseline_app_csv(PORTFOLIO, TOTAL)
@@ -0,0 +1,103 @@
+# tests/test_frame.py
+"""
+PortfolioFrame: ida e volta do dict, ordenação, valuate e hash do conteúdo
+"""
+import numpy as np
+import pytest
+
+from cerrado.engine.frame import PortfolioFrame
+
+PORTFOLIO = {
+    'macro': {'Renda Fixa': 40.0, 'Ações': 35.0, 'FIIs': 15.0, 'Reserva': 10.0},
+    'sub': {
+        'Ações': {'VALE3': 30.0, 'PETR4': 50.0, 'ITUB4': 20.0},
+        'Renda Fixa': {'Tesouro Selic': 100.0},
+        'FIIs': {},                                # classe sem ativos
+        'Cripto': {'BTC': 70.0, 'ETH': 30.0},      # só em 'sub'
+    },
+}
+
+
+def test_round_trip_keeps_content_and_order():
+    frame = PortfolioFrame.from_dict(PORTFOLIO)
+    result = frame.to_dict()
+
+    assert result == PORTFOLIO
+    assert list(result['macro']) == list(PORTFOLIO['macro'])
+    assert list(result['sub']['Ações']) == ['VALE3', 'PETR4', 'ITUB4']
+    # 'sub' segue a ordem das classes: macro primeiro, depois as só de 'sub'
+    assert list(result['sub']) == ['Renda Fixa', 'Ações', 'FIIs', 'Cripto']
+    assert PortfolioFrame.from_dict(result).to_dict() == PORTFOLIO
+
+
+def test_empty_and_missing_sub_classes():
+    frame = PortfolioFrame.from_dict(PORTFOLIO)
+
+    assert frame.classes == ['Renda Fixa', 'Ações', 'FIIs', 'Reserva', 'Cripto']
+    np.testing.assert_array_equal(frame.counts, [1, 3, 0, 0, 2])
+    np.testing.assert_array_equal(frame.offsets, [0, 1, 4, 4, 4, 6])
+    np.testing.assert_array_equal(frame.has_sub, [True, True, True, False, True])
+    np.testing.assert_array_equal(frame.in_macro, [True, True, True, True, False])
+    assert frame.macro[4] == 0.0
+    assert frame.class_slice(2) == slice(4, 4)
+    assert frame.assets[frame.class_slice(1)].tolist() == ['VALE3', 'PETR4', 'ITUB4']
+
+    result = frame.to_dict()
+    assert result['sub']['FIIs'] == {}
+    assert 'Reserva' not in result['sub']
+    assert 'Cripto' not in result['macro']
+
+
+def test_empty_portfolio():
+    frame = PortfolioFrame.from_dict({})
+
+    assert len(frame) == 0
+    assert frame.to_dict() == {'macro': {}, 'sub': {}}
+    assert frame.valuate(1000.0).class_sums.size == 0
+
+
+def test_rows_are_grouped_by_class():
+    frame = PortfolioFrame(['A', 'B'], [50.0, 50.0], class_ids=[1, 0, 1, 0],
+                           assets=['b1', 'a1', 'b2', 'a2'], percents=[60.0, 30.0, 40.0, 70.0])
+
+    assert frame.assets.tolist() == ['a1', 'a2', 'b1', 'b2']
+    assert frame.percents.tolist() == [30.0, 70.0, 60.0, 40.0]
+    assert frame.to_dict()['sub'] == {'A': {'a1': 30.0, 'a2': 70.0}, 'B': {'b1': 60.0, 'b2': 40.0}}
+
+
+def test_valuate():
+    frame = PortfolioFrame.from_dict({
+        'macro': {'Ações': 60.0, 'FIIs': 40.0},
+        'sub': {'Ações': {'PETR4': 50.0, 'VALE3': 30.0}, 'FIIs': {'MXRF11': 100.0}},
+    })
+
+    valuation = frame.valuate(10_000.0)
+
+    np.testing.assert_allclose(valuation.class_values, [6000.0, 4000.0])
+    np.testing.assert_allclose(valuation.asset_values, [3000.0, 1800.0, 4000.0])
+    np.testing.assert_allclose(valuation.asset_shares, [30.0, 18.0, 40.0])
+    np.testing.assert_allclose(valuation.class_sums, [80.0, 100.0])
+    np.testing.assert_array_equal(valuation.class_counts, [2, 1])
+
+
+def test_content_hash():
+    frame = PortfolioFrame.from_dict(PORTFOLIO)
+
+    assert frame.content_hash() == PortfolioFrame.from_dict(frame.to_dict()).content_hash()
+
+    changed = PortfolioFrame.from_dict({**PORTFOLIO, 'macro': {**PORTFOLIO['macro'], 'Reserva': 11.0}})
+    renamed = PortfolioFrame.from_dict({**PORTFOLIO, 'sub': {**PORTFOLIO['sub'], 'FIIs': {'HGLG11': 100.0}}})
+    no_empty = PortfolioFrame.from_dict({**PORTFOLIO, 'sub': {
+        k: v for k, v in PORTFOLIO['sub'].items() if k != 'FIIs'}})
+    hashes = {f.content_hash() for f in (frame, changed, renamed, no_empty)}
+    assert len(hashes) == 4
+
+
+@pytest.mark.parametrize('portfolio', [
+    {'macro': {'A': 100.0}},
+    {'sub': {'A': {'x': 100.0}}},
+    {'macro': {'A': 50.0, 'B': 50.0}, 'sub': {'B': {'y': 100.0}, 'A': {'x': 100.0}}},
+])
+def test_round_trip_of_partial_portfolios(portfolio):
+    result = PortfolioFrame.from_dict(portfolio).to_dict()
+    assert result == {'macro': portfolio.get('macro', {}), 'sub': portfolio.get('sub', {})}
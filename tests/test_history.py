@@ -0,0 +1,105 @@
+# tests/test_history.py
+"""
+Desfazer/refazer: pilhas, limite de passos e isolamento dos snapshots
+"""
+import copy
+
+from utils.history import History, freeze, same_state, thaw
+
+PORTFOLIO = {'macro': {'Ações': 60.0, 'FIIs': 40.0},
+             'sub': {'Ações': {'PETR4': 50.0, 'VALE3': 50.0}, 'FIIs': {'MXRF11': 100.0}}}
+
+
+def _step(portfolio, value):
+    portfolio = copy.deepcopy(portfolio)
+    portfolio['sub']['Ações'] = {'PETR4': value, 'VALE3': 100.0 - value}
+    return portfolio
+
+
+def _history():
+    return History(freeze(PORTFOLIO, 1000.0))
+
+
+def test_undo_and_redo_walk_the_steps():
+    history = _history()
+    assert history.record(_step(PORTFOLIO, 60.0), 1000.0)
+    assert history.record(_step(PORTFOLIO, 70.0), 1000.0)
+
+    assert thaw(history.undo()) == _step(PORTFOLIO, 60.0)
+    assert thaw(history.undo()) == PORTFOLIO
+    assert history.undo() is None
+    assert thaw(history.redo()) == _step(PORTFOLIO, 60.0)
+    assert thaw(history.redo()) == _step(PORTFOLIO, 70.0)
+    assert history.redo() is None
+
+
+def test_new_step_after_undo_clears_redo():
+    history = _history()
+    history.record(_step(PORTFOLIO, 60.0), 1000.0)
+    history.record(_step(PORTFOLIO, 70.0), 1000.0)
+    history.undo()
+    assert history.can_redo
+
+    assert history.record(_step(PORTFOLIO, 80.0), 1000.0)
+
+    assert not history.can_redo
+    assert history.redo() is None
+    assert thaw(history.undo()) == _step(PORTFOLIO, 60.0)
+
+
+def test_unchanged_state_and_amend_do_not_create_steps():
+    history = _history()
+
+    assert not history.record(copy.deepcopy(PORTFOLIO), 1000.0)
+    assert not history.record(_step(PORTFOLIO, 60.0), 1000.0, amend=True)
+    assert not history.can_undo
+    assert thaw(history.current) == _step(PORTFOLIO, 60.0)
+
+
+def test_history_is_bounded_by_limit():
+    history = History(freeze(PORTFOLIO, 1000.0), limit=3)
+    for value in range(1, 11):
+        history.record(_step(PORTFOLIO, float(value)), 1000.0)
+
+    undone = []
+    while history.can_undo:
+        undone.append(thaw(history.undo())['sub']['Ações']['PETR4'])
+
+    assert undone == [9.0, 8.0, 7.0]
+    redone = 0
+    while history.redo() is not None:
+        redone += 1
+    assert redone == 3
+
+
+def test_snapshots_do_not_share_state_with_the_live_portfolio():
+    live = copy.deepcopy(PORTFOLIO)
+    history = History(freeze(live, 1000.0))
+
+    # Edição in-place do dict da sessão não altera o snapshot já gravado
+    live['sub']['Ações']['PETR4'] = 10.0
+    live['macro']['FIIs'] = 90.0
+    history.record(live, 1000.0)
+
+    restored = thaw(history.undo())
+    assert restored == PORTFOLIO
+
+    # O dict restaurado vira o estado da sessão e volta a ser editado in-place
+    restored['sub']['FIIs']['HGLG11'] = 0.0
+    restored['macro']['Ações'] = 0.0
+    assert thaw(history.current) == PORTFOLIO
+    assert thaw(history.redo())['sub']['Ações']['PETR4'] == 10.0
+    assert thaw(history.undo()) == PORTFOLIO
+
+
+def test_unchanged_classes_share_nodes():
+    base = freeze(PORTFOLIO, 1000.0)
+    edited = _step(PORTFOLIO, 60.0)
+
+    snapshot = freeze(edited, 1000.0, base, changed={'Ações'})
+
+    assert snapshot.sub['FIIs'] is base.sub['FIIs']
+    assert snapshot.macro is base.macro
+    assert snapshot.sub['Ações'] != base.sub['Ações']
+    assert not same_state(snapshot, base)
+    assert same_state(freeze(PORTFOLIO, 1000.0, snapshot), base)
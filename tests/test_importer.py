@@ -0,0 +1,58 @@
+# tests/test_importer.py
+"""
+Importação de portfólios JSON em streaming
+"""
+import io
+import json
+
+import pytest
+
+from cerrado.engine import importer
+from cerrado.engine.frame import PortfolioFrame
+from cerrado.engine.importer import PortfolioImportError, import_portfolio
+
+
+@pytest.fixture(params=[True, False], ids=['ijson', 'json'])
+def parser(request, monkeypatch):
+    if request.param and not importer.IJSON_OK:
+        pytest.skip("ijson não instalado")
+    monkeypatch.setattr(importer, 'IJSON_OK', request.param)
+
+
+def _import(portfolio):
+    return import_portfolio(io.BytesIO(json.dumps(portfolio).encode()))
+
+
+@pytest.mark.parametrize('portfolio', [
+    {"macro": {"A": 60, "B": 40}, "sub": {"A": {"a1": 70, "a2": 30}, "B": {"b1": 100}}},
+    {"sub": {"B": {"b1": 100}}, "macro": {"A": 50, "B": 50}},
+    {"macro": {"A": 50, "B": 50}, "sub": {"C": {"c1": 100}, "B": {"b1": 60, "b2": 40}}},
+    {"sub": {"C": {"c1": 100}, "A": {}}, "macro": {"B": 100, "A": 0}},
+])
+def test_matches_from_dict(parser, portfolio):
+    frame = _import(portfolio)
+    expected = PortfolioFrame.from_dict(portfolio)
+
+    assert frame.classes == expected.classes
+    assert frame.to_dict() == expected.to_dict()
+    assert frame.content_hash() == expected.content_hash()
+
+
+@pytest.mark.parametrize('portfolio, path', [
+    ({"macro": {" ": 100}, "sub": {}}, "macro"),
+    ({"macro": {"A": 100}, "sub": {"": {}}}, "sub"),
+    ({"macro": {"A": 100}, "sub": {"A": {"  ": 100}}}, "sub.A"),
+])
+def test_rejects_empty_names(parser, portfolio, path):
+    with pytest.raises(PortfolioImportError, match="nome vazio") as info:
+        _import(portfolio)
+    assert info.value.path == path
+
+
+def test_rejects_duplicate_assets():
+    # json.load descarta chaves repetidas: só o ijson detecta a duplicata
+    if not importer.IJSON_OK:
+        pytest.skip("ijson não instalado")
+    data = b'{"macro": {"A": 100}, "sub": {"A": {"a1": 50, "a1": 50}}}'
+    with pytest.raises(PortfolioImportError, match="ativo duplicado"):
+        import_portfolio(io.BytesIO(data))
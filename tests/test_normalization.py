@@ -0,0 +1,90 @@
+# tests/test_normalization.py
+"""
+Normalização com travas e limites
+"""
+import numpy as np
+import pytest
+
+from cerrado.engine.normalization import (
+    NormalizationError,
+    equal_allocation,
+    normalize_allocation,
+    project_simplex,
+)
+
+
+def _bisection(values, total, lower, upper, locked, iterations=200):
+    """Referência: tau por bissecção em sum(clip(v - tau, lo, hi)) = restante"""
+    free = ~locked
+    remaining = total - values[locked].sum()
+    x, lo, hi = values[free], lower[free], upper[free]
+    result = values.copy()
+    if x.size == 0:
+        return result
+    a, b = (x - hi).min() - 1.0, (x - lo).max() + 1.0
+    for _ in range(iterations):
+        tau = (a + b) / 2
+        if np.clip(x - tau, lo, hi).sum() > remaining:
+            a = tau
+        else:
+            b = tau
+    result[free] = np.clip(x - (a + b) / 2, lo, hi)
+    return result
+
+
+def test_projection_matches_bisection_reference():
+    rng = np.random.default_rng(2024)
+    checked = 0
+    for _ in range(2000):
+        n = int(rng.integers(1, 30))
+        values = rng.uniform(-50.0, 150.0, n)
+        lower = np.where(rng.random(n) < 0.3, rng.uniform(0.0, 10.0, n), 0.0)
+        upper = np.where(rng.random(n) < 0.3, lower + rng.uniform(0.0, 60.0, n), 100.0)
+        locked = rng.random(n) < 0.2
+        values[locked] = rng.uniform(0.0, 30.0, int(locked.sum()))
+
+        remaining = 100.0 - values[locked].sum()
+        feasible = (lower[~locked].sum() <= remaining + 1e-9
+                    and upper[~locked].sum() >= remaining - 1e-9)
+        if not feasible:
+            with pytest.raises(NormalizationError):
+                project_simplex(values, 100.0, lower, upper, locked)
+            continue
+
+        result = project_simplex(values, 100.0, lower, upper, locked)
+        expected = _bisection(values, 100.0, lower, upper, locked)
+        np.testing.assert_allclose(result, expected, atol=1e-6)
+        assert result.sum() == pytest.approx(100.0, abs=1e-6)
+        checked += 1
+    assert checked > 500
+
+
+def test_unconstrained_normalization_is_proportional():
+    result = normalize_allocation({'a': 100.0, 'b': 1.0, 'c': 1.0, 'd': 50.0})
+
+    assert list(result) == ['a', 'b', 'c', 'd']
+    assert sum(result.values()) == pytest.approx(100.0)
+    assert result['b'] == pytest.approx(100.0 / 152.0)
+    assert result['a'] / result['d'] == pytest.approx(2.0)
+
+
+def test_constraints_use_projection():
+    constraints = {'a': (True, 0.0, 100.0), 'b': (False, 0.0, 30.0)}
+    result = normalize_allocation({'a': 50.0, 'b': 40.0, 'c': 40.0}, constraints)
+
+    assert result['a'] == 50.0
+    assert result['b'] <= 30.0
+    assert sum(result.values()) == pytest.approx(100.0)
+
+
+def test_incompatible_constraints_raise():
+    constraints = {'a': (True, 0.0, 100.0), 'b': (False, 20.0, 100.0)}
+    with pytest.raises(NormalizationError):
+        normalize_allocation({'a': 90.0, 'b': 0.0}, constraints)
+
+
+def test_equal_allocation_keeps_locked_entries():
+    constraints = {'a': (True, 0.0, 100.0)}
+    result = equal_allocation({'a': 40.0, 'b': 10.0, 'c': 50.0}, constraints)
+
+    assert result == pytest.approx({'a': 40.0, 'b': 30.0, 'c': 30.0})
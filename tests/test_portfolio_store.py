@@ -0,0 +1,169 @@
+# tests/test_portfolio_store.py
+"""
+Gravação em segundo plano, novas tentativas, fechamento e donos do store
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from utils.portfolio_store import MAX_ATTEMPTS, PortfolioStore
+
+PORTFOLIO = {'macro': {'Ações': 60.0, 'FIIs': 40.0},
+             'sub': {'Ações': {'PETR4': 100.0}, 'FIIs': {'MXRF11': 100.0}}}
+CHANGED = {'macro': {'Ações': 50.0, 'FIIs': 50.0},
+           'sub': {'Ações': {'PETR4': 100.0}, 'FIIs': {'MXRF11': 100.0}}}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'portfolios.sqlite3')
+
+
+@pytest.fixture
+def store(path):
+    store = PortfolioStore(path, flush_interval=0.01)
+    yield store
+    store.close(timeout=1.0)
+
+
+def test_save_is_written_in_background(store):
+    store.save('Carteira', PORTFOLIO, 1000.0)
+    store.save('Carteira', CHANGED, 2000.0)      # só o último estado vai ao disco
+
+    assert store.flush(timeout=5.0)
+    assert store.load('Carteira') == (CHANGED, 2000.0)
+    assert [v.version for v in store.versions('Carteira')] == [1]
+
+    store.save('Carteira', CHANGED, 2000.0)      # sem mudança: não cria versão
+    store.save('Carteira', PORTFOLIO, 1000.0)
+    assert store.flush(timeout=5.0)
+    store.save('Carteira', PORTFOLIO, 1000.0)
+    assert store.flush(timeout=5.0)
+    assert [v.version for v in store.versions('Carteira')] == [2, 1]
+    assert store.load('Carteira', version=1) == (CHANGED, 2000.0)
+
+
+def test_failed_batch_is_retried(store, monkeypatch):
+    write = store._write_batch
+    calls = []
+
+    def flaky(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        write(batch)
+    monkeypatch.setattr(store, '_write_batch', flaky)
+
+    store.save('Carteira', PORTFOLIO)
+
+    assert store.flush(timeout=5.0)
+    assert len(calls) == 2
+    assert store.stats['failed'] == 1
+    assert store.last_error is None
+    assert store.load('Carteira') == (PORTFOLIO, None)
+
+
+def test_version_is_dropped_after_max_attempts(store, monkeypatch):
+    calls = []
+
+    def broken(batch):
+        calls.append(batch)
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(store, '_write_batch', broken)
+
+    store.save('Carteira', PORTFOLIO)
+
+    assert store.flush(timeout=5.0)              # a thread continua viva
+    assert len(calls) == MAX_ATTEMPTS
+    assert store.stats['dropped'] == 1
+    assert isinstance(store.last_error, sqlite3.OperationalError)
+
+    monkeypatch.undo()
+    store.save('Carteira', CHANGED)
+    assert store.flush(timeout=5.0)
+    assert store.last_error is None
+    assert store.load('Carteira') == (CHANGED, None)
+
+
+def test_close_writes_pending_saves(path):
+    store = PortfolioStore(path, flush_interval=60.0)
+    store.save('Carteira', PORTFOLIO, 500.0)
+
+    store.close(timeout=5.0)
+
+    reopened = PortfolioStore(path)
+    try:
+        assert reopened.load('Carteira') == (PORTFOLIO, 500.0)
+    finally:
+        reopened.close()
+
+
+def test_close_is_bounded_by_timeout(store, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(store, '_write_batch', lambda batch: release.wait())
+    store.save('Carteira', PORTFOLIO)
+
+    start = time.perf_counter()
+    store.close(timeout=0.2)
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert elapsed < 2.0
+    assert store._closed
+
+
+def test_owners_do_not_share_portfolios(store):
+    store.save('Meu portfólio', PORTFOLIO, 100.0, owner='a')
+    store.save('Meu portfólio', CHANGED, 200.0, owner='b')
+    assert store.flush(timeout=5.0)
+
+    assert store.load('Meu portfólio', owner='a') == (PORTFOLIO, 100.0)
+    assert store.load('Meu portfólio', owner='b') == (CHANGED, 200.0)
+    assert [i.name for i in store.list_portfolios('a')] == ['Meu portfólio']
+    assert store.list_portfolios() == []
+    assert store.load('Meu portfólio') == (None, None)
+
+    store.delete('Meu portfólio', owner='a')
+    assert store.load('Meu portfólio', owner='a') == (None, None)
+    assert store.load('Meu portfólio', owner='b') == (CHANGED, 200.0)
+
+
+def test_database_without_owners_is_migrated(path):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE portfolios (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            head INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE versions (
+            portfolio_id INTEGER NOT NULL REFERENCES portfolios (id) ON DELETE CASCADE,
+            version INTEGER NOT NULL,
+            saved_at REAL NOT NULL,
+            total REAL,
+            content_hash TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (portfolio_id, version)
+        );
+        INSERT INTO portfolios VALUES (7, 'Antigo', 1, 1.0);
+        INSERT INTO versions VALUES (7, 1, 1.0, 300.0, 'x', '{"macro": {"FIIs": 100.0}, "sub": {}}');
+    """)
+    conn.close()
+
+    store = PortfolioStore(path, flush_interval=0.01)
+    try:
+        assert [i.name for i in store.list_portfolios()] == ['Antigo']
+        assert store.load('Antigo') == ({'macro': {'FIIs': 100.0}, 'sub': {}}, 300.0)
+
+        store.save('Antigo', PORTFOLIO, owner='a')
+        assert store.flush(timeout=5.0)
+        assert store.load('Antigo', owner='a') == (PORTFOLIO, None)
+
+        store.delete('Antigo')                   # a FK continua valendo
+        with store.pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM versions WHERE portfolio_id = 7").fetchone() == (0,)
+    finally:
+        store.close()
@@ -0,0 +1,153 @@
+# tests/test_rebalance.py
+"""
+Ordens de rebalanceamento e alinhamento de posições
+"""
+import numpy as np
+import pytest
+
+from cerrado.engine.frame import PortfolioFrame
+from cerrado.engine.rebalance import (
+    align_positions,
+    allocate_contribution,
+    include_holdings,
+    plan_rebalance,
+    target_weights,
+)
+
+TARGET = PortfolioFrame.from_dict({
+    'macro': {'Ações': 60.0, 'FIIs': 40.0},
+    'sub': {'Ações': {'PETR4': 50.0, 'VALE3': 50.0}, 'FIIs': {'MXRF11': 100.0}},
+})
+
+
+def _orders(frame, plan):
+    return {frame.assets[row]: quantity for row, quantity in
+            zip(plan.orders['row'].tolist(), plan.orders['quantity'].tolist())}
+
+
+def test_align_positions_fills_missing_rows():
+    quantities, prices, lots = align_positions(TARGET, {
+        ('Ações', 'VALE3'): (10.0, 60.0, 100.0),
+        ('FIIs', 'MXRF11'): (5.0, 10.0),
+    })
+
+    np.testing.assert_array_equal(quantities, [0.0, 10.0, 5.0])
+    np.testing.assert_array_equal(prices[1:], [60.0, 10.0])
+    assert np.isnan(prices[0])
+    np.testing.assert_array_equal(lots, [1.0, 100.0, 1.0])
+
+
+def test_orders_are_truncated_to_whole_lots():
+    # Alvo: 3000 em cada ação e 4000 no FII; lotes de 100 ações a R$ 7
+    plan = plan_rebalance(TARGET, quantities=[0, 0, 0], prices=[7.0, 7.0, 10.0],
+                          lot_sizes=[100.0, 100.0, 1.0], cash=10_000.0)
+    orders = _orders(TARGET, plan)
+
+    assert orders == {'PETR4': 400.0, 'VALE3': 400.0, 'MXRF11': 400.0}
+    assert plan.cash == pytest.approx(10_000.0 - 2 * 2800.0 - 4000.0)
+    assert np.all(plan.orders['quantity'] % np.array([100.0, 100.0, 1.0])[plan.orders['row']] == 0)
+
+
+def test_sells_never_exceed_holdings_and_buys_fit_cash():
+    plan = plan_rebalance(TARGET, quantities=[1000, 0, 0], prices=[10.0, 10.0, 10.0])
+    orders = _orders(TARGET, plan)
+
+    assert -orders['PETR4'] <= 1000
+    assert orders['PETR4'] == -700.0
+    # Compras pagas só com as vendas (sem caixa)
+    assert orders['VALE3'] * 10 + orders['MXRF11'] * 10 <= 7000.0
+    assert plan.cash >= 0
+    assert plan.orders['value'][0] < 0  # vendas primeiro
+
+
+def test_buys_are_scaled_down_to_available_cash():
+    plan = plan_rebalance(TARGET, quantities=[0, 0, 0], prices=[10.0, 10.0, 10.0], cash=1000.0)
+    assert plan.orders['value'].sum() <= 1000.0
+    assert plan.cash >= 0
+
+
+def test_drift_band_skips_small_deviations():
+    plan = plan_rebalance(TARGET, quantities=[31, 29, 40], prices=[10.0, 10.0, 10.0],
+                          drift_band=2.0)
+    assert len(plan.orders) == 0
+
+
+def test_holdings_outside_the_target_are_sold():
+    positions = {
+        ('Ações', 'PETR4'): (300.0, 10.0),
+        ('Ações', 'ITUB4'): (200.0, 10.0),       # saiu do alvo
+        ('Cripto', 'BTC'): (1.0, 100.0),         # classe fora do alvo
+        ('FIIs', 'HGLG11'): (0.0, 10.0),          # sem quantidade: ignorada
+    }
+    frame, added = include_holdings(TARGET, positions)
+
+    assert frame.classes == ['Ações', 'FIIs', 'Cripto']
+    assert sorted(frame.assets[added].tolist()) == ['BTC', 'ITUB4']
+    assert frame.to_dict()['sub']['Ações'] == {'PETR4': 50.0, 'VALE3': 50.0, 'ITUB4': 0.0}
+    assert not frame.in_macro[2]
+
+    quantities, prices, lots = align_positions(frame, positions)
+    plan = plan_rebalance(frame, quantities, prices, lots)
+    orders = _orders(frame, plan)
+
+    assert plan.total == pytest.approx(3000.0 + 2000.0 + 100.0)
+    assert orders['ITUB4'] == -200.0
+    assert orders['BTC'] == -1.0
+    weights = (quantities * np.nan_to_num(prices)
+               + np.bincount(plan.orders['row'], plan.orders['value'], len(frame)))
+    assert weights[added].sum() == 0.0
+
+
+def test_include_holdings_without_extra_positions_keeps_the_frame():
+    frame, added = include_holdings(TARGET, {('Ações', 'PETR4'): (10.0, 1.0)})
+    assert frame is TARGET
+    assert not added.any()
+
+
+def test_contribution_fills_the_largest_deficit_first():
+    # Após o aporte: alvo 2520/2520/3360; déficits 2520, -480 e 360
+    plan = allocate_contribution(TARGET, quantities=[0, 3000, 3000],
+                                 prices=[1.0, 1.0, 1.0], amount=2400.0)
+    orders = _orders(TARGET, plan)
+
+    assert orders == {'PETR4': 2280.0, 'MXRF11': 120.0}
+    assert plan.cash == 0.0
+    # Os dois déficits terminam no mesmo nível (240)
+    np.testing.assert_allclose(plan.drift_after[[0, 2]], -240.0 / 8400.0 * 100.0)
+
+    # Aporte menor não alcança o déficit do FII
+    plan = allocate_contribution(TARGET, quantities=[0, 3000, 3000],
+                                 prices=[1.0, 1.0, 1.0], amount=2000.0)
+    assert _orders(TARGET, plan) == {'PETR4': 2000.0}
+
+
+def test_contribution_conserves_money_and_never_overshoots():
+    rng = np.random.default_rng(18)
+    for _ in range(300):
+        quantities = rng.integers(0, 500, 3).astype(float)
+        prices = rng.uniform(1.0, 80.0, 3)
+        lots = rng.choice([1.0, 10.0, 100.0], 3)
+        amount = float(rng.uniform(0.0, 20_000.0))
+
+        plan = allocate_contribution(TARGET, quantities, prices, amount, lots)
+
+        assert (plan.orders['quantity'] > 0).all()
+        spent = plan.orders['value'].sum()
+        assert spent + plan.cash == pytest.approx(amount)
+        assert plan.cash >= -1e-9
+
+        after = quantities * prices + np.bincount(plan.orders['row'], plan.orders['value'], 3)
+        targets = target_weights(TARGET) / 100.0 * plan.total
+        bought = np.bincount(plan.orders['row'], minlength=3) > 0
+        assert (after[bought] <= targets[bought] + 1e-6).all()
+
+
+def test_leftover_lot_is_not_bought_past_the_target():
+    # Alvo 750/750/1000 e lotes de R$ 1000: só o FII cabe; sobram R$ 1500,
+    # mas um lote a mais em qualquer ação passaria R$ 250 do alvo
+    plan = allocate_contribution(TARGET, quantities=[0, 0, 0],
+                                 prices=[10.0, 10.0, 10.0], amount=2500.0,
+                                 lot_sizes=100.0)
+
+    assert _orders(TARGET, plan) == {'MXRF11': 100.0}
+    assert plan.cash == pytest.approx(1500.0)
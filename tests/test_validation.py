@@ -0,0 +1,50 @@
+# tests/test_validation.py
+"""
+Validação vetorizada do portfólio
+"""
+import math
+
+import pytest
+
+from cerrado.engine.frame import PortfolioFrame
+from cerrado.engine.validation import (
+    EMPTY_NAME,
+    MACRO_SUM,
+    NEGATIVE_SUB,
+    SUB_SUM,
+    PortfolioValidator,
+    validate_frame,
+)
+
+
+def _codes(portfolio):
+    return sorted(set(validate_frame(PortfolioFrame.from_dict(portfolio))['code'].tolist()))
+
+
+def test_valid_portfolio_has_no_issues():
+    portfolio = {'macro': {'A': 60.0, 'B': 40.0},
+                 'sub': {'A': {'a1': 50.0, 'a2': 50.0}, 'B': {'b1': 100.0}}}
+    assert _codes(portfolio) == []
+    assert all(valid for _, valid, _ in PortfolioValidator.full_portfolio_validation(portfolio))
+
+
+def test_reports_sums_names_and_negatives():
+    portfolio = {'macro': {'A': 60.0, 'B': 30.0},
+                 'sub': {'A': {'a1': 120.0, ' ': -20.0}, 'B': {'b1': 90.0}}}
+    assert _codes(portfolio) == sorted([MACRO_SUM, SUB_SUM, EMPTY_NAME, NEGATIVE_SUB])
+
+
+@pytest.mark.parametrize('bad', [math.nan, math.inf, -math.inf])
+def test_non_finite_values_are_invalid(bad):
+    portfolio = {'macro': {'A': bad}, 'sub': {'A': {'x': bad}}}
+
+    assert {MACRO_SUM, SUB_SUM} <= set(_codes(portfolio))
+    valid = {name: ok for name, ok, _ in PortfolioValidator.full_portfolio_validation(portfolio)}
+    assert not valid["Alocação Macro"]
+    assert not valid["Sub-alocações"]
+
+
+@pytest.mark.parametrize('bad', [math.nan, math.inf])
+def test_non_finite_sub_value_in_valid_macro(bad):
+    portfolio = {'macro': {'A': 100.0}, 'sub': {'A': {'x': 100.0, 'y': bad}}}
+    assert _codes(portfolio) == [SUB_SUM]
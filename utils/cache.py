@@ -0,0 +1,169 @@
+# utils/cache.py
+"""
+Cache persistente (SQLite) compartilhado entre sessões e processos
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from cerrado.engine.memo import MemoryLRU  # noqa: F401 (reexportado)
+
+# Validade por tipo de entrada (segundos)
+DEFAULT_TTLS = {
+    'price': 5 * 60,
+    'logo': 7 * 24 * 3600,
+}
+
+# Validade das falhas cacheadas (evita repetir consultas que falharam)
+DEFAULT_NEGATIVE_TTLS = {
+    'price': 60,
+    'logo': 6 * 3600,
+}
+
+DEFAULT_PATH = os.environ.get(
+    'CERRADO_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'diagrama_cerrado', 'cache.sqlite3')
+)
+
+# A evicção LRU roda a cada N gravações
+EVICT_EVERY = 64
+
+
+class CacheStore:
+    """Cache chave/valor com TTL por tipo, evicção LRU e cache negativo"""
+    
+    def __init__(self, path=DEFAULT_PATH, ttls=None, negative_ttls=None, max_entries=10_000):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.negative_ttls = {**DEFAULT_NEGATIVE_TTLS, **(negative_ttls or {})}
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._writes = 0
+        self._lock = threading.Lock()
+        
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT,
+                negative INTEGER NOT NULL DEFAULT 0,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (accessed_at)")
+    
+    def lookup(self, kind, key):
+        """
+        Busca uma entrada
+        
+        Returns:
+            tuple: (encontrado, valor). Uma falha cacheada retorna
+            (True, None); ausência ou entrada expirada retorna (False, None)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, negative, expires_at FROM cache WHERE kind = ? AND key = ?",
+                (kind, key)
+            ).fetchone()
+            
+            if row is None or row[2] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache WHERE kind = ? AND key = ?", (kind, key))
+                self.stats[f"{kind}_miss"] += 1
+                return False, None
+            
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE kind = ? AND key = ?",
+                (now, kind, key)
+            )
+            if row[1]:
+                self.stats[f"{kind}_negative_hit"] += 1
+                return True, None
+            self.stats[f"{kind}_hit"] += 1
+            return True, json.loads(row[0])
+    
+    def set(self, kind, key, value):
+        """Grava um valor (serializável em JSON)"""
+        self._write(kind, key, json.dumps(value), 0, self.ttls.get(kind, 3600))
+    
+    def set_failure(self, kind, key):
+        """Grava uma falha de consulta (cache negativo)"""
+        self._write(kind, key, None, 1, self.negative_ttls.get(kind, 60))
+    
+    def get_or_fetch(self, kind, key, fetch):
+        """Retorna o valor cacheado ou chama `fetch()`; None/exceção vira falha cacheada"""
+        found, value = self.lookup(kind, key)
+        if found:
+            return value
+        try:
+            value = fetch()
+        except Exception:
+            value = None
+        if value is None:
+            self.set_failure(kind, key)
+        else:
+            self.set(kind, key, value)
+        return value
+    
+    def _write(self, kind, key, value, negative, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (kind, key, value, negative, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, value, negative, now + ttl, now)
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict(now)
+    
+    def _evict(self, now):
+        """Remove expirados e, acima do limite, os menos usados recentemente"""
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE rowid IN "
+                "(SELECT rowid FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+            self.stats['evicted'] += excess
+    
+    def clear(self, kind=None):
+        """Limpa o cache inteiro ou apenas um tipo"""
+        with self._lock:
+            if kind is None:
+                self._conn.execute("DELETE FROM cache")
+            else:
+                self._conn.execute("DELETE FROM cache WHERE kind = ?", (kind,))
+    
+    def hit_ratio(self, kind):
+        """Proporção de acertos (inclui falhas cacheadas) para um tipo"""
+        hits = self.stats[f"{kind}_hit"] + self.stats[f"{kind}_negative_hit"]
+        total = hits + self.stats[f"{kind}_miss"]
+        return hits / total if total else 0.0
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Instância única por processo (o arquivo é compartilhado entre processos)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = CacheStore()
+        return _default_cache
@@ -0,0 +1,20 @@
+# utils/export.py
+"""
+Compatibilidade: a exportação agora vive em cerrado.engine.export
+"""
+from cerrado.engine.export import (  # noqa: F401
+    APP_CSV_COLUMNS,
+    CHUNK_ROWS,
+    EXPORT_BUILDERS,
+    EXPORT_CACHE_ENTRIES,
+    LEVEL_CSV_COLUMNS,
+    collect,
+    deferred_export,
+    export_payload,
+    iter_app_csv,
+    iter_app_rows,
+    iter_csv,
+    iter_gzip,
+    iter_level_csv,
+    iter_level_rows
+)
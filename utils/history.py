@@ -0,0 +1,125 @@
+# utils/history.py
+"""
+Histórico de edições (desfazer/refazer) com snapshots imutáveis compartilhados
+"""
+from collections import deque, namedtuple
+
+# Limite de passos guardados para desfazer
+HISTORY_LIMIT = 200
+
+# Sub-ativos de uma classe, imutáveis: reaproveitados entre snapshots
+ClassNode = namedtuple('ClassNode', ['assets', 'percents'])
+
+# Estado completo do portfólio num ponto do histórico
+Snapshot = namedtuple('Snapshot', [
+    'macro',   # tupla de pares (classe, %)
+    'sub',     # {classe: ClassNode}; nós de classes inalteradas são compartilhados
+    'total',   # patrimônio total
+])
+
+
+def class_node(assets_dict, base=None):
+    """Nó imutável dos sub-ativos; devolve `base` se o conteúdo não mudou"""
+    assets = tuple(assets_dict)
+    percents = tuple(float(v) for v in assets_dict.values())
+    if base is not None and base.assets == assets and base.percents == percents:
+        return base
+    return ClassNode(assets, percents)
+
+
+def freeze(portfolio, total, base=None, changed=None):
+    """
+    Cria um Snapshot do portfólio reaproveitando os nós de `base`
+    
+    Args:
+        portfolio: dict {'macro': ..., 'sub': ...}
+        total: patrimônio total
+        base: snapshot anterior (opcional)
+        changed: classes cujos sub-ativos podem ter mudado; None compara todas
+    
+    Returns:
+        Snapshot: só as classes alteradas ganham nós novos
+    """
+    base_sub = base.sub if base is not None else {}
+    sub = {}
+    for asset_class, assets_dict in portfolio['sub'].items():
+        node = base_sub.get(asset_class)
+        if node is None or changed is None or asset_class in changed:
+            node = class_node(assets_dict, node)
+        sub[asset_class] = node
+    
+    macro = tuple((c, float(v)) for c, v in portfolio['macro'].items())
+    if base is not None and base.macro == macro:
+        macro = base.macro
+    return Snapshot(macro, sub, float(total))
+
+
+def thaw(snapshot):
+    """Converte o snapshot de volta para o dict mutável do session_state"""
+    return {
+        'macro': dict(snapshot.macro),
+        'sub': {c: dict(zip(node.assets, node.percents)) for c, node in snapshot.sub.items()},
+    }
+
+
+def same_state(a, b):
+    """Compara snapshots pelo conteúdo, aproveitando os nós compartilhados"""
+    return (
+        a.total == b.total and a.macro == b.macro and a.sub.keys() == b.sub.keys()
+        and all(node is b.sub[c] or node == b.sub[c] for c, node in a.sub.items())
+    )
+
+
+class History:
+    """Pilhas de desfazer/refazer; mover entre estados é O(1)"""
+    
+    def __init__(self, snapshot, limit=HISTORY_LIMIT):
+        self.current = snapshot
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+    
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+    
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+    
+    def record(self, portfolio, total, changed=None, amend=False):
+        """
+        Registra o estado atual se ele difere do último
+        
+        Args:
+            amend: incorpora a mudança ao passo atual em vez de criar outro
+                (preenchimentos automáticos, que não devem ser desfeitos sozinhos)
+        
+        Returns:
+            bool: True se um novo passo foi criado
+        """
+        snapshot = freeze(portfolio, total, self.current, changed)
+        if same_state(snapshot, self.current):
+            return False
+        if amend:
+            self.current = snapshot
+            return False
+        self._undo.append(self.current)
+        self._redo.clear()
+        self.current = snapshot
+        return True
+    
+    def undo(self):
+        """Volta um passo; devolve o snapshot restaurado (ou None)"""
+        if not self._undo:
+            return None
+        self._redo.append(self.current)
+        self.current = self._undo.pop()
+        return self.current
+    
+    def redo(self):
+        """Avança um passo desfeito; devolve o snapshot restaurado (ou None)"""
+        if not self._redo:
+            return None
+        self._undo.append(self.current)
+        self.current = self._redo.pop()
+        return self.current
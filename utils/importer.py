@@ -0,0 +1,10 @@
+# utils/importer.py
+"""
+Compatibilidade: a importação agora vive em cerrado.engine.importer
+"""
+from cerrado.engine.importer import (  # noqa: F401
+    IJSON_OK,
+    PROGRESS_EVERY,
+    PortfolioImportError,
+    import_portfolio
+)
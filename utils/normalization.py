@@ -0,0 +1,12 @@
+# utils/normalization.py
+"""
+Compatibilidade: a normalização agora vive em cerrado.engine.normalization
+"""
+from cerrado.engine.normalization import (  # noqa: F401
+    DEFAULT_CONSTRAINT,
+    NormalizationError,
+    constraint_arrays,
+    equal_allocation,
+    normalize_allocation,
+    project_simplex
+)
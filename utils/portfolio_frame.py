@@ -0,0 +1,8 @@
+# utils/portfolio_frame.py
+"""
+Compatibilidade: o modelo colunar agora vive em cerrado.engine.frame
+"""
+from cerrado.engine.frame import (  # noqa: F401
+    PortfolioFrame,
+    Valuation
+)
@@ -0,0 +1,355 @@
+# utils/portfolio_store.py
+"""
+Armazenamento persistente de portfólios (SQLite/WAL) com versões e gravação em segundo plano
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+from cerrado.engine.frame import PortfolioFrame
+
+DEFAULT_STORE_PATH = os.environ.get(
+    'CERRADO_STORE_PATH',
+    os.path.join(os.path.expanduser('~'), '.local', 'share', 'diagrama_cerrado', 'portfolios.sqlite3')
+)
+
+DEFAULT_NAME = "Meu portfólio"
+
+# Dono dos portfólios gravados sem sessão (CLI, bancos anteriores aos donos)
+DEFAULT_OWNER = ''
+
+# Intervalo máximo entre a chamada de save() e a gravação no disco (segundos)
+FLUSH_INTERVAL = 0.5
+
+POOL_SIZE = 4
+
+# Tentativas de gravar uma versão antes de descartá-la (erros de disco, banco travado)
+MAX_ATTEMPTS = 3
+
+# Tempo máximo que close() espera pelos pendentes (executado no atexit)
+CLOSE_TIMEOUT = 10.0
+
+logger = logging.getLogger(__name__)
+
+PortfolioInfo = namedtuple('PortfolioInfo', ['name', 'version', 'updated_at', 'versions'])
+VersionInfo = namedtuple('VersionInfo', ['version', 'saved_at', 'total', 'content_hash'])
+
+PORTFOLIOS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        owner TEXT NOT NULL DEFAULT '',
+        name TEXT NOT NULL,
+        head INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        UNIQUE (owner, name)
+    );
+"""
+
+
+class ConnectionPool:
+    """Pool fixo de conexões SQLite compartilhadas entre threads"""
+    
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._pool = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(path, timeout=10, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._pool.put(conn)
+    
+    @contextmanager
+    def connection(self):
+        """Empresta uma conexão do pool"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+
+class PortfolioStore:
+    """Portfólios nomeados com histórico de versões
+    
+    `save()` só enfileira: uma thread grava os pendentes em lote (uma
+    transação) a cada FLUSH_INTERVAL, mantendo apenas o último estado de
+    cada nome. As listagens leem só metadados; o conteúdo de uma versão é
+    desserializado apenas em `load()`.
+    
+    O store é compartilhado pelo processo (várias sessões do Streamlit):
+    os nomes são únicos por `owner`, e cada sessão só lê e grava os seus.
+    """
+    
+    def __init__(self, path=DEFAULT_STORE_PATH, pool_size=POOL_SIZE, flush_interval=FLUSH_INTERVAL):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        else:
+            pool_size = 1  # cada conexão :memory: seria um banco diferente
+        self.pool = ConnectionPool(path, pool_size)
+        self.flush_interval = flush_interval
+        self.stats = Counter()
+        
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._urgent = threading.Event()  # flush()/close(): grava sem esperar o lote
+        self._idle = threading.Condition(self._pending_lock)
+        self._closed = False
+        self._writing = False
+        self.last_error = None
+        
+        with self.pool.connection() as conn:
+            self._add_owner_column(conn)
+            conn.executescript(PORTFOLIOS_TABLE.format(table='portfolios') + """
+                CREATE TABLE IF NOT EXISTS versions (
+                    portfolio_id INTEGER NOT NULL REFERENCES portfolios (id) ON DELETE CASCADE,
+                    version INTEGER NOT NULL,
+                    saved_at REAL NOT NULL,
+                    total REAL,
+                    content_hash TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (portfolio_id, version)
+                );
+            """)
+        
+        self._writer = threading.Thread(target=self._run_writer, name="portfolio-store-writer",
+                                        daemon=True)
+        self._writer.start()
+    
+    @staticmethod
+    def _add_owner_column(conn):
+        """Migra bancos sem a coluna `owner` (nome único global) para DEFAULT_OWNER"""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(portfolios)")]
+        if not columns or 'owner' in columns:
+            return
+        # A restrição UNIQUE muda: a tabela é recriada mantendo os ids (as
+        # versões apontam para eles); sem FKs, o DROP não apaga as versões
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(PORTFOLIOS_TABLE.format(table='portfolios_new'))
+                conn.execute(
+                    "INSERT INTO portfolios_new (id, owner, name, head, updated_at) "
+                    "SELECT id, ?, name, head, updated_at FROM portfolios",
+                    (DEFAULT_OWNER,)
+                )
+                conn.execute("DROP TABLE portfolios")
+                conn.execute("ALTER TABLE portfolios_new RENAME TO portfolios")
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.execute("PRAGMA foreign_keys=ON")
+    
+    # --- gravação ---------------------------------------------------------
+    
+    def save(self, name, portfolio, total=None, owner=DEFAULT_OWNER):
+        """
+        Agenda a gravação de uma nova versão (retorna sem esperar o disco)
+        
+        Args:
+            name: nome do portfólio
+            portfolio: PortfolioFrame ou dict {'macro': ..., 'sub': ...}
+            total: patrimônio total (opcional)
+            owner: dono do portfólio (id da sessão)
+        """
+        # O frame não é alterado depois de criado; um dict é copiado já aqui
+        frame = portfolio if isinstance(portfolio, PortfolioFrame) else PortfolioFrame.from_dict(portfolio)
+        with self._pending_lock:
+            self._pending[owner, name] = (frame, total, time.time(), 0)
+            self.stats['queued'] += 1
+        self._wake.set()
+    
+    def flush(self, timeout=None):
+        """
+        Espera a gravação de tudo que está pendente
+        
+        Returns:
+            bool: False se o tempo acabou ou a thread de gravação parou
+        """
+        self._urgent.set()
+        self._wake.set()
+        try:
+            with self._idle:
+                return self._idle.wait_for(
+                    lambda: (not self._pending and not self._writing) or not self._writer.is_alive(),
+                    timeout
+                ) and self._writer.is_alive()
+        finally:
+            self._urgent.clear()
+    
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """Grava os pendentes (por até `timeout` s) e encerra a thread de gravação"""
+        if self._closed:
+            return
+        if not self.flush(timeout):
+            with self._pending_lock:
+                lost = len(self._pending)
+            if lost:
+                logger.error("portfolio store: %d gravação(ões) pendente(s) descartada(s) ao fechar", lost)
+        self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=timeout)
+    
+    def _run_writer(self):
+        while not self._closed:
+            self._wake.wait()
+            if self._closed:
+                break
+            self._urgent.wait(self.flush_interval)  # junta as gravações próximas num lote
+            self._wake.clear()
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+                self._writing = bool(batch)
+            try:
+                if batch:
+                    self._write_batch(batch)
+                    self.last_error = None
+            except Exception as e:
+                # A thread não pode morrer: o lote volta para a fila e é tentado de novo
+                self.last_error = e
+                self.stats['failed'] += 1
+                logger.exception("portfolio store: falha ao gravar %d portfólio(s)", len(batch))
+                self._requeue(batch)
+            finally:
+                with self._idle:
+                    self._writing = False
+                    self._idle.notify_all()
+    
+    def _requeue(self, batch):
+        """Devolve um lote que falhou à fila (saves mais novos do mesmo nome prevalecem)"""
+        with self._pending_lock:
+            for key, (frame, total, saved_at, attempts) in batch.items():
+                if key in self._pending:
+                    continue
+                if attempts + 1 >= MAX_ATTEMPTS:
+                    self.stats['dropped'] += 1
+                    logger.error("portfolio store: versão de %r descartada após %d tentativas",
+                                 key[1], MAX_ATTEMPTS)
+                    continue
+                self._pending[key] = (frame, total, saved_at, attempts + 1)
+            retry = bool(self._pending)
+        if retry:
+            self._wake.set()
+    
+    def _write_batch(self, batch):
+        """Grava um lote de versões numa única transação"""
+        rows = []
+        for (owner, name), (frame, total, saved_at, _) in batch.items():
+            payload = json.dumps(frame.to_dict(), ensure_ascii=False)
+            rows.append((owner, name, saved_at, total, frame.content_hash(), payload))
+        
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for owner, name, saved_at, total, content_hash, payload in rows:
+                    conn.execute(
+                        "INSERT INTO portfolios (owner, name, head, updated_at) VALUES (?, ?, 0, ?) "
+                        "ON CONFLICT (owner, name) DO NOTHING",
+                        (owner, name, saved_at)
+                    )
+                    portfolio_id, head = conn.execute(
+                        "SELECT id, head FROM portfolios WHERE owner = ? AND name = ?", (owner, name)
+                    ).fetchone()
+                    
+                    # Mesmo conteúdo e patrimônio da versão atual: não cria versão nova
+                    last = conn.execute(
+                        "SELECT content_hash, total FROM versions WHERE portfolio_id = ? AND version = ?",
+                        (portfolio_id, head)
+                    ).fetchone()
+                    if last == (content_hash, total):
+                        self.stats['unchanged'] += 1
+                        continue
+                    
+                    conn.execute(
+                        "INSERT INTO versions (portfolio_id, version, saved_at, total, content_hash, payload) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (portfolio_id, head + 1, saved_at, total, content_hash, payload)
+                    )
+                    conn.execute(
+                        "UPDATE portfolios SET head = ?, updated_at = ? WHERE id = ?",
+                        (head + 1, saved_at, portfolio_id)
+                    )
+                    self.stats['written'] += 1
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        self.stats['batches'] += 1
+    
+    # --- leitura ----------------------------------------------------------
+    
+    def list_portfolios(self, owner=DEFAULT_OWNER):
+        """Metadados dos portfólios salvos de um dono (sem carregar o conteúdo)"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT p.name, p.head, p.updated_at, COUNT(v.version) "
+                "FROM portfolios p LEFT JOIN versions v ON v.portfolio_id = p.id "
+                "WHERE p.owner = ? GROUP BY p.id ORDER BY p.updated_at DESC",
+                (owner,)
+            ).fetchall()
+        return [PortfolioInfo(*row) for row in rows]
+    
+    def versions(self, name, owner=DEFAULT_OWNER):
+        """Metadados das versões de um portfólio, da mais recente para a mais antiga"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT v.version, v.saved_at, v.total, v.content_hash FROM versions v "
+                "JOIN portfolios p ON p.id = v.portfolio_id WHERE p.owner = ? AND p.name = ? "
+                "ORDER BY v.version DESC",
+                (owner, name)
+            ).fetchall()
+        return [VersionInfo(*row) for row in rows]
+    
+    def load(self, name, version=None, owner=DEFAULT_OWNER):
+        """
+        Carrega uma versão (default: a mais recente)
+        
+        Returns:
+            tuple: (portfolio dict, total) ou (None, None) se não existir
+        """
+        query = (
+            "SELECT v.payload, v.total FROM versions v JOIN portfolios p ON p.id = v.portfolio_id "
+            "WHERE p.owner = ? AND p.name = ? AND v.version = " + ("p.head" if version is None else "?")
+        )
+        params = (owner, name) if version is None else (owner, name, version)
+        with self.pool.connection() as conn:
+            row = conn.execute(query, params).fetchone()
+        if row is None:
+            return None, None
+        self.stats['loaded'] += 1
+        return json.loads(row[0]), row[1]
+    
+    def delete(self, name, owner=DEFAULT_OWNER):
+        """Remove um portfólio e todas as suas versões"""
+        with self._pending_lock:
+            self._pending.pop((owner, name), None)
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM portfolios WHERE owner = ? AND name = ?", (owner, name))
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_default_store():
+    """Instância única por processo (grava os pendentes ao sair)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PortfolioStore()
+            atexit.register(_default_store.close)
+        return _default_store
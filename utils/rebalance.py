@@ -0,0 +1,13 @@
+# utils/rebalance.py
+"""
+Compatibilidade: o rebalanceamento agora vive em cerrado.engine.rebalance
+"""
+from cerrado.engine.rebalance import (  # noqa: F401
+    ORDER_DTYPE,
+    RebalancePlan,
+    align_positions,
+    allocation_drift,
+    allocate_contribution,
+    plan_rebalance,
+    target_weights
+)
@@ -0,0 +1,14 @@
+# utils/snapshot.py
+"""
+Compatibilidade: os snapshots agora vive em cerrado.engine.snapshot
+"""
+from cerrado.engine.snapshot import (  # noqa: F401
+    METADATA_KEY,
+    PYARROW_OK,
+    SNAPSHOT_EXTENSION,
+    SNAPSHOT_SCHEMA_VERSION,
+    SnapshotError,
+    read_snapshot,
+    snapshot_bytes,
+    write_snapshot
+)
@@ -0,0 +1,90 @@
+# utils/static_assets.py
+"""
+Pipeline de estilos: junta, minifica e versiona (hash do conteúdo) os CSS
+"""
+import hashlib
+import os
+import re
+from collections import namedtuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(ROOT_DIR, 'assets')
+
+# Pasta servida pelo Streamlit em app/static/ (server.enableStaticServing)
+STATIC_DIR = os.path.join(ROOT_DIR, 'static', 'css')
+STATIC_URL = 'app/static/css'
+
+# Arquivos de cada tema, na ordem em que entram no pacote
+THEMES = {
+    'light': ('styles.css', 'theme_light.css'),
+    'dark': ('styles.css', 'theme_dark.css'),
+}
+
+Stylesheet = namedtuple('Stylesheet', [
+    'theme',        # nome do tema
+    'css',          # CSS minificado
+    'fingerprint',  # hash do conteúdo
+    'url',          # URL relativa do arquivo versionado (None se não gravou)
+])
+
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+_SPACE = re.compile(r'\s+')
+_AROUND = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(text):
+    """Remove comentários e espaços supérfluos (strings ficam intactas)"""
+    text = _COMMENT.sub('', text)
+    parts = _STRING.split(text)
+    for i in range(0, len(parts), 2):
+        chunk = _SPACE.sub(' ', parts[i])
+        chunk = _AROUND.sub(r'\1', chunk)
+        parts[i] = chunk.replace(': ', ':').replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def bundle_css(names, assets_dir=ASSETS_DIR):
+    """Concatena e minifica os arquivos CSS indicados"""
+    sources = []
+    for name in names:
+        with open(os.path.join(assets_dir, name), encoding='utf-8') as f:
+            sources.append(f.read())
+    return minify_css('\n'.join(sources))
+
+
+def build_stylesheet(theme, assets_dir=ASSETS_DIR, static_dir=STATIC_DIR):
+    """
+    Gera o CSS do tema e grava `<tema>.<hash>.css` na pasta estática
+    
+    Versões antigas do mesmo tema são removidas. Se a pasta não puder ser
+    gravada, `url` fica None e o CSS deve ser enviado inline.
+    
+    Args:
+        theme: chave de THEMES
+        assets_dir: pasta dos CSS de origem
+        static_dir: pasta servida em STATIC_URL
+    
+    Returns:
+        Stylesheet
+    """
+    css = bundle_css(THEMES[theme], assets_dir)
+    fingerprint = hashlib.blake2b(css.encode('utf-8'), digest_size=8).hexdigest()
+    filename = f"{theme}.{fingerprint}.css"
+    
+    try:
+        os.makedirs(static_dir, exist_ok=True)
+        path = os.path.join(static_dir, filename)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(css)
+            os.replace(tmp_path, path)
+        
+        for old in os.listdir(static_dir):
+            if old.startswith(f"{theme}.") and old.endswith('.css') and old != filename:
+                os.remove(os.path.join(static_dir, old))
+    except OSError:
+        return Stylesheet(theme, css, fingerprint, None)
+    
+    return Stylesheet(theme, css, fingerprint, f"{STATIC_URL}/{filename}")